@@ -43,20 +43,17 @@ export default function DashboardPage() {
     
     if (tokens?.access && user?.email) {
       setLoadingGroups(true)
-      console.log('[Dashboard] Loading groups with API URL:', process.env.NEXT_PUBLIC_API_URL)
-      // Fetch all groups and filter them properly
-      fetch(`${process.env.NEXT_PUBLIC_API_URL}/api/groups/`, {
+      // Fetch only the groups the user created or joined and split them
+      fetch(`${process.env.NEXT_PUBLIC_API_URL}/api/groups/?mine=true`, {
         headers: { "Authorization": `Bearer ${tokens.access}` },
       })
         .then(res => {
-          console.log('[Dashboard] Groups API response:', res.status, res.statusText)
           if (!res.ok) {
             throw new Error(`HTTP ${res.status}: ${res.statusText}`)
           }
           return res.json()
         })
         .then(data => {
-          console.log('[Dashboard] Groups data received:', data?.length || 0, 'groups')
           // Filter groups where user is the creator
           const created = data.filter((group: any) => group.creator_email === user.email)
           // Filter groups where user has joined (but is not the creator)
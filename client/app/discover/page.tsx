@@ -25,6 +25,8 @@ export default function DiscoverPage() {
   const [selectedLanguage, setSelectedLanguage] = useState("")
   const [personalityFilters, setPersonalityFilters] = useState<string[]>([])
   const [groups, setGroups] = useState<any[]>([])
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [loading, setLoading] = useState(true)
   const [searching, setSearching] = useState(false)
   const [error, setError] = useState<string | null>(null)
@@ -61,26 +63,31 @@ export default function DiscoverPage() {
     // eslint-disable-next-line
   }, []);
 
+  const buildParams = () => {
+    const params = new URLSearchParams({ page_size: '50' });
+    if (searchTerm) params.append('search', searchTerm);
+    if (selectedSubject && selectedSubject !== 'all') params.append('subject', selectedSubject);
+    if (selectedYear && selectedYear !== 'all') params.append('year_level', selectedYear);
+    if (selectedFormat && selectedFormat !== 'all') params.append('meeting_format', selectedFormat);
+    if (selectedLanguage && selectedLanguage !== 'all') params.append('primary_language', selectedLanguage);
+    if (personalityFilters.length > 0) params.append('personality_tags', personalityFilters.join(','));
+    if (sort) params.append('sort', sort);
+    return params;
+  };
+
   const fetchGroups = async (background = false) => {
     if (!background) setLoading(true);
     setSearching(true);
     setError(null);
     try {
-      // Build query parameters
-      const params = new URLSearchParams();
-      if (searchTerm) params.append('search', searchTerm);
-      if (selectedSubject && selectedSubject !== 'all') params.append('subject', selectedSubject);
-      if (selectedYear && selectedYear !== 'all') params.append('year_level', selectedYear);
-      if (selectedFormat && selectedFormat !== 'all') params.append('meeting_format', selectedFormat);
-      if (selectedLanguage && selectedLanguage !== 'all') params.append('primary_language', selectedLanguage);
-      if (personalityFilters.length > 0) params.append('personality_tags', personalityFilters.join(','));
-      if (sort) params.append('sort', sort);
-
+      const params = buildParams();
       const res = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/api/groups/?${params.toString()}`);
       if (!res.ok) throw new Error("Failed to fetch groups");
+      // Sending page_size asks for one page: { results, next_cursor }
       const data = await res.json();
-      setGroups(data);
-      setCachedApiData(GROUPS_CACHE_KEY, data);
+      setGroups(data.results);
+      setNextCursor(data.next_cursor);
+      setCachedApiData(GROUPS_CACHE_KEY, data.results);
     } catch (err) {
       setError("Could not load groups.");
     } finally {
@@ -89,6 +96,24 @@ export default function DiscoverPage() {
     }
   };
 
+  const loadMoreGroups = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const params = buildParams();
+      params.append('cursor', nextCursor);
+      const res = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/api/groups/?${params.toString()}`);
+      if (!res.ok) throw new Error("Failed to fetch groups");
+      const data = await res.json();
+      setGroups(prev => [...prev, ...data.results]);
+      setNextCursor(data.next_cursor);
+    } catch (err) {
+      setError("Could not load groups.");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   // Debounced search effect
   useEffect(() => {
     const timeoutId = setTimeout(() => {
@@ -357,6 +382,7 @@ export default function DiscoverPage() {
                   <SelectValue />
                 </SelectTrigger>
                 <SelectContent>
+                  <SelectItem value="relevance">Best match</SelectItem>
                   <SelectItem value="newest">Newest first</SelectItem>
                   <SelectItem value="members">Most members</SelectItem>
                   <SelectItem value="rating">Highest rated</SelectItem>
@@ -465,6 +491,13 @@ export default function DiscoverPage() {
                     </Card>
                   ))}
             </div>
+            {!loading && nextCursor && (
+              <div className="flex justify-center mt-8">
+                <Button variant="outline" onClick={loadMoreGroups} disabled={loadingMore}>
+                  {loadingMore ? "Loading..." : "Load more groups"}
+                </Button>
+              </div>
+            )}
             {/* Show empty state only when not loading and no groups */}
             {!loading && groups.length === 0 && (
               <div className="text-center py-12">
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, Group, Message, GroupSession, GroupFile, GroupNotification, GroupRating, CompletedSessionCounter, Report
+from .models import User, Group, Message, GroupSession, GroupFile, GroupNotification, GroupRating, CompletedSessionCounter, Report, SchedulerLease, ScheduledTaskState, GroupStudyProgress, GroupStats, SessionHistory, RecurringSession, RecurrenceException, UserNotification, CalendarFeedToken, Tag
 
 @admin.register(User)
 class CustomUserAdmin(UserAdmin):
@@ -84,12 +84,12 @@ class GroupRatingAdmin(admin.ModelAdmin):
 
 @admin.register(CompletedSessionCounter)
 class CompletedSessionCounterAdmin(admin.ModelAdmin):
-    list_display = ('count',)
+    list_display = ('id', 'count')
     readonly_fields = ('count',)
     
     def has_add_permission(self, request):
-        # Only allow one counter instance
-        return not CompletedSessionCounter.objects.exists()
+        # Shard rows are created by CompletedSessionCounter.increment()
+        return False
     
     def has_delete_permission(self, request, obj=None):
         return False 
@@ -99,4 +99,62 @@ class ReportAdmin(admin.ModelAdmin):
     list_display = ('type', 'target_id', 'reporter', 'created_at')
     list_filter = ('type', 'created_at')
     search_fields = ('type', 'target_id', 'reporter__email')
-    readonly_fields = ('created_at',) 
\ No newline at end of file
+    readonly_fields = ('created_at',)
+
+@admin.register(SchedulerLease)
+class SchedulerLeaseAdmin(admin.ModelAdmin):
+    list_display = ('name', 'holder', 'expires_at')
+    readonly_fields = ('name', 'holder', 'expires_at')
+
+@admin.register(ScheduledTaskState)
+class ScheduledTaskStateAdmin(admin.ModelAdmin):
+    list_display = ('name', 'last_started_at', 'last_duration_ms', 'last_lag_ms', 'last_result', 'run_count', 'last_holder')
+    readonly_fields = ('name', 'last_started_at', 'last_duration_ms', 'last_lag_ms', 'last_result', 'last_error', 'last_holder', 'run_count')
+
+@admin.register(GroupStudyProgress)
+class GroupStudyProgressAdmin(admin.ModelAdmin):
+    list_display = ('group', 'completed_hours', 'completed_sessions', 'scheduled_hours', 'scheduled_sessions', 'updated_at')
+    readonly_fields = ('updated_at',)
+
+@admin.register(GroupStats)
+class GroupStatsAdmin(admin.ModelAdmin):
+    list_display = ('group', 'member_count', 'rating_count', 'rating_avg')
+    readonly_fields = ('member_count', 'rating_sum', 'rating_count', 'rating_avg')
+
+@admin.register(SessionHistory)
+class SessionHistoryAdmin(admin.ModelAdmin):
+    list_display = ('session_id', 'group', 'starts_at', 'duration_hours', 'attendee_count', 'archived_at')
+    list_filter = ('starts_at',)
+    readonly_fields = ('group', 'session_id', 'starts_at', 'ends_at', 'duration_hours', 'attendee_count', 'archived_at')
+
+class RecurrenceExceptionInline(admin.TabularInline):
+    model = RecurrenceException
+    extra = 0
+
+@admin.register(RecurringSession)
+class RecurringSessionAdmin(admin.ModelAdmin):
+    list_display = ('group', 'frequency', 'interval', 'by_weekday', 'starts_on', 'until', 'count', 'start_time', 'end_time', 'exhausted')
+    list_filter = ('frequency', 'exhausted')
+    search_fields = ('group__group_name', 'location', 'topic')
+    readonly_fields = ('credited_through', 'exhausted', 'created_at', 'updated_at')
+    inlines = [RecurrenceExceptionInline]
+
+@admin.register(UserNotification)
+class UserNotificationAdmin(admin.ModelAdmin):
+    list_display = ('user', 'kind', 'message', 'is_read', 'created_at')
+    list_filter = ('kind', 'is_read', 'created_at')
+    search_fields = ('user__email', 'message')
+    readonly_fields = ('created_at',)
+
+@admin.register(CalendarFeedToken)
+class CalendarFeedTokenAdmin(admin.ModelAdmin):
+    list_display = ('user', 'created_at')
+    search_fields = ('user__email',)
+    readonly_fields = ('token', 'created_at')
+
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    # GroupTag rows are derived from the group's tag strings, so they are not edited here.
+    list_display = ('name', 'kind')
+    list_filter = ('kind',)
+    search_fields = ('name',)
@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class ServerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'server' 
\ No newline at end of file
+    name = 'server'
+
+    def ready(self):
+        from . import cache_versions, signals  # noqa: F401 - registers the cache check, connects the signal handlers
@@ -0,0 +1,131 @@
+"""
+Helpers shared by the benchmark management commands.
+
+Benchmarks seed their own data inside a transaction that is always rolled back,
+so they can be pointed at a development database without leaving rows behind.
+"""
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import time as dtime
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from .models import Group, GroupSession, GroupTag, Tag, User, session_bounds
+
+YEARS = ['1st Year', '2nd Year', '3rd Year', 'Postgraduate']
+# Query budgets count the view's own queries; with the DatabaseCache fallback
+# every cache read would be a query too, so checks run on a process-local cache.
+LOCAL_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+FORMATS = ['In-person', 'Virtual', 'Hybrid']
+
+
+@contextmanager
+def rolled_back():
+    """Run the block in a transaction that is rolled back on exit."""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+@contextmanager
+def measure():
+    """Capture the query count and wall time (ms) of the block into a dict."""
+    stats = {}
+    with CaptureQueriesContext(connection) as ctx:
+        started = time.perf_counter()
+        yield stats
+        stats['ms'] = (time.perf_counter() - started) * 1000
+    stats['queries'] = len(ctx.captured_queries)
+
+
+def make_users(count):
+    prefix = f'bench-{uuid.uuid4().hex[:8]}-'
+    User.objects.bulk_create([
+        User(
+            email=f'{prefix}{i}@student.unimelb.edu.au',
+            name=f'Bench User {i}',
+            major='Computer Science',
+            year_level='2nd Year',
+            preferred_study_format='In-person',
+            languages_spoken='English',
+        )
+        for i in range(count)
+    ])
+    return list(User.objects.filter(email__startswith=prefix).order_by('id'))
+
+
+def make_groups(count, creator, **overrides):
+    """Bulk-create ``count`` groups for ``creator`` and return exactly those, with their ids set."""
+    groups = [
+        Group(**{
+            'group_name': f'Bench Group {i}',
+            'subject_code': f'COMP{10000 + i % 50}',
+            'course_name': 'Benchmarking',
+            'description': 'Seeded by a benchmark command',
+            'year_level': '2nd Year',
+            'meeting_format': 'In-person',
+            'primary_language': 'English',
+            'meeting_schedule': 'Weekly',
+            'location': 'Online',
+            'creator': creator,
+            **overrides,
+        })
+        for i in range(count)
+    ]
+    # PostgreSQL and SQLite 3.35+ return the new ids, so nothing the creator already had is included.
+    return Group.objects.bulk_create(groups)
+
+
+def make_tagged_groups(count, rng, subjects=500, topics=300, personalities=12):
+    """
+    Seed ``count`` groups with random subjects, year levels, meeting formats
+    and 0-4 topic / 0-2 personality tags (as GroupTag rows); returns the
+    creator. Signals do not run, so derived tables are left to the caller.
+    """
+    creator, = make_users(1)
+    Group.objects.bulk_create([
+        Group(
+            group_name=f'Bench Group {i}',
+            subject_code=f'COMP{10000 + rng.randrange(subjects)}',
+            description='Seeded by a benchmark command',
+            year_level=rng.choice(YEARS),
+            meeting_format=rng.choice(FORMATS),
+            primary_language='English',
+            meeting_schedule='Weekly',
+            location='Online',
+            creator=creator,
+        )
+        for i in range(count)
+    ], batch_size=2000)
+    Tag.objects.bulk_create(
+        [Tag(kind=Tag.TOPIC, name=f'bench topic {i}') for i in range(topics)]
+        + [Tag(kind=Tag.PERSONALITY, name=f'bench personality {i}') for i in range(personalities)],
+        ignore_conflicts=True,
+    )
+    topic_ids = list(Tag.objects.filter(kind=Tag.TOPIC, name__startswith='bench topic ').values_list('id', flat=True))
+    personality_ids = list(Tag.objects.filter(kind=Tag.PERSONALITY, name__startswith='bench personality ').values_list('id', flat=True))
+    GroupTag.objects.bulk_create([
+        GroupTag(group_id=group_id, tag_id=tag_id)
+        for group_id in Group.objects.filter(creator=creator).values_list('id', flat=True)
+        for tag_id in rng.sample(topic_ids, rng.randrange(5)) + rng.sample(personality_ids, rng.randrange(3))
+    ], batch_size=5000)
+    return creator
+
+
+def make_sessions(count, groups, creator, session_date, start_time=dtime(10, 0), end_time=dtime(11, 0)):
+    starts_at, ends_at = session_bounds(session_date, start_time, end_time)
+    GroupSession.objects.bulk_create([
+        GroupSession(
+            group=groups[i % len(groups)],
+            creator=creator,
+            date=session_date,
+            start_time=start_time,
+            end_time=end_time,
+            starts_at=starts_at,
+            ends_at=ends_at,
+            location='Online',
+        )
+        for i in range(count)
+    ], batch_size=1000)
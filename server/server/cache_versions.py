@@ -0,0 +1,86 @@
+"""
+Version counters for cache invalidation.
+
+Cached entries embed the current version of their namespace in the key, so
+invalidating a whole namespace is one cache.incr(): later reads use new
+keys and the old entries simply expire. A missing counter is seeded from
+the clock rather than 1, so a counter evicted from the cache can never come
+back at a version whose entries are still cached.
+
+Bumps made by one process (a gunicorn worker, or run_scheduler expiring
+sessions) only reach the others through a cache they all share, so
+settings.CACHES must not be a per-process backend in production; the
+system check below warns when it is.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.checks import Tags, Warning, register
+from django.db import transaction
+
+PER_PROCESS_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+def _key(namespace):
+    return f'cache_version:{namespace}'
+
+
+def get_version(namespace):
+    version = cache.get(_key(namespace))
+    if version is None:
+        cache.add(_key(namespace), time.time_ns(), None)
+        version = cache.get(_key(namespace), time.time_ns())
+    return version
+
+
+def get_versions(namespaces):
+    """{namespace: version} for several namespaces, read in one cache round trip."""
+    keys = {_key(namespace): namespace for namespace in namespaces}
+    versions = {keys[key]: version for key, version in cache.get_many(list(keys)).items()}
+    for namespace in keys.values():
+        if namespace not in versions:
+            versions[namespace] = get_version(namespace)
+    return versions
+
+
+def bump_version(namespace):
+    """Invalidate the namespace once the current transaction commits."""
+    bump_versions([namespace])
+
+
+def bump_versions(namespaces):
+    """Invalidate several namespaces once the current transaction commits."""
+    namespaces = list(namespaces)
+
+    def bump():
+        for namespace in namespaces:
+            try:
+                cache.incr(_key(namespace))
+            except ValueError:
+                cache.add(_key(namespace), time.time_ns(), None)
+    if namespaces:
+        transaction.on_commit(bump)
+
+
+def versioned_key(namespace, params, version=None):
+    """Cache key for ``params`` (a JSON-serializable dict) under the namespace's current (or given) version."""
+    digest = hashlib.md5(json.dumps(params, sort_keys=True).encode()).hexdigest()
+    return f'{namespace}:{get_version(namespace) if version is None else version}:{digest}'
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if backend in PER_PROCESS_BACKENDS:
+        return [Warning(
+            f'The default cache ({backend}) is not shared between processes.',
+            hint='Cache invalidation would only reach the process that made the change; use Redis or DatabaseCache.',
+            id='server.W001',
+        )]
+    return []
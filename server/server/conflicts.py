@@ -0,0 +1,67 @@
+"""
+Clash detection for the sessions a user has joined.
+
+find_overlaps() is a sweep line: intervals are sorted by start and a heap
+holds the ones still running, ordered by end. Each new interval first evicts
+everything that ended before it starts; whatever remains overlaps it. That
+is O(n log n + k) for n sessions and k clashing pairs, instead of comparing
+every pair. Sessions that merely touch (one ends as the next starts) do not
+clash.
+"""
+import heapq
+from itertools import count
+
+from .models import GroupSession
+
+SESSION_FIELDS = ('id', 'group_id', 'group__group_name', 'topic', 'location', 'starts_at', 'ends_at')
+
+
+def find_overlaps(intervals):
+    """
+    ``intervals`` is an iterable of (starts_at, ends_at, item). Returns a list
+    of (item_a, item_b, overlap_start, overlap_end), with item_a starting first.
+    """
+    overlaps = []
+    active = []  # heap of (ends_at, tiebreak, starts_at, item)
+    tiebreak = count()
+    for starts_at, ends_at, item in sorted(intervals, key=lambda i: (i[0], i[1])):
+        while active and active[0][0] <= starts_at:
+            heapq.heappop(active)
+        for other_ends_at, _, _, other in active:
+            overlaps.append((other, item, starts_at, min(ends_at, other_ends_at)))
+        heapq.heappush(active, (ends_at, next(tiebreak), starts_at, item))
+    return overlaps
+
+
+def _as_dict(row):
+    return dict(zip(('id', 'group', 'group_name', 'topic', 'location', 'starts_at', 'ends_at'), row))
+
+
+def attended_sessions(user_id, start, end=None):
+    """The user's joined sessions overlapping [start, end), read through the attendees M2M."""
+    sessions = GroupSession.objects.filter(attendees=user_id, ends_at__gt=start)
+    if end is not None:
+        sessions = sessions.filter(starts_at__lt=end)
+    return [_as_dict(row) for row in sessions.values_list(*SESSION_FIELDS)]
+
+
+def user_conflicts(user_id, start, end=None):
+    """Returns (session_count, [conflict dicts]) for the user's joined sessions in the window."""
+    sessions = attended_sessions(user_id, start, end)
+    overlaps = find_overlaps((s['starts_at'], s['ends_at'], s) for s in sessions)
+    return len(sessions), [
+        {'sessions': [a, b], 'overlap_start': overlap_start, 'overlap_end': overlap_end}
+        for a, b, overlap_start, overlap_end in overlaps
+    ]
+
+
+def conflicts_for_session(user_id, session):
+    """The user's other joined sessions that overlap ``session`` (a single indexed range query)."""
+    return [
+        _as_dict(row) for row in
+        GroupSession.objects
+        .filter(attendees=user_id, starts_at__lt=session.ends_at, ends_at__gt=session.starts_at)
+        .exclude(id=session.id)
+        .order_by('starts_at')
+        .values_list(*SESSION_FIELDS)
+    ]
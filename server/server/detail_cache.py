@@ -0,0 +1,73 @@
+"""
+Response cache for group detail pages.
+
+The part of /api/groups/<id>/ that is the same for every viewer (group
+fields, counts, similar groups, study progress) is cached as the anonymous
+user sees it, keyed by the group, the ?fields= selection, the group's own
+version and the 'group_detail' version. The group's version is bumped (see
+signals.py) by any write touching it: the group itself, its members,
+ratings, sessions and progress, its creator's name or email, or its stored
+similar groups. Bulk repairs and similar-group rebuilds bump
+'group_detail' instead, invalidating every page at once. The versions live
+in the shared cache (settings.CACHES), so a bump made by the scheduler or
+another worker reaches every process at once.
+
+Similar groups are embedded with their own fields, so an entry also
+records the versions of the groups it embeds and is rebuilt once any of
+them has moved on. Signed-in viewers get the cached body with joined /
+user_rating filled in by two EXISTS-sized lookups.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache_versions import bump_version, bump_versions, get_versions, versioned_key
+from .models import Group, GroupRating
+
+CACHE_NAMESPACE = 'group_detail'
+
+
+def group_namespace(group_id):
+    return f'{CACHE_NAMESPACE}:{group_id}'
+
+
+def invalidate_groups(group_ids):
+    """Invalidate the detail pages of ``group_ids`` once the current transaction commits."""
+    bump_versions(group_namespace(group_id) for group_id in set(group_ids))
+
+
+def invalidate_all():
+    bump_version(CACHE_NAMESPACE)
+
+
+def cache_key(group_id, fields):
+    # Both versions in one round trip: the cache is shared, so each read may be a network call or query.
+    versions = get_versions([CACHE_NAMESPACE, group_namespace(group_id)])
+    return versioned_key(CACHE_NAMESPACE, {
+        'group': group_id,
+        'version': versions[group_namespace(group_id)],
+        'fields': sorted(fields) if fields is not None else None,
+    }, version=versions[CACHE_NAMESPACE])
+
+
+def get_body(key):
+    """The cached body under ``key``, or None if it is missing or an embedded similar group has changed."""
+    entry = cache.get(key)
+    if entry is None or (entry['similar'] and get_versions(entry['similar']) != entry['similar']):
+        return None
+    return entry['body']
+
+
+def set_body(key, body, similar_ids):
+    versions = get_versions(group_namespace(group_id) for group_id in similar_ids)
+    cache.set(key, {'body': body, 'similar': versions}, getattr(settings, 'GROUP_DETAIL_CACHE_SECONDS', 300))
+
+
+def overlay_user_fields(body, group_id, user):
+    """A copy of the cached ``body`` with ``user``'s joined / user_rating values filled in."""
+    body = dict(body)
+    if 'joined' in body:
+        body['joined'] = Group.members.through.objects.filter(group_id=group_id, user_id=user.id).exists()
+    if 'user_rating' in body:
+        rating = GroupRating.objects.filter(group_id=group_id, user=user).values_list('rating', flat=True).first()
+        body['user_rating'] = float(rating) if rating is not None else None
+    return body
@@ -0,0 +1,32 @@
+"""
+Conditional GET helpers.
+
+Views build a weak ETag from whatever cheaply identifies the response
+contents (ids and modification times, a version counter, ...) and return
+304 Not Modified when the client already holds that version, skipping
+serialization and the response body.
+"""
+import hashlib
+
+from django.utils.http import parse_etags
+from rest_framework.response import Response
+
+
+def weak_etag(*parts):
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(request, etag):
+    """Weak comparison of ``etag`` against the request's If-None-Match header."""
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    opaque = etag.removeprefix('W/')
+    return any(candidate.removeprefix('W/') == opaque for candidate in parse_etags(header))
+
+
+def not_modified(etag):
+    return Response(status=304, headers={'ETag': etag})
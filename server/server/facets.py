@@ -0,0 +1,50 @@
+"""
+Facet counts for the discover page's filters.
+
+Each facet is counted with one GROUP BY under every applied filter except
+its own, so the counts show how many groups each option would match if it
+were chosen instead. Results are cached per normalized filter set under the
+'group_facets' version, which the Group save/delete signals bump. The
+counter is kept in the shared cache, so a group created through one worker
+invalidates the counts cached by all of them.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F
+
+from .cache_versions import versioned_key
+from .group_filters import FIELD_FILTERS, TAG_FILTERS, apply_group_filters
+from .models import Group
+
+CACHE_NAMESPACE = 'group_facets'
+# Tag facets are open-ended, so only the most used values are returned.
+TAG_FACET_LIMIT = 50
+
+
+def compute_facets(params):
+    groups = Group.objects.all()
+    facets = {'total': apply_group_filters(groups, params).count()}
+    for param, field in FIELD_FILTERS.items():
+        rows = (
+            apply_group_filters(groups, params, skip={param})
+            .values(value=F(field)).annotate(count=Count('id')).order_by('-count', 'value')
+        )
+        facets[param] = list(rows)
+    for param, kind in TAG_FILTERS.items():
+        rows = (
+            apply_group_filters(groups, params, skip={param})
+            .filter(group_tags__tag__kind=kind)
+            .values(value=F('group_tags__tag__name')).annotate(count=Count('id')).order_by('-count', 'value')
+        )
+        facets[param] = list(rows[:TAG_FACET_LIMIT])
+    return facets
+
+
+def facet_counts(params):
+    """Facet counts for the normalized filter set ``params`` (see group_filters.filter_params)."""
+    key = versioned_key(CACHE_NAMESPACE, params)
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(params)
+        cache.set(key, facets, getattr(settings, 'GROUP_FACETS_CACHE_SECONDS', 300))
+    return facets
@@ -0,0 +1,64 @@
+"""
+The discover page's group filters, shared by the group list and its facet
+counts.
+
+filter_params() reduces request query parameters to a canonical dict (no
+empty or 'all' values, tags canonicalized and sorted, search whitespace
+collapsed), so equivalent requests normalize to the same filter set and can
+share cache entries.
+"""
+import re
+
+from .models import Tag
+from .search import search_groups
+from .tags import canonical_tags, filter_by_tags
+
+# Query parameter -> Group field for the single-valued filters.
+FIELD_FILTERS = {
+    'subject': 'subject_code',
+    'year_level': 'year_level',
+    'meeting_format': 'meeting_format',
+    'primary_language': 'primary_language',
+}
+# Query parameter -> Tag kind for the comma-separated tag filters.
+TAG_FILTERS = {
+    'personality_tags': Tag.PERSONALITY,
+    'tags': Tag.TOPIC,
+}
+
+
+def filter_params(query_params):
+    """The applied filters in ``query_params``, in canonical form."""
+    params = {}
+    search = re.sub(r'\s+', ' ', query_params.get('search', '')).strip().lower()
+    if search:
+        params['search'] = search
+    for param in FIELD_FILTERS:
+        value = query_params.get(param, '').strip()
+        if value and value != 'all':
+            params[param] = value
+    for param in TAG_FILTERS:
+        names = sorted(canonical_tags(query_params.get(param, '')))
+        if names:
+            params[param] = ','.join(names)
+    if query_params.get('tag_match') == 'all' and any(param in params for param in TAG_FILTERS):
+        params['tag_match'] = 'all'
+    return params
+
+
+def apply_group_filters(queryset, params, rank=False, skip=()):
+    """
+    Apply normalized ``params`` to a Group queryset. ``rank`` annotates
+    search_rank for relevance sorting; filters named in ``skip`` are left
+    out (facet counts skip their own filter).
+    """
+    if params.get('search') and 'search' not in skip:
+        queryset = search_groups(queryset, params['search'], rank=rank)
+    for param, field in FIELD_FILTERS.items():
+        if param in params and param not in skip:
+            queryset = queryset.filter(**{field: params[param]})
+    # Tag filters match any listed tag, or every one with ?tag_match=all
+    for param, kind in TAG_FILTERS.items():
+        if param in params and param not in skip:
+            queryset = filter_by_tags(queryset, kind, params[param], params.get('tag_match', 'any'))
+    return queryset
@@ -0,0 +1,94 @@
+"""
+Incremental maintenance of GroupStats.
+
+Membership and rating signals (see signals.py) apply their change to the
+group's counters in a single UPDATE, so the group list can show and sort by
+member count and average rating without aggregating the join tables. Where
+a signal cannot tell exactly what changed (members removed or cleared, a
+rating saved without being loaded first) the affected rows are recomputed
+from the source rows instead. refresh_stats() does that recount and is also
+used to repair drift.
+"""
+from django.db.models import Avg, Case, Count, F, FloatField, IntegerField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Group, GroupRating, GroupStats
+
+
+def compute_stats(group_ids=None):
+    """Return {group_id: (member_count, rating_sum, rating_count)} computed from membership and rating rows."""
+    members = Group.members.through.objects.all()
+    ratings = GroupRating.objects.order_by()
+    if group_ids is not None:
+        members = members.filter(group_id__in=group_ids)
+        ratings = ratings.filter(group_id__in=group_ids)
+    stats = {}
+    for group_id, count in members.values('group_id').annotate(count=Count('*')).values_list('group_id', 'count'):
+        stats[group_id] = (count, 0.0, 0)
+    for group_id, total, count in ratings.values('group_id').annotate(
+        total=Sum('rating'), count=Count('*'),
+    ).values_list('group_id', 'total', 'count'):
+        stats[group_id] = (stats.get(group_id, (0,))[0], float(total), count)
+    return stats
+
+
+def refresh_stats(group_ids):
+    """Recompute the stats rows of ``group_ids`` from the source rows in one UPDATE, creating missing rows."""
+    group_ids = list(group_ids)
+    if not group_ids:
+        return
+    GroupStats.objects.bulk_create(
+        [GroupStats(group_id=group_id) for group_id in Group.objects.filter(id__in=group_ids).values_list('id', flat=True)],
+        ignore_conflicts=True,
+    )
+
+    def per_group(rows, aggregate, output_field):
+        rows = rows.filter(group_id=OuterRef('group_id')).order_by().values('group_id')
+        return Coalesce(
+            Subquery(rows.annotate(value=aggregate).values('value'), output_field=output_field),
+            Value(0, output_field=output_field),
+        )
+
+    members = Group.members.through.objects.all()
+    GroupStats.objects.filter(group_id__in=group_ids).update(
+        member_count=per_group(members, Count('*'), IntegerField()),
+        rating_sum=per_group(GroupRating.objects.all(), Sum('rating', output_field=FloatField()), FloatField()),
+        rating_count=per_group(GroupRating.objects.all(), Count('*'), IntegerField()),
+        rating_avg=per_group(GroupRating.objects.all(), Avg('rating', output_field=FloatField()), FloatField()),
+    )
+
+
+def get_stats(group_id):
+    """Return the group's stats row, building it if it has never been created."""
+    stats = GroupStats.objects.filter(group_id=group_id).first()
+    if stats is None:
+        refresh_stats([group_id])
+        stats = GroupStats.objects.filter(group_id=group_id).first()
+    return stats
+
+
+def adjust_members(group_ids, delta):
+    """Add ``delta`` to the member count of each of ``group_ids``."""
+    group_ids = set(group_ids)
+    updated = GroupStats.objects.filter(group_id__in=group_ids).update(
+        member_count=Greatest(F('member_count') + delta, Value(0)),
+    )
+    if updated < len(group_ids):
+        # Some rows don't exist yet: build them from the source rows, which already include this change.
+        refresh_stats(group_ids - set(GroupStats.objects.filter(group_id__in=group_ids).values_list('group_id', flat=True)))
+
+
+def adjust_ratings(group_id, rating, count, rebuild_missing=True):
+    """Apply a rating sum/count delta to a group's stats row, keeping rating_avg in step."""
+    updated = GroupStats.objects.filter(group_id=group_id).update(
+        rating_sum=Greatest(F('rating_sum') + rating, Value(0.0)),
+        rating_count=Greatest(F('rating_count') + count, Value(0)),
+        # Right-hand sides see the old values, so the new average is computed from old + delta.
+        rating_avg=Case(
+            When(rating_count__gt=-count, then=(F('rating_sum') + rating) / (F('rating_count') + count)),
+            default=Value(0.0),
+            output_field=FloatField(),
+        ),
+    )
+    if not updated and rebuild_missing:
+        refresh_stats([group_id])
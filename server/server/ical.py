@@ -0,0 +1,188 @@
+"""
+iCalendar (RFC 5545) rendering for the per-user session feed.
+
+calendar_lines() is a generator: sessions are read with .iterator(), which
+uses a server-side cursor on PostgreSQL, and each VEVENT is yielded as soon
+as it is rendered, so the feed is never assembled in memory. One-off and
+materialized sessions become plain VEVENTs; recurring sessions are emitted
+once with an RRULE and EXDATEs and expanded by the calendar client.
+"""
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import SESSION_TIME_ZONE, Group, GroupSession, RecurringSession, SessionHistory
+from .etags import weak_etag
+from .recurrence import as_rrule
+
+PRODID = '-//MelbMinds//Study Sessions//EN'
+UID_DOMAIN = 'melbminds'
+# Ended sessions stay in the feed this long (from SessionHistory) so calendar
+# apps do not drop them the moment they expire.
+PAST_SESSION_DAYS = 30
+
+VTIMEZONE = [
+    'BEGIN:VTIMEZONE',
+    'TZID:Australia/Sydney',
+    'BEGIN:STANDARD',
+    'DTSTART:19700405T030000',
+    'RRULE:FREQ=YEARLY;BYMONTH=4;BYDAY=1SU',
+    'TZOFFSETFROM:+1100',
+    'TZOFFSETTO:+1000',
+    'TZNAME:AEST',
+    'END:STANDARD',
+    'BEGIN:DAYLIGHT',
+    'DTSTART:19701004T020000',
+    'RRULE:FREQ=YEARLY;BYMONTH=10;BYDAY=1SU',
+    'TZOFFSETFROM:+1000',
+    'TZOFFSETTO:+1100',
+    'TZNAME:AEDT',
+    'END:DAYLIGHT',
+    'END:VTIMEZONE',
+]
+
+
+def escape_text(value):
+    return (
+        (value or '')
+        .replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+    )
+
+
+def fold(line):
+    """Fold a content line at 75 octets as RFC 5545 requires."""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts = []
+    while len(encoded) > 75:
+        cut = 75 if not parts else 74
+        # Never split a multi-byte character.
+        while cut > 0 and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode('utf-8'))
+        encoded = encoded[cut:]
+    parts.append(encoded.decode('utf-8'))
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def utc_stamp(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def local_stamp(session_date, session_time):
+    return datetime.combine(session_date, session_time).strftime('%Y%m%dT%H%M%S')
+
+
+def _event(uid, summary, starts_at, ends_at, stamp, location='', description='', extra=()):
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:{uid}',
+        f'DTSTAMP:{utc_stamp(stamp)}',
+        f'DTSTART:{utc_stamp(starts_at)}' if starts_at else None,
+        f'DTEND:{utc_stamp(ends_at)}' if ends_at else None,
+        *extra,
+        f'SUMMARY:{escape_text(summary)}',
+        f'LOCATION:{escape_text(location)}' if location else None,
+        f'DESCRIPTION:{escape_text(description)}' if description else None,
+        'END:VEVENT',
+    ]
+    return ''.join(fold(line) for line in lines if line)
+
+
+def session_event(session):
+    return _event(
+        f'session-{session.id}@{UID_DOMAIN}',
+        session.topic or f'{session.group.group_name} study session',
+        session.starts_at, session.ends_at, session.updated_at,
+        location=session.location,
+        description='\n'.join(part for part in [session.group.group_name, session.description, session.extra_details] if part),
+    )
+
+
+def history_event(entry, group_name):
+    # Same UID as the live session, so clients update the event in place.
+    return _event(
+        f'session-{entry.session_id}@{UID_DOMAIN}',
+        f'{group_name} study session',
+        entry.starts_at, entry.ends_at, entry.archived_at,
+        description=group_name,
+    )
+
+
+def _ical_rrule(rule):
+    rrule = as_rrule(rule)
+    if rule.until:
+        # With a zoned DTSTART, UNTIL must be a UTC date-time.
+        until = SESSION_TIME_ZONE.localize(datetime.combine(rule.until, time(23, 59, 59)))
+        rrule = rrule.replace(f'UNTIL={rule.until:%Y%m%d}', f'UNTIL={utc_stamp(until)}')
+    return rrule
+
+
+def recurring_event(rule):
+    tzid = 'TZID=Australia/Sydney'
+    exdates = [f'EXDATE;{tzid}:{local_stamp(e.date, rule.start_time)}' for e in rule.exceptions.all()]
+    return _event(
+        f'recurring-{rule.id}@{UID_DOMAIN}',
+        rule.topic or f'{rule.group.group_name} study session',
+        None, None, rule.updated_at,
+        location=rule.location,
+        description='\n'.join(part for part in [rule.group.group_name, rule.description, rule.extra_details] if part),
+        extra=[
+            f'DTSTART;{tzid}:{local_stamp(rule.starts_on, rule.start_time)}',
+            f'DTEND;{tzid}:{local_stamp(rule.starts_on, rule.end_time)}',
+            f'RRULE:{_ical_rrule(rule)}',
+            *exdates,
+        ],
+    )
+
+
+def user_groups(user):
+    return Group.objects.filter(Q(creator=user) | Q(members=user)).distinct()
+
+
+def feed_version(user):
+    """
+    (etag, last_modified) for the user's feed, read from the groups' session
+    stamps only. The group ids are part of the ETag so joining or leaving a
+    group changes it too.
+    """
+    stamps = sorted(user_groups(user).values_list('id', 'sessions_updated_at'))
+    last_modified = max((stamp for _, stamp in stamps), default=None)
+    return weak_etag(user.id, stamps), last_modified
+
+
+def calendar_lines(user, now=None):
+    """Yield the user's calendar feed in chunks, one component at a time."""
+    now = now or timezone.now()
+    group_ids = user_groups(user).values('id')
+    yield ''.join(fold(line) for line in [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        'X-WR-CALNAME:MelbMinds study sessions',
+        *VTIMEZONE,
+    ])
+    sessions = GroupSession.objects.filter(group_id__in=group_ids).select_related('group').order_by('starts_at')
+    for session in sessions.iterator(chunk_size=500):
+        yield session_event(session)
+    history = (
+        SessionHistory.objects
+        .filter(group_id__in=group_ids, ends_at__gte=now - timedelta(days=PAST_SESSION_DAYS))
+        .select_related('group')
+        .only('session_id', 'starts_at', 'ends_at', 'archived_at', 'group__group_name')
+        .order_by('starts_at')
+    )
+    for entry in history.iterator(chunk_size=500):
+        yield history_event(entry, entry.group.group_name)
+    rules = RecurringSession.objects.filter(group_id__in=group_ids).select_related('group').prefetch_related('exceptions')
+    for rule in rules.iterator(chunk_size=200):
+        yield recurring_event(rule)
+    yield fold('END:VCALENDAR')
@@ -0,0 +1,42 @@
+"""
+Response cache for the public group list.
+
+The body of /api/groups/ is cached as the anonymous user sees it, keyed by
+the normalized filters, sort, page and ?fields= selection plus the
+'group_list' version. The version is bumped (see signals.py) whenever
+anything the list shows changes: a group is created, saved or deleted, its
+sessions or study hours change, a member joins or leaves, a rating changes
+or a creator renames themselves. Invalidation is therefore a single counter
+increment and stale entries age out on their own. Signed-in users get the
+same cached body with their own fields (joined, user_rating) overlaid, at
+two small queries.
+"""
+from .cache_versions import versioned_key
+from .models import Group, GroupRating
+
+CACHE_NAMESPACE = 'group_list'
+
+
+def cache_key(params):
+    return versioned_key(CACHE_NAMESPACE, params)
+
+
+def overlay_user_fields(rows, user):
+    """Copies of the serialized ``rows`` with ``user``'s joined / user_rating values filled in."""
+    # A sparse fieldset (?fields=) may have left out the per-user fields or the id.
+    if not rows or 'id' not in rows[0] or not {'joined', 'user_rating'} & set(rows[0]):
+        return rows
+    ids = [row['id'] for row in rows]
+    joined = set(
+        Group.members.through.objects.filter(user_id=user.id, group_id__in=ids).values_list('group_id', flat=True)
+    )
+    ratings = dict(GroupRating.objects.filter(user=user, group_id__in=ids).values_list('group_id', 'rating'))
+    overlaid = []
+    for row in rows:
+        row = dict(row)
+        if 'joined' in row:
+            row['joined'] = row['id'] in joined
+        if 'user_rating' in row:
+            row['user_rating'] = float(ratings[row['id']]) if row['id'] in ratings else None
+        overlaid.append(row)
+    return overlaid
@@ -0,0 +1,74 @@
+import random
+
+from django.core.management.base import BaseCommand
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from server.benchmarking import make_groups, make_users, measure, rolled_back
+from server.group_stats import refresh_stats
+from server.models import GroupRating
+from server.pagination import paginate_keyset
+from server.views import GROUP_LIST_ORDERINGS, GroupListCreateView
+
+
+def list_queryset(sort):
+    view = GroupListCreateView()
+    view.request = Request(APIRequestFactory().get('/api/groups/', {'sort': sort}))
+    return view.get_queryset()
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the group list page query at increasing scroll depths, keyset cursor '
+        'against OFFSET, for every sort mode'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--groups', type=int, default=5000, help='Number of groups to seed')
+        parser.add_argument('--page-size', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        page_size = options['page_size']
+        with rolled_back():
+            users = make_users(50)
+            groups = make_groups(options['groups'], users[0])
+            Membership = groups[0].members.through
+            Membership.objects.bulk_create([
+                Membership(group_id=group.id, user_id=user.id)
+                for group in groups for user in rng.sample(users, rng.randrange(8))
+            ], batch_size=1000)
+            GroupRating.objects.bulk_create([
+                GroupRating(group=group, user=user, rating=rng.choice([1.0, 2.5, 3.0, 4.0, 4.5, 5.0]))
+                for group in groups for user in rng.sample(users, rng.randrange(5))
+            ], batch_size=1000)
+            # Bulk inserts skip the signals that maintain the counters
+            refresh_stats([group.id for group in groups])
+
+            pages = -(-len(groups) // page_size)
+            depths = sorted({1, pages // 2, pages})
+            self.stdout.write(f"{'sort':>8} {'page':>6} {'keyset ms':>10} {'queries':>8} {'offset ms':>10}")
+            for sort, ordering in GROUP_LIST_ORDERINGS.items():
+                if sort == 'relevance':
+                    # Only applies to searches; benchmark_group_search covers it.
+                    continue
+                # The cursor values cannot be known without walking, so walk and time the pages of interest.
+                cursor = None
+                for page in range(1, pages + 1):
+                    with measure() as keyset:
+                        rows, next_cursor = paginate_keyset(
+                            list_queryset(sort).prefetch_related(None), ordering, cursor, page_size,
+                        )
+                    if page in depths:
+                        offset = (page - 1) * page_size
+                        with measure() as offset_stats:
+                            offset_rows = list(list_queryset(sort).prefetch_related(None)[offset:offset + page_size])
+                        if [g.id for g in offset_rows] != [g.id for g in rows]:
+                            self.stdout.write(self.style.ERROR(f"{sort}: keyset and offset pages differ at page {page}"))
+                        self.stdout.write(
+                            f"{sort:>8} {page:>6} {keyset['ms']:>10.1f} {keyset['queries']:>8} {offset_stats['ms']:>10.1f}"
+                        )
+                    cursor = next_cursor
+                    if cursor is None:
+                        break
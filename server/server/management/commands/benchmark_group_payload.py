@@ -0,0 +1,73 @@
+import random
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from server.benchmarking import make_groups, make_users, measure, rolled_back
+from server.group_stats import refresh_stats
+from server.models import Group, GroupRating
+from server.serializers import GroupCardSerializer, GroupSerializer, annotate_group_stats
+
+WORDS = (
+    'algorithms data structures calculus linear algebra probability statistics databases networks '
+    'revision assignment lecture tutorial practice weekly study group midterm final project notes'
+).split()
+CARD_FIELDS = ['id', 'group_name', 'subject_code', 'meeting_format', 'member_count', 'average_rating']
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare payload size and query + serialization time of the group list with the full '
+        'GroupSerializer, the card serializer and a ?fields= sparse fieldset'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--groups', type=int, default=2000, help='Number of groups to seed')
+        parser.add_argument('--text-length', type=int, default=2000, help='Words of description/guidelines per group')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per variant; the fastest is reported')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        with rolled_back():
+            users = make_users(30)
+            groups = make_groups(options['groups'], users[0])
+            for group in groups:
+                group.description = ' '.join(rng.choices(WORDS, k=options['text_length'] // 4))
+                group.group_guidelines = ' '.join(rng.choices(WORDS, k=options['text_length'] // 4))
+                group.tags = ','.join(rng.sample(WORDS, 3))
+            Group.objects.bulk_update(groups, ['description', 'group_guidelines', 'tags'], batch_size=1000)
+            Membership = groups[0].members.through
+            Membership.objects.bulk_create([
+                Membership(group_id=group.id, user_id=user.id)
+                for group in groups for user in rng.sample(users, rng.randrange(10))
+            ], batch_size=1000)
+            GroupRating.objects.bulk_create([
+                GroupRating(group=group, user=user, rating=rng.choice([2.0, 3.5, 4.0, 5.0]))
+                for group in groups for user in rng.sample(users, rng.randrange(4))
+            ], batch_size=1000)
+            # Bulk inserts skip the signals that maintain the counters
+            refresh_stats([group.id for group in groups])
+
+            variants = {
+                'full': lambda: GroupSerializer(annotate_group_stats(Group.objects.all()), many=True).data,
+                'card': lambda: GroupCardSerializer(GroupCardSerializer.setup_eager_loading(Group.objects.all()), many=True).data,
+                'sparse': lambda: GroupCardSerializer(
+                    GroupCardSerializer.setup_eager_loading(Group.objects.all(), fields=CARD_FIELDS),
+                    many=True, fields=CARD_FIELDS,
+                ).data,
+            }
+            self.stdout.write(f"{'variant':>8} {'ms':>8} {'queries':>8} {'bytes':>12} {'bytes/group':>12}")
+            baseline = None
+            for name, serialize in variants.items():
+                runs = []
+                for _ in range(options['repeat']):
+                    with measure() as stats:
+                        body = JSONRenderer().render(serialize())
+                    runs.append(stats)
+                best = min(runs, key=lambda stats: stats['ms'])
+                baseline = baseline or (best['ms'], len(body))
+                self.stdout.write(
+                    f"{name:>8} {best['ms']:>8.1f} {best['queries']:>8} {len(body):>12} "
+                    f"{len(body) // len(groups):>12}  ({best['ms'] / baseline[0]:.0%} time, {len(body) / baseline[1]:.0%} size)"
+                )
@@ -0,0 +1,66 @@
+import random
+
+from django.core.management.base import BaseCommand
+
+from server.benchmarking import make_users, measure, rolled_back
+from server.models import Group
+from server.search import has_search_index, icontains_filter, rebuild_index, search_groups
+
+SUBJECTS = ['COMP', 'MAST', 'INFO', 'PHYC', 'CHEM', 'BIOL', 'ECON', 'FNCE', 'LAWS', 'PSYC']
+WORDS = (
+    'algorithms data structures calculus linear algebra probability statistics databases networks '
+    'machine learning organic chemistry genetics microeconomics macroeconomics accounting contract '
+    'torts cognition neuroscience quantum mechanics thermodynamics programming python java exam '
+    'revision assignment lecture tutorial practice weekly study group midterm final project notes'
+).split()
+
+
+class Command(BaseCommand):
+    help = 'Benchmark ranked full-text group search against the icontains filter'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--groups', type=int, default=100000, help='Number of groups to seed')
+        parser.add_argument('--page-size', type=int, default=50)
+        parser.add_argument('--queries', nargs='+', default=['machine learning', 'comp1', 'quantum', 'torts exam'])
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        page_size = options['page_size']
+        with rolled_back():
+            creator, = make_users(1)
+            Group.objects.bulk_create([
+                Group(
+                    group_name=' '.join(rng.sample(WORDS, 3)).title(),
+                    subject_code=f'{rng.choice(SUBJECTS)}{rng.randrange(10000, 40000)}',
+                    course_name=' '.join(rng.sample(WORDS, 2)).title(),
+                    description=' '.join(rng.choices(WORDS, k=rng.randrange(20, 80))),
+                    year_level='2nd Year',
+                    meeting_format='In-person',
+                    primary_language='English',
+                    meeting_schedule='Weekly',
+                    location='Online',
+                    creator=creator,
+                )
+                for _ in range(options['groups'])
+            ], batch_size=2000)
+            with measure() as indexing:
+                rebuild_index()
+            self.stdout.write(f"Seeded {options['groups']} groups; indexed in {indexing['ms']:.0f} ms")
+            if not has_search_index():
+                self.stdout.write(self.style.WARNING('No search index on this database; both paths use icontains'))
+
+            self.stdout.write(f"{'query':>18} {'matches':>8} {'icontains ms':>13} {'indexed':>8} {'ranked ms':>10}")
+            for query in options['queries']:
+                with measure() as naive:
+                    naive_rows = list(Group.objects.filter(icontains_filter(query)).order_by('-created_at', '-id')[:page_size])
+                    naive_total = Group.objects.filter(icontains_filter(query)).count()
+                with measure() as ranked:
+                    matches = search_groups(Group.objects.all(), query)
+                    ranked_rows = list(matches.order_by('-search_rank', '-id')[:page_size])
+                    ranked_total = matches.count()
+                self.stdout.write(
+                    f"{query:>18} {naive_total:>8} {naive['ms']:>13.1f} {ranked_total:>8} {ranked['ms']:>10.1f}"
+                )
+                if len(ranked_rows) < min(page_size, ranked_total) or len(naive_rows) < min(page_size, naive_total):
+                    self.stdout.write(self.style.ERROR(f"{query}: short first page"))
@@ -0,0 +1,54 @@
+from datetime import time, timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from server.benchmarking import make_groups, make_users, measure, rolled_back
+from server.models import GroupSession, RecurringSession
+from server.recurrence import credit_elapsed_occurrences, expand
+
+
+class Command(BaseCommand):
+    help = 'Benchmark lazy expansion of recurring sessions over year-long windows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rules', type=int, nargs='+', default=[10, 100, 1000],
+                            help='Number of recurring rules to seed for each run')
+        parser.add_argument('--days', type=int, default=365, help='Length of the expansion window in days')
+        parser.add_argument('--groups', type=int, default=20, help='Number of groups the rules are spread over')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        window_end = now + timedelta(days=options['days'])
+        self.stdout.write(
+            f"{'rules':>7} {'occurrences':>12} {'rows stored':>12} {'expand ms':>10} {'queries':>8} "
+            f"{'credit ms':>10} {'queries':>8}"
+        )
+        for count in options['rules']:
+            with rolled_back():
+                creator = make_users(1)[0]
+                groups = make_groups(options['groups'], creator)
+                RecurringSession.objects.bulk_create([
+                    RecurringSession(
+                        group=groups[i % len(groups)],
+                        creator=creator,
+                        start_time=time(9 + i % 8, 0),
+                        end_time=time(10 + i % 8, 30),
+                        location='Online',
+                        frequency=[RecurringSession.WEEKLY, RecurringSession.DAILY, RecurringSession.MONTHLY][i % 3],
+                        by_weekday='0,2,4' if i % 2 else '',
+                        starts_on=(now - timedelta(days=400 + i % 30)).date(),
+                        credited_through=now - timedelta(days=1),
+                    )
+                    for i in range(count)
+                ])
+                with measure() as expand_stats:
+                    rules = RecurringSession.objects.prefetch_related('exceptions')
+                    occurrences = len(expand(rules, now, window_end))
+                with measure() as credit_stats:
+                    credit_elapsed_occurrences(now)
+                stored = RecurringSession.objects.count() + GroupSession.objects.count()
+            self.stdout.write(
+                f"{count:>7} {occurrences:>12} {stored:>12} {expand_stats['ms']:>10.1f} {expand_stats['queries']:>8} "
+                f"{credit_stats['ms']:>10.1f} {credit_stats['queries']:>8}"
+            )
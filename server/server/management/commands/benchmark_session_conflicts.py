@@ -0,0 +1,70 @@
+import random
+import time
+from datetime import time as dtime, timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from server.benchmarking import make_groups, make_users, measure, rolled_back
+from server.conflicts import attended_sessions, find_overlaps, user_conflicts
+from server.models import GroupSession, session_bounds
+
+
+def naive_overlaps(sessions):
+    return [
+        (a, b) for i, a in enumerate(sessions) for b in sessions[i + 1:]
+        if a['starts_at'] < b['ends_at'] and b['starts_at'] < a['ends_at']
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark sweep-line conflict detection for users attending many sessions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sessions', type=int, nargs='+', default=[100, 500, 2000],
+                            help='Number of sessions the user attends in each run')
+        parser.add_argument('--days', type=int, default=180, help='Days the sessions are spread over')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        today = timezone.now().date()
+        self.stdout.write(f"{'sessions':>9} {'conflicts':>10} {'queries':>8} {'total ms':>9} {'sweep ms':>9} {'pairwise ms':>12}")
+        for count in options['sessions']:
+            with rolled_back():
+                user, creator = make_users(2)
+                groups = make_groups(20, creator)
+                sessions = []
+                for i in range(count):
+                    session_date = today + timedelta(days=1 + rng.randrange(options['days']))
+                    start_hour = rng.randrange(8, 20)
+                    start_time = dtime(start_hour)
+                    end_time = dtime(min(23, start_hour + rng.choice([1, 2, 3])))
+                    starts_at, ends_at = session_bounds(session_date, start_time, end_time)
+                    sessions.append(GroupSession(
+                        group=groups[i % len(groups)], creator=creator, date=session_date,
+                        start_time=start_time, end_time=end_time, starts_at=starts_at, ends_at=ends_at,
+                        location='Online',
+                    ))
+                GroupSession.objects.bulk_create(sessions, batch_size=1000)
+                Attendance = GroupSession.attendees.through
+                Attendance.objects.bulk_create(
+                    [Attendance(groupsession_id=s.id, user_id=user.id) for s in GroupSession.objects.filter(creator=creator)],
+                    batch_size=1000,
+                )
+
+                now = timezone.now()
+                with measure() as stats:
+                    _, conflicts = user_conflicts(user.id, now)
+                rows = attended_sessions(user.id, now)
+                started = time.perf_counter()
+                swept = find_overlaps((s['starts_at'], s['ends_at'], s) for s in rows)
+                sweep_ms = (time.perf_counter() - started) * 1000
+                started = time.perf_counter()
+                pairwise = naive_overlaps(rows)
+                pairwise_ms = (time.perf_counter() - started) * 1000
+                if len(swept) != len(pairwise):
+                    self.stdout.write(self.style.ERROR(f"Mismatch: sweep found {len(swept)}, pairwise {len(pairwise)}"))
+            self.stdout.write(
+                f"{count:>9} {len(conflicts):>10} {stats['queries']:>8} {stats['ms']:>9.1f} {sweep_ms:>9.1f} {pairwise_ms:>12.1f}"
+            )
@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from server.benchmarking import make_groups, make_sessions, make_users, measure, rolled_back
+from server.session_expiry import expire_past_sessions
+
+
+class Command(BaseCommand):
+    help = 'Show that session expiry issues a constant number of queries as the session table grows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000],
+                            help='Number of upcoming sessions to seed for each run')
+        parser.add_argument('--expired', type=int, default=200, help='Number of past sessions to seed for each run')
+        parser.add_argument('--groups', type=int, default=50, help='Number of groups the sessions are spread over')
+
+    def handle(self, *args, **options):
+        today = timezone.now().date()
+        self.stdout.write(f"{'upcoming':>10} {'expired':>10} {'queries':>8} {'ms':>10}")
+        for size in options['sizes']:
+            with rolled_back():
+                creator = make_users(1)[0]
+                groups = make_groups(options['groups'], creator)
+                make_sessions(options['expired'], groups, creator, today - timedelta(days=7))
+                make_sessions(size, groups, creator, today + timedelta(days=7))
+                with measure() as stats:
+                    expired = expire_past_sessions()
+            self.stdout.write(f"{size:>10} {expired:>10} {stats['queries']:>8} {stats['ms']:>10.1f}")
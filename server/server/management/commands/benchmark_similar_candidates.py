@@ -0,0 +1,93 @@
+import random
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from server.benchmarking import make_tagged_groups, measure, rolled_back
+from server.minhash import BAND_ROWS, BANDS, rebuild_signatures
+from server.models import Group, GroupBucket
+from server.similarity import TOP_K, candidate_filter, compute_similar, load_profiles, scan_similar_groups
+
+# Upper bounds of the tag overlap ranges collision rates are reported for.
+OVERLAP_BINS = [0.2, 0.4, 0.6, 1.0]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare similar-group candidate generation by LSH bucket collision against the exact tag join '
+        'and the exhaustive scan: candidates, latency and recall of each sampled group\'s top-k'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--groups', type=int, default=10000)
+        parser.add_argument('--sample', type=int, default=100, help='Groups whose similar groups are computed')
+        parser.add_argument('--subjects', type=int, default=500)
+        parser.add_argument('--topics', type=int, default=300)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        with rolled_back():
+            creator = make_tagged_groups(options['groups'], rng, options['subjects'], options['topics'])
+            with measure() as signature_stats:
+                rebuild_signatures()
+            self.stdout.write(f"Signatures and buckets for {options['groups']} groups: {signature_stats['ms']:.0f} ms")
+
+            profiles = load_profiles(Group.objects.filter(creator=creator))
+            sample = [profiles[group_id] for group_id in rng.sample(sorted(profiles), min(options['sample'], len(profiles)))]
+            with measure() as scan_stats:
+                expected = {profile.id: scan_similar_groups(profile.id)[:TOP_K] for profile in sample}
+
+            self.stdout.write(f"{'strategy':>10} {'candidates':>11} {'ms/group':>9} {'recall@k':>9} {'identical':>10}")
+            self.report('scan', len(profiles) - 1, scan_stats, expected, expected)
+            for strategy, exact in [('tag join', True), ('lsh', False)]:
+                with measure() as stats:
+                    found = {profile.id: compute_similar(profile, exact)[:TOP_K] for profile in sample}
+                candidates = sum(
+                    Group.objects.filter(candidate_filter(profile, exact)).exclude(id=profile.id).count()
+                    for profile in sample
+                ) / len(sample)
+                self.report(strategy, candidates, stats, found, expected)
+                if exact and found != expected:
+                    raise CommandError('The exact tag join ranks differently from the exhaustive scan')
+            self.report_collisions(profiles, sample)
+
+    def report(self, strategy, candidates, stats, found, expected):
+        relevant = sum(len(matches) for matches in expected.values())
+        hits = sum(
+            len({match[0] for match in found[group_id]} & {match[0] for match in matches})
+            for group_id, matches in expected.items()
+        )
+        identical = sum(found[group_id] == matches for group_id, matches in expected.items())
+        self.stdout.write(
+            f"{strategy:>10} {candidates:>11.0f} {stats['ms'] / len(expected):>9.1f} "
+            f"{hits / max(relevant, 1):>9.1%} {identical / len(expected):>10.1%}"
+        )
+
+    def report_collisions(self, profiles, sample):
+        """Share of tag-sharing pairs that collide, by tag overlap, against the banding's theoretical rate."""
+        buckets = defaultdict(set)
+        for group_id, band, bucket in GroupBucket.objects.filter(group_id__in=profiles).values_list('group_id', 'band', 'bucket'):
+            buckets[group_id].add((band, bucket))
+        pairs, collided, predicted = defaultdict(int), defaultdict(int), defaultdict(float)
+        for profile in sample:
+            tokens = profile.topics | profile.personality
+            for other in profiles.values():
+                other_tokens = other.topics | other.personality
+                if other.id == profile.id or not tokens & other_tokens:
+                    continue
+                overlap = len(tokens & other_tokens) / len(tokens | other_tokens)
+                upper = next(bound for bound in OVERLAP_BINS if overlap <= bound)
+                pairs[upper] += 1
+                collided[upper] += bool(buckets[profile.id] & buckets[other.id])
+                predicted[upper] += 1 - (1 - overlap ** BAND_ROWS) ** BANDS
+
+        self.stdout.write(f"{'tag overlap':>12} {'pairs':>8} {'collide':>8} {'predicted':>10}")
+        lower = 0
+        for upper in OVERLAP_BINS:
+            if pairs[upper]:
+                self.stdout.write(
+                    f"{f'{lower:.1f}-{upper:.1f}':>12} {pairs[upper]:>8} "
+                    f"{collided[upper] / pairs[upper]:>8.1%} {predicted[upper] / pairs[upper]:>10.1%}"
+                )
+            lower = upper
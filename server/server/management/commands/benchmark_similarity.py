@@ -0,0 +1,54 @@
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+
+from server.benchmarking import make_tagged_groups, measure, rolled_back
+from server.models import Group
+from server.similarity import (
+    TOP_K, bucketed_lists, load_profiles, matrix_engine_available, matrix_lists, scan_similar_groups,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Time a full similar-groups recompute with the NumPy/SciPy matrix engine against the Python '
+        'paths. The Python paths are timed on a sample of groups and extrapolated to the catalogue.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--groups', type=int, nargs='+', default=[10000, 50000], help='Catalogue sizes to seed')
+        parser.add_argument('--sample', type=int, default=200, help='Groups timed (and compared) on the Python paths')
+        parser.add_argument('--subjects', type=int, default=500)
+        parser.add_argument('--topics', type=int, default=300)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        if not matrix_engine_available():
+            raise CommandError('NumPy and SciPy are needed for the matrix engine: pip install numpy scipy')
+        rng = random.Random(options['seed'])
+        self.stdout.write(f"{'groups':>7} {'engine':>16} {'timed':>7} {'ms':>10} {'full recompute ms':>18}")
+        for count in options['groups']:
+            with rolled_back():
+                creator = make_tagged_groups(count, rng, options['subjects'], options['topics'])
+                profiles = load_profiles(Group.objects.filter(creator=creator))
+                sample = rng.sample(sorted(profiles), min(options['sample'], count))
+
+                with measure() as matrix_stats:
+                    matrix = matrix_lists(profiles)
+                with measure() as bucket_stats:
+                    bucketed = bucketed_lists(profiles, sample)
+                with measure() as scan_stats:
+                    scanned = {group_id: scan_similar_groups(group_id, profiles)[:TOP_K] for group_id in sample}
+
+                scale = count / len(sample)
+                for engine, stats, timed, estimate in [
+                    ('matrix', matrix_stats, count, matrix_stats['ms']),
+                    ('python buckets', bucket_stats, len(sample), bucket_stats['ms'] * scale),
+                    ('python loop', scan_stats, len(sample), scan_stats['ms'] * scale),
+                ]:
+                    self.stdout.write(f"{count:>7} {engine:>16} {timed:>7} {stats['ms']:>10.0f} {estimate:>18.0f}")
+
+                differing = [group_id for group_id in sample if not matrix[group_id] == bucketed[group_id] == scanned[group_id]]
+                if differing:
+                    raise CommandError(f"{len(differing)} sampled group(s) rank differently across engines, e.g. {differing[0]}")
+        self.stdout.write(self.style.SUCCESS('Sampled groups rank identically with every engine'))
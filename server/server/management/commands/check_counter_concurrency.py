@@ -0,0 +1,68 @@
+import threading
+from collections import Counter
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.db.models import F, Sum
+
+from server.models import CompletedSessionCounter
+
+
+class Command(BaseCommand):
+    help = (
+        'Increment CompletedSessionCounter from parallel threads (each with its own database '
+        'connection) and check that no increments are lost. The increments are subtracted '
+        'again afterwards, so the live counter is left unchanged.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help='Number of parallel writers')
+        parser.add_argument('--increments', type=int, default=200, help='Increments per writer')
+
+    def stored_total(self):
+        return CompletedSessionCounter.objects.aggregate(total=Sum('count'))['total'] or 0
+
+    def handle(self, *args, **options):
+        workers, increments = options['workers'], options['increments']
+        before = self.stored_total()
+        added = Counter()
+        errors = []
+        lock = threading.Lock()
+        start = threading.Barrier(workers)
+
+        def writer():
+            local = Counter()
+            try:
+                start.wait()
+                for _ in range(increments):
+                    local[CompletedSessionCounter.increment()] += 1
+            except Exception as e:
+                errors.append(e)
+            finally:
+                with lock:
+                    added.update(local)
+                close_old_connections()
+
+        threads = [threading.Thread(target=writer) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        after = self.stored_total()
+        expected = sum(added.values())
+        # Undo exactly what this run added, shard by shard, without touching concurrent real increments.
+        for shard, amount in added.items():
+            CompletedSessionCounter.objects.filter(pk=shard).update(count=F('count') - amount)
+        cache.delete(CompletedSessionCounter.CACHE_KEY)
+
+        self.stdout.write(
+            f"workers={workers} increments/worker={increments} shards={CompletedSessionCounter.shard_count()} "
+            f"applied={expected} counted={after - before} spread={dict(sorted(added.items()))}"
+        )
+        if errors:
+            raise CommandError(f"{len(errors)} writer(s) failed: {errors[0]}")
+        if after - before < expected:
+            raise CommandError(f"Lost {expected - (after - before)} increment(s)")
+        self.stdout.write(self.style.SUCCESS('No increments were lost'))
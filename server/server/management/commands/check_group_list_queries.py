@@ -0,0 +1,75 @@
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from server.benchmarking import LOCAL_CACHES, make_groups, make_users, measure, rolled_back
+from server.group_stats import refresh_stats
+from server.models import GroupRating
+from server.views import GroupListCreateView, GroupRetrieveView
+
+
+class Command(BaseCommand):
+    help = (
+        'Check that listing groups (anonymously and signed in) and fetching one group cost a '
+        'fixed number of queries, however many groups there are. Seeds data in a transaction '
+        'that is rolled back, and bypasses the list and detail response caches.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--groups', type=int, nargs='+', default=[50, 500], help='Group counts to compare')
+        parser.add_argument('--max-queries', type=int, default=8, help='Query budget per request')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def request(self, view, user=None, **kwargs):
+        request = APIRequestFactory().get('/api/groups/')
+        if user is not None:
+            force_authenticate(request, user=user)
+        with measure() as stats:
+            response = view(request, **kwargs)
+        if response.status_code != 200:
+            raise CommandError(f"Request failed with {response.status_code}: {response.data}")
+        return stats['queries']
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        budget = options['max_queries']
+        list_view = GroupListCreateView.as_view()
+        detail_view = GroupRetrieveView.as_view()
+        counts = {}
+        with override_settings(CACHES=LOCAL_CACHES, GROUP_LIST_CACHE_SECONDS=0, GROUP_DETAIL_CACHE_SECONDS=0):
+            for count in options['groups']:
+                with rolled_back():
+                    users = make_users(30)
+                    groups = make_groups(count, users[0])
+                    Membership = groups[0].members.through
+                    Membership.objects.bulk_create([
+                        Membership(group_id=group.id, user_id=user.id)
+                        for group in groups for user in rng.sample(users, rng.randrange(6))
+                    ], ignore_conflicts=True)
+                    GroupRating.objects.bulk_create([
+                        GroupRating(group=group, user=user, rating=rng.choice([2.0, 3.5, 4.0, 5.0]))
+                        for group in groups for user in rng.sample(users, rng.randrange(4))
+                    ])
+                    # Bulk inserts skip the signals that maintain the counters
+                    refresh_stats([group.id for group in groups])
+                    viewer = users[1]
+                    # Bulk-created groups have no progress row yet; the first detail read creates it.
+                    self.request(detail_view, viewer, pk=groups[0].id)
+                    counts[count] = (
+                        self.request(list_view),
+                        self.request(list_view, viewer),
+                        self.request(detail_view, viewer, pk=groups[0].id),
+                    )
+                self.stdout.write(
+                    f"groups={count} list anonymous={counts[count][0]} list signed-in={counts[count][1]} "
+                    f"detail={counts[count][2]} queries"
+                )
+
+        if len(set(counts.values())) > 1:
+            raise CommandError(f"Query counts grow with the number of groups: {counts}")
+        over = [c for c in counts.values() for queries in c if queries > budget]
+        if over:
+            raise CommandError(f"Query counts {counts} exceed the budget of {budget}")
+        self.stdout.write(self.style.SUCCESS(f"Query counts are fixed and within the budget of {budget}"))
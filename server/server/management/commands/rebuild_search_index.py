@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from server.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the group full-text search index (the PostgreSQL search_vector column or the '
+        'SQLite FTS5 table). Needed after bulk writes that bypass model signals.'
+    )
+
+    def handle(self, *args, **options):
+        indexed = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} group(s)"))
@@ -0,0 +1,54 @@
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+
+from server.benchmarking import measure
+from server.models import Group
+from server.similarity import (
+    TOP_K, load_profiles, matrix_engine_available, rebuild_similar_groups, scan_similar_groups, stored_lists,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the SimilarGroup table and LSH buckets, or with --check compare the stored lists '
+        'against a full scan of every group. Incremental updates find tag matches by LSH, so weak '
+        'tag-only matches can differ until the next rebuild'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Only compare, do not write anything')
+        parser.add_argument('--sample', type=int, help='With --check, compare this many random groups instead of all')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--engine', choices=['matrix', 'python'],
+            help='Scoring engine for the rebuild (default: matrix when NumPy and SciPy are installed)',
+        )
+
+    def handle(self, *args, **options):
+        if not options['check']:
+            with measure() as stats:
+                count = rebuild_similar_groups(options['engine'])
+            engine = options['engine'] or ('matrix' if matrix_engine_available() else 'python')
+            self.stdout.write(self.style.SUCCESS(
+                f"Rebuilt similar groups for {count} group(s) in {stats['ms']:.0f} ms ({engine} engine)"
+            ))
+            return
+
+        profiles = load_profiles(Group.objects.all())
+        group_ids = sorted(profiles)
+        if options['sample'] and options['sample'] < len(group_ids):
+            group_ids = sorted(random.Random(options['seed']).sample(group_ids, options['sample']))
+        stored = stored_lists(group_ids)
+        mismatched = 0
+        for group_id in group_ids:
+            expected = scan_similar_groups(group_id, profiles)[:TOP_K]
+            if stored.get(group_id, []) != expected:
+                mismatched += 1
+                self.stdout.write(self.style.WARNING(
+                    f"Group {group_id}: stored {[entry[0] for entry in stored.get(group_id, [])]} "
+                    f"expected {[entry[0] for entry in expected]}"
+                ))
+        if mismatched:
+            raise CommandError(f"{mismatched} of {len(group_ids)} group(s) differ from a full scan; run without --check")
+        self.stdout.write(self.style.SUCCESS(f"All {len(group_ids)} checked group(s) match a full scan"))
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from server.detail_cache import invalidate_all as invalidate_all_details
+from server.models import Group, GroupStudyProgress
+from server.study_progress import compute_scheduled
+
+# Float sums drift by rounding error alone; ignore anything smaller.
+TOLERANCE_HOURS = 0.001
+
+
+class Command(BaseCommand):
+    help = 'Recompute GroupStudyProgress from sessions and report (or repair) any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Only report drift, do not write anything')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        scheduled = compute_scheduled()
+        existing = {p.group_id: p for p in GroupStudyProgress.objects.all()}
+        to_create, to_update = [], []
+
+        for group_id, total_study_hours in Group.objects.values_list('id', 'total_study_hours').iterator():
+            hours, count = scheduled.get(group_id, (0, 0))
+            completed_hours = total_study_hours or 0
+            progress = existing.get(group_id)
+            if progress is None:
+                self.stdout.write(self.style.WARNING(f"Group {group_id}: progress row missing"))
+                to_create.append(GroupStudyProgress(
+                    group_id=group_id, completed_hours=completed_hours, scheduled_hours=hours, scheduled_sessions=count,
+                ))
+                continue
+            if (abs(progress.scheduled_hours - hours) > TOLERANCE_HOURS
+                    or progress.scheduled_sessions != count
+                    or abs(progress.completed_hours - completed_hours) > TOLERANCE_HOURS):
+                self.stdout.write(self.style.WARNING(
+                    f"Group {group_id}: scheduled {progress.scheduled_hours:.2f}h/{progress.scheduled_sessions} "
+                    f"(expected {hours:.2f}h/{count}), completed {progress.completed_hours:.2f}h "
+                    f"(expected {completed_hours:.2f}h)"
+                ))
+                progress.scheduled_hours = hours
+                progress.scheduled_sessions = count
+                progress.completed_hours = completed_hours
+                progress.updated_at = now
+                to_update.append(progress)
+
+        drifted = len(to_create) + len(to_update)
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS(f"All {len(existing)} progress rows are consistent"))
+            return
+        if options['check']:
+            self.stdout.write(self.style.ERROR(f"{drifted} group(s) have drifted; run without --check to repair"))
+            return
+
+        with transaction.atomic():
+            GroupStudyProgress.objects.bulk_create(to_create, batch_size=1000)
+            GroupStudyProgress.objects.bulk_update(
+                to_update, ['scheduled_hours', 'scheduled_sessions', 'completed_hours', 'updated_at'], batch_size=1000,
+            )
+            invalidate_all_details()
+        self.stdout.write(self.style.SUCCESS(f"Repaired {drifted} group(s)"))
@@ -0,0 +1,85 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from server.cache_versions import bump_version
+from server.detail_cache import invalidate_all as invalidate_all_details
+from server.group_stats import compute_stats
+from server.models import Group, GroupStats
+from server.session_attendance import drifted_sessions, recount
+
+# Rating sums are halves, so float drift only comes from rounding; ignore anything smaller.
+TOLERANCE = 0.001
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute GroupStats from memberships and ratings, and session attendee counts from '
+        'their attendee rows, and report (or repair) any drift'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Only report drift, do not write anything')
+
+    def handle(self, *args, **options):
+        self.reconcile_group_stats(options['check'])
+        self.reconcile_attendee_counts(options['check'])
+
+    def reconcile_attendee_counts(self, check):
+        drifted = drifted_sessions()
+        for session_id, (stored, actual) in drifted.items():
+            self.stdout.write(self.style.WARNING(f"Session {session_id}: {stored} attendees (expected {actual})"))
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS("All session attendee counts are consistent"))
+        elif check:
+            self.stdout.write(self.style.ERROR(f"{len(drifted)} session(s) have drifted; run without --check to repair"))
+        else:
+            recount(drifted)
+            self.stdout.write(self.style.SUCCESS(f"Repaired {len(drifted)} session(s)"))
+
+    def reconcile_group_stats(self, check):
+        expected = compute_stats()
+        existing = {s.group_id: s for s in GroupStats.objects.all()}
+        to_create, to_update = [], []
+
+        for group_id in Group.objects.values_list('id', flat=True).iterator():
+            member_count, rating_sum, rating_count = expected.get(group_id, (0, 0.0, 0))
+            rating_avg = rating_sum / rating_count if rating_count else 0
+            stats = existing.get(group_id)
+            if stats is None:
+                self.stdout.write(self.style.WARNING(f"Group {group_id}: stats row missing"))
+                to_create.append(GroupStats(
+                    group_id=group_id, member_count=member_count,
+                    rating_sum=rating_sum, rating_count=rating_count, rating_avg=rating_avg,
+                ))
+                continue
+            if (stats.member_count != member_count
+                    or stats.rating_count != rating_count
+                    or abs(stats.rating_sum - rating_sum) > TOLERANCE
+                    or abs(stats.rating_avg - rating_avg) > TOLERANCE):
+                self.stdout.write(self.style.WARNING(
+                    f"Group {group_id}: {stats.member_count} members (expected {member_count}), "
+                    f"ratings {stats.rating_sum:.1f}/{stats.rating_count} avg {stats.rating_avg:.2f} "
+                    f"(expected {rating_sum:.1f}/{rating_count} avg {rating_avg:.2f})"
+                ))
+                stats.member_count = member_count
+                stats.rating_sum = rating_sum
+                stats.rating_count = rating_count
+                stats.rating_avg = rating_avg
+                to_update.append(stats)
+
+        drifted = len(to_create) + len(to_update)
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS(f"All {len(existing)} stats rows are consistent"))
+            return
+        if check:
+            self.stdout.write(self.style.ERROR(f"{drifted} group(s) have drifted; run without --check to repair"))
+            return
+
+        with transaction.atomic():
+            GroupStats.objects.bulk_create(to_create, batch_size=1000)
+            GroupStats.objects.bulk_update(
+                to_update, ['member_count', 'rating_sum', 'rating_count', 'rating_avg'], batch_size=1000,
+            )
+            bump_version('group_list')
+            invalidate_all_details()
+        self.stdout.write(self.style.SUCCESS(f"Repaired {drifted} group(s)"))
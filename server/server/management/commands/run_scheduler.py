@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from server import tasks  # noqa: F401 - registers the periodic tasks
+from server.scheduler import Scheduler, registry, release_lease
+
+
+class Command(BaseCommand):
+    help = 'Run the background scheduler (session expiry and other periodic tasks)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tick', type=float, default=None, help='Seconds between scheduler ticks')
+        parser.add_argument('--once', action='store_true', help='Run a single tick and exit')
+
+    def handle(self, *args, **options):
+        scheduler = Scheduler()
+        self.stdout.write(f"Scheduler {scheduler.holder} starting with tasks: {', '.join(t.name for t in registry)}")
+        if options['once']:
+            ran = scheduler.tick()
+            if scheduler.is_leader:
+                release_lease(scheduler.holder)
+            else:
+                self.stdout.write(self.style.WARNING('Another scheduler holds the lease; nothing was run'))
+                return
+            self.stdout.write(self.style.SUCCESS(f"Ran: {', '.join(ran) or 'nothing due'}"))
+            return
+        scheduler.run_forever(tick_seconds=options['tick'])
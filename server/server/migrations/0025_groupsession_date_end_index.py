@@ -0,0 +1,17 @@
+# Generated by Django 4.2.23 on 2026-10-18 13:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0024_user_interests_hobbies_alter_flashcard_answer_image_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='groupsession',
+            index=models.Index(fields=['date', 'end_time'], name='server_gsession_date_end_idx'),
+        ),
+    ]
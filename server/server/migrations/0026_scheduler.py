@@ -0,0 +1,36 @@
+# Generated by Django 4.2.23 on 2026-10-18 13:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0025_groupsession_date_end_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduledTaskState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('last_started_at', models.DateTimeField(blank=True, null=True)),
+                ('last_duration_ms', models.FloatField(default=0)),
+                ('last_lag_ms', models.FloatField(default=0)),
+                ('last_result', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('last_holder', models.CharField(blank=True, default='', max_length=255)),
+                ('run_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SchedulerLease',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('holder', models.CharField(blank=True, default='', max_length=255)),
+                ('expires_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 4.2.23 on 2026-10-18 14:02
+
+from datetime import datetime
+
+import pytz
+from django.db import migrations, models
+
+
+def backfill_session_bounds(apps, schema_editor):
+    GroupSession = apps.get_model('server', 'GroupSession')
+    tz = pytz.timezone('Australia/Sydney')
+    batch = []
+    for session in GroupSession.objects.only('id', 'date', 'start_time', 'end_time').iterator(chunk_size=1000):
+        session.starts_at = tz.localize(datetime.combine(session.date, session.start_time))
+        session.ends_at = tz.localize(datetime.combine(session.date, session.end_time))
+        batch.append(session)
+        if len(batch) >= 1000:
+            GroupSession.objects.bulk_update(batch, ['starts_at', 'ends_at'])
+            batch = []
+    if batch:
+        GroupSession.objects.bulk_update(batch, ['starts_at', 'ends_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0026_scheduler'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='groupsession',
+            name='starts_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='groupsession',
+            name='ends_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_session_bounds, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='groupsession',
+            name='starts_at',
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.AlterField(
+            model_name='groupsession',
+            name='ends_at',
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.RemoveIndex(
+            model_name='groupsession',
+            name='server_gsession_date_end_idx',
+        ),
+        migrations.AddIndex(
+            model_name='groupsession',
+            index=models.Index(fields=['group', 'ends_at'], name='server_gsession_group_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='groupsession',
+            index=models.Index(fields=['ends_at'], name='server_gsession_end_idx'),
+        ),
+    ]
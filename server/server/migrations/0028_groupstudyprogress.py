@@ -0,0 +1,51 @@
+# Generated by Django 4.2.23 on 2026-10-18 15:10
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_study_progress(apps, schema_editor):
+    Group = apps.get_model('server', 'Group')
+    GroupSession = apps.get_model('server', 'GroupSession')
+    GroupStudyProgress = apps.get_model('server', 'GroupStudyProgress')
+
+    scheduled = {}
+    for group_id, starts_at, ends_at in GroupSession.objects.values_list('group_id', 'starts_at', 'ends_at').iterator():
+        hours, count = scheduled.get(group_id, (0, 0))
+        duration = max(ends_at - starts_at, timedelta(0)).total_seconds() / 3600
+        scheduled[group_id] = (hours + duration, count + 1)
+
+    rows = []
+    for group_id, total_study_hours in Group.objects.values_list('id', 'total_study_hours').iterator():
+        hours, count = scheduled.get(group_id, (0, 0))
+        rows.append(GroupStudyProgress(
+            group_id=group_id,
+            completed_hours=total_study_hours or 0,
+            scheduled_hours=hours,
+            scheduled_sessions=count,
+        ))
+    GroupStudyProgress.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0027_groupsession_starts_at_ends_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupStudyProgress',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='study_progress', serialize=False, to='server.group')),
+                ('completed_hours', models.FloatField(default=0)),
+                ('completed_sessions', models.PositiveIntegerField(default=0)),
+                ('scheduled_hours', models.FloatField(default=0)),
+                ('scheduled_sessions', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_study_progress, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.23 on 2026-10-18 16:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0028_groupstudyprogress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session_id', models.PositiveBigIntegerField()),
+                ('starts_at', models.DateTimeField()),
+                ('ends_at', models.DateTimeField()),
+                ('duration_hours', models.FloatField()),
+                ('attendee_count', models.PositiveIntegerField(default=0)),
+                ('attendee_ids', models.BinaryField(default=b'')),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='session_history', to='server.group')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['group', 'starts_at'], name='server_shistory_group_idx'), models.Index(fields=['starts_at'], name='server_shistory_start_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.23 on 2026-10-18 17:20
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_attendee_count(apps, schema_editor):
+    GroupSession = apps.get_model('server', 'GroupSession')
+    Attendance = GroupSession.attendees.through
+    counts = (
+        Attendance.objects.filter(groupsession_id=OuterRef('pk'))
+        .order_by()
+        .values('groupsession_id')
+        .annotate(n=Count('id'))
+        .values('n')
+    )
+    GroupSession.objects.update(attendee_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0029_sessionhistory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='groupsession',
+            name='attendee_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_attendee_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 4.2.23 on 2026-10-18 13:47
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0030_groupsession_attendee_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecurrenceException',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('materialized', models.BooleanField(default=False)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RecurringSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic', models.CharField(blank=True, default='', max_length=255)),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('location', models.CharField(max_length=255)),
+                ('meeting_format', models.CharField(blank=True, default='', max_length=100)),
+                ('description', models.TextField(blank=True)),
+                ('extra_details', models.TextField(blank=True, default='')),
+                ('frequency', models.CharField(choices=[('DAILY', 'Daily'), ('WEEKLY', 'Weekly'), ('MONTHLY', 'Monthly')], default='WEEKLY', max_length=10)),
+                ('interval', models.PositiveSmallIntegerField(default=1)),
+                ('by_weekday', models.CharField(blank=True, default='', help_text='Comma-separated weekdays, Monday=0 (weekly rules only)', max_length=20)),
+                ('starts_on', models.DateField()),
+                ('until', models.DateField(blank=True, null=True)),
+                ('count', models.PositiveIntegerField(blank=True, null=True)),
+                ('credited_through', models.DateTimeField(default=django.utils.timezone.now)),
+                ('exhausted', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='groupsession',
+            name='occurrence_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='recurringsession',
+            name='creator',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='created_recurring_sessions', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='recurringsession',
+            name='group',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recurring_sessions', to='server.group'),
+        ),
+        migrations.AddField(
+            model_name='recurrenceexception',
+            name='rule',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exceptions', to='server.recurringsession'),
+        ),
+        migrations.AddField(
+            model_name='groupsession',
+            name='recurrence',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='occurrences', to='server.recurringsession'),
+        ),
+        migrations.AddConstraint(
+            model_name='groupsession',
+            constraint=models.UniqueConstraint(fields=('recurrence', 'occurrence_date'), name='server_gsession_occurrence_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='recurringsession',
+            index=models.Index(fields=['exhausted', 'credited_through'], name='server_recur_credit_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='recurrenceexception',
+            unique_together={('rule', 'date')},
+        ),
+    ]
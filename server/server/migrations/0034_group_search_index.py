@@ -0,0 +1,82 @@
+# Generated by Django 4.2.23 on 2026-10-18 15:02
+
+from django.db import OperationalError, migrations
+
+POSTGRES_FORWARD = [
+    "ALTER TABLE server_group ADD COLUMN search_vector tsvector",
+    """
+    CREATE FUNCTION server_group_search_vector() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' THEN
+            IF NEW.search_vector IS NOT NULL
+               AND NEW.group_name IS NOT DISTINCT FROM OLD.group_name
+               AND NEW.subject_code IS NOT DISTINCT FROM OLD.subject_code
+               AND NEW.course_name IS NOT DISTINCT FROM OLD.course_name
+               AND NEW.description IS NOT DISTINCT FROM OLD.description THEN
+                RETURN NEW;
+            END IF;
+        END IF;
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.group_name, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.subject_code, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.course_name, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(NEW.description, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER server_group_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON server_group
+    FOR EACH ROW EXECUTE FUNCTION server_group_search_vector()
+    """,
+    # Backfill: a NULL vector makes the trigger compute it.
+    "UPDATE server_group SET search_vector = NULL",
+    "CREATE INDEX server_group_search_idx ON server_group USING GIN (search_vector)",
+]
+
+POSTGRES_REVERSE = [
+    "DROP TRIGGER IF EXISTS server_group_search_vector_trigger ON server_group",
+    "DROP FUNCTION IF EXISTS server_group_search_vector()",
+    "DROP INDEX IF EXISTS server_group_search_idx",
+    "ALTER TABLE server_group DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS server_group_fts USING fts5("
+    "group_name, subject_code, course_name, description, tokenize='porter unicode61')",
+    "INSERT INTO server_group_fts (rowid, group_name, subject_code, course_name, description) "
+    "SELECT id, COALESCE(group_name, ''), COALESCE(subject_code, ''), COALESCE(course_name, ''), "
+    "COALESCE(description, '') FROM server_group",
+]
+
+SQLITE_REVERSE = [
+    "DROP TABLE IF EXISTS server_group_fts",
+]
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        try:
+            for sql in statements.get(vendor, []):
+                schema_editor.execute(sql)
+        except OperationalError:
+            # SQLite built without FTS5: search falls back to icontains.
+            if vendor != 'sqlite':
+                raise
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0033_calendar_feed'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD}),
+            run({'postgresql': POSTGRES_REVERSE, 'sqlite': SQLITE_REVERSE}),
+        ),
+    ]
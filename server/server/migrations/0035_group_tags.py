@@ -0,0 +1,71 @@
+# Generated by Django 4.2.23 on 2026-10-18 14:09
+
+import re
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+TAG_FIELDS = {'topic': 'tags', 'personality': 'group_personality'}
+
+
+def canonical_tags(value):
+    names = []
+    for part in (value or '').split(','):
+        name = re.sub(r'\s+', ' ', part).strip().lower()[:100]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def backfill_group_tags(apps, schema_editor):
+    Group = apps.get_model('server', 'Group')
+    Tag = apps.get_model('server', 'Tag')
+    GroupTag = apps.get_model('server', 'GroupTag')
+
+    pairs = set()
+    for row in Group.objects.values('id', *TAG_FIELDS.values()).iterator(chunk_size=2000):
+        for kind, field in TAG_FIELDS.items():
+            pairs.update((row['id'], kind, name) for name in canonical_tags(row[field]))
+    Tag.objects.bulk_create(
+        [Tag(kind=kind, name=name) for kind, name in {(kind, name) for _, kind, name in pairs}],
+        batch_size=1000, ignore_conflicts=True,
+    )
+    tag_ids = {(kind, name): tag_id for tag_id, kind, name in Tag.objects.values_list('id', 'kind', 'name')}
+    GroupTag.objects.bulk_create(
+        [GroupTag(group_id=group_id, tag_id=tag_ids[(kind, name)]) for group_id, kind, name in pairs],
+        batch_size=1000, ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0034_group_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('topic', 'Topic'), ('personality', 'Personality')], max_length=20)),
+                ('name', models.CharField(max_length=100)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'name'), name='server_tag_kind_name_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='GroupTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('group', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='group_tags', to='server.group')),
+                ('tag', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='group_tags', to='server.tag')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tag', 'group'], name='server_grouptag_tag_idx')],
+                'constraints': [models.UniqueConstraint(fields=('group', 'tag'), name='server_grouptag_group_tag_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_group_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.23 on 2026-10-18 14:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_group_stats(apps, schema_editor):
+    Group = apps.get_model('server', 'Group')
+    GroupRating = apps.get_model('server', 'GroupRating')
+    GroupStats = apps.get_model('server', 'GroupStats')
+
+    members = dict(
+        Group.members.through.objects.values('group_id').annotate(count=models.Count('*')).values_list('group_id', 'count')
+    )
+    ratings = {
+        group_id: (float(total), count)
+        for group_id, total, count in GroupRating.objects.order_by().values('group_id').annotate(
+            total=models.Sum('rating'), count=models.Count('*'),
+        ).values_list('group_id', 'total', 'count')
+    }
+    rows = []
+    for group_id in Group.objects.values_list('id', flat=True).iterator():
+        total, count = ratings.get(group_id, (0.0, 0))
+        rows.append(GroupStats(
+            group_id=group_id,
+            member_count=members.get(group_id, 0),
+            rating_sum=total,
+            rating_count=count,
+            rating_avg=total / count if count else 0,
+        ))
+    GroupStats.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0035_group_tags'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupStats',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='server.group')),
+                ('member_count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.FloatField(default=0)),
+                ('rating_count', models.PositiveIntegerField(default=0)),
+                ('rating_avg', models.FloatField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['member_count'], name='server_groupstats_members_idx'), models.Index(fields=['rating_avg'], name='server_groupstats_rating_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_group_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,96 @@
+# Generated by Django 4.2.23 on 2026-10-18 14:23
+
+from collections import defaultdict
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+TOP_K = 10
+MIN_SCORE = 10
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b)
+
+
+def score_pair(group, other):
+    score, factors = 0, {}
+    if group['subject_code'] == other['subject_code']:
+        score += 40
+        factors['subject_code'] = True
+    if group['topic'] and other['topic']:
+        factors['tags_overlap'] = jaccard(group['topic'], other['topic'])
+        score += factors['tags_overlap'] * 25
+    if group['personality'] and other['personality']:
+        factors['personality_overlap'] = jaccard(group['personality'], other['personality'])
+        score += factors['personality_overlap'] * 20
+    if group['year_level'] == other['year_level']:
+        score += 10
+        factors['year_level'] = True
+    if group['meeting_format'] == other['meeting_format']:
+        score += 5
+        factors['meeting_format'] = True
+    return score, factors
+
+
+def backfill_similar_groups(apps, schema_editor):
+    Group = apps.get_model('server', 'Group')
+    GroupTag = apps.get_model('server', 'GroupTag')
+    SimilarGroup = apps.get_model('server', 'SimilarGroup')
+
+    groups = {
+        row['id']: {**row, 'topic': set(), 'personality': set()}
+        for row in Group.objects.values('id', 'subject_code', 'year_level', 'meeting_format')
+    }
+    for group_id, tag_id, kind in GroupTag.objects.values_list('group_id', 'tag_id', 'tag__kind'):
+        groups[group_id][kind].add(tag_id)
+
+    # Only groups sharing a subject, a tag, or both year and format can score above MIN_SCORE.
+    buckets = defaultdict(set)
+    for group in groups.values():
+        buckets['subject', group['subject_code']].add(group['id'])
+        buckets['year_format', group['year_level'], group['meeting_format']].add(group['id'])
+        for tag_id in group['topic'] | group['personality']:
+            buckets['tag', tag_id].add(group['id'])
+
+    rows = []
+    for group in groups.values():
+        candidates = buckets['subject', group['subject_code']] | buckets['year_format', group['year_level'], group['meeting_format']]
+        for tag_id in group['topic'] | group['personality']:
+            candidates |= buckets['tag', tag_id]
+        matches = []
+        for other_id in candidates - {group['id']}:
+            score, factors = score_pair(group, groups[other_id])
+            if score > MIN_SCORE:
+                matches.append((-score, other_id, factors))
+        for negative_score, other_id, factors in sorted(matches, key=lambda match: match[:2])[:TOP_K]:
+            rows.append(SimilarGroup(group_id=group['id'], other_id=other_id, score=-negative_score, factors=factors))
+    SimilarGroup.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0036_group_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarGroup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('factors', models.JSONField(default=dict)),
+                ('group', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='similar_groups', to='server.group')),
+                ('other', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_to', to='server.group')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['group', '-score'], name='server_similargroup_rank_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='similargroup',
+            constraint=models.UniqueConstraint(fields=('group', 'other'), name='server_similargroup_pair_uniq'),
+        ),
+        migrations.RunPython(backfill_similar_groups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.23 on 2026-10-18 14:33
+
+import hashlib
+import random
+import struct
+from collections import defaultdict
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Must match server/minhash.py.
+NUM_HASHES = 32
+BAND_ROWS = 2
+PRIME = (1 << 61) - 1
+_rng = random.Random(0x6d696e68)
+HASH_COEFFICIENTS = [(_rng.randrange(1, PRIME), _rng.randrange(PRIME)) for _ in range(NUM_HASHES)]
+
+
+def backfill_signatures(apps, schema_editor):
+    GroupTag = apps.get_model('server', 'GroupTag')
+    GroupSignature = apps.get_model('server', 'GroupSignature')
+    GroupBucket = apps.get_model('server', 'GroupBucket')
+
+    tokens = defaultdict(set)
+    for group_id, tag_id in GroupTag.objects.values_list('group_id', 'tag_id'):
+        tokens[group_id].add(tag_id)
+
+    signatures, buckets = [], []
+    for group_id, tag_ids in tokens.items():
+        values = [min((a * tag_id + b) % PRIME for tag_id in tag_ids) & 0xFFFFFFFF for a, b in HASH_COEFFICIENTS]
+        signatures.append(GroupSignature(group_id=group_id, signature=struct.pack(f'<{NUM_HASHES}I', *values)))
+        for band, start in enumerate(range(0, NUM_HASHES, BAND_ROWS)):
+            digest = hashlib.blake2b(struct.pack(f'<{BAND_ROWS}I', *values[start:start + BAND_ROWS]), digest_size=8).digest()
+            buckets.append(GroupBucket(group_id=group_id, band=band, bucket=int.from_bytes(digest, 'big', signed=True)))
+    GroupSignature.objects.bulk_create(signatures, batch_size=1000)
+    GroupBucket.objects.bulk_create(buckets, batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0037_similar_groups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupSignature',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='signature', serialize=False, to='server.group')),
+                ('signature', models.BinaryField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='GroupBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('bucket', models.BigIntegerField()),
+                ('group', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='server.group')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['band', 'bucket', 'group'], name='server_groupbucket_bucket_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='groupbucket',
+            constraint=models.UniqueConstraint(fields=('group', 'band'), name='server_groupbucket_group_band_uniq'),
+        ),
+        migrations.RunPython(backfill_signatures, migrations.RunPython.noop),
+    ]
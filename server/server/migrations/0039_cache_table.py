@@ -0,0 +1,21 @@
+# Generated by Django 4.2.23 on 2026-10-18 15:02
+
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_table(apps, schema_editor):
+    # Creates the DatabaseCache table named in settings.CACHES (nothing to do
+    # when Redis is configured); safe to run again on every migrate.
+    call_command('createcachetable', database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0038_group_minhash'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_table, migrations.RunPython.noop),
+    ]
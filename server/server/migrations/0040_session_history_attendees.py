@@ -0,0 +1,53 @@
+# Generated by Django 4.2.23 on 2026-10-18 14:52
+
+import struct
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def unpack_attendee_ids(apps, schema_editor):
+    # attendee_ids held sorted little-endian uint32s (the removed pack_ids()).
+    SessionHistory = apps.get_model('server', 'SessionHistory')
+    SessionHistoryAttendee = apps.get_model('server', 'SessionHistoryAttendee')
+    rows = []
+    for history_id, packed in SessionHistory.objects.filter(attendee_count__gt=0).values_list('id', 'attendee_ids').iterator():
+        data = bytes(packed or b'')
+        rows.extend(
+            SessionHistoryAttendee(history_id=history_id, user_id=user_id)
+            for user_id in struct.unpack(f'<{len(data) // 4}I', data)
+        )
+        if len(rows) >= 5000:
+            SessionHistoryAttendee.objects.bulk_create(rows)
+            rows = []
+    SessionHistoryAttendee.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0039_cache_table'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionHistoryAttendee',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.PositiveBigIntegerField()),
+                ('history', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendees', to='server.sessionhistory')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user_id', 'history'], name='server_shattendee_user_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='sessionhistoryattendee',
+            constraint=models.UniqueConstraint(fields=('history', 'user_id'), name='server_shattendee_uniq'),
+        ),
+        migrations.RunPython(unpack_attendee_ids, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='sessionhistory',
+            name='attendee_ids',
+        ),
+    ]
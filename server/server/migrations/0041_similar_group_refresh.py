@@ -0,0 +1,24 @@
+# Generated by Django 4.2.23 on 2026-10-18 15:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0040_session_history_attendees'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarGroupRefresh',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='similar_refresh', serialize=False, to='server.group')),
+                ('queued_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['queued_at'], name='server_simrefresh_queued_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.23 on 2026-10-18 15:10
+
+import hashlib
+import random
+import struct
+from collections import defaultdict
+
+from django.db import migrations
+
+# Must match server/minhash.py.
+NUM_HASHES = 32
+BAND_ROWS = 2
+PRIME = (1 << 61) - 1
+_rng = random.Random(0x6d696e68)
+HASH_COEFFICIENTS = [(_rng.randrange(1, PRIME), _rng.randrange(PRIME)) for _ in range(NUM_HASHES)]
+
+
+def mix(tag_id):
+    return int.from_bytes(hashlib.blake2b(struct.pack('<q', tag_id), digest_size=8).digest(), 'big')
+
+
+def recompute_signatures(apps, schema_editor):
+    GroupTag = apps.get_model('server', 'GroupTag')
+    GroupSignature = apps.get_model('server', 'GroupSignature')
+    GroupBucket = apps.get_model('server', 'GroupBucket')
+
+    tokens = defaultdict(set)
+    for group_id, tag_id in GroupTag.objects.values_list('group_id', 'tag_id'):
+        tokens[group_id].add(mix(tag_id))
+
+    signatures, buckets = [], []
+    for group_id, mixed in tokens.items():
+        values = [min((a * token + b) % PRIME for token in mixed) & 0xFFFFFFFF for a, b in HASH_COEFFICIENTS]
+        signatures.append(GroupSignature(group_id=group_id, signature=struct.pack(f'<{NUM_HASHES}I', *values)))
+        for band, start in enumerate(range(0, NUM_HASHES, BAND_ROWS)):
+            digest = hashlib.blake2b(struct.pack(f'<{BAND_ROWS}I', *values[start:start + BAND_ROWS]), digest_size=8).digest()
+            buckets.append(GroupBucket(group_id=group_id, band=band, bucket=int.from_bytes(digest, 'big', signed=True)))
+    GroupSignature.objects.all().delete()
+    GroupBucket.objects.all().delete()
+    GroupSignature.objects.bulk_create(signatures, batch_size=1000)
+    GroupBucket.objects.bulk_create(buckets, batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0041_similar_group_refresh'),
+    ]
+
+    operations = [
+        migrations.RunPython(recompute_signatures, migrations.RunPython.noop),
+    ]
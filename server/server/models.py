@@ -1,9 +1,36 @@
-from django.db import models
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
+from datetime import datetime
+import pytz
+import random
+import secrets
 import uuid
 from storages.backends.s3boto3 import S3Boto3Storage
 from .storage import CustomS3Storage
 
+# Session dates and times are entered as Melbourne wall-clock values.
+SESSION_TIME_ZONE = pytz.timezone('Australia/Sydney')
+
+def session_bounds(session_date, start_time, end_time):
+    """Return timezone-aware (starts_at, ends_at) for a session's local date and times."""
+    return (
+        SESSION_TIME_ZONE.localize(datetime.combine(session_date, start_time)),
+        SESSION_TIME_ZONE.localize(datetime.combine(session_date, end_time)),
+    )
+
+def session_hours(starts_at, ends_at):
+    """Length of a session in hours, never negative."""
+    if starts_at is None or ends_at is None:
+        return 0
+    return max(0, (ends_at - starts_at).total_seconds() / 3600)
+
+def generate_feed_token():
+    return secrets.token_urlsafe(32)
+
 class UserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
         if not email:
@@ -99,10 +126,127 @@ class Group(models.Model):
     members = models.ManyToManyField(User, related_name='joined_groups', blank=True)
     target_hours = models.PositiveIntegerField(default=10)  # Renamed from target_study_hours
     total_study_hours = models.FloatField(default=0)
+    # Bumped whenever the group's sessions or recurring sessions change, so
+    # calendar feeds can answer conditional requests without reading them.
+    sessions_updated_at = models.DateTimeField(default=timezone.now, editable=False)
 
     def __str__(self):
         return self.group_name
 
+    def save(self, *args, **kwargs):
+        if kwargs.get('update_fields') is None:
+            # Group details appear in calendar feeds, and a full save would
+            # otherwise write back a stale stamp.
+            self.sessions_updated_at = timezone.now()
+        super().save(*args, **kwargs)
+
+class Tag(models.Model):
+    """A canonical (lowercased, whitespace-collapsed) group tag of one kind."""
+    TOPIC = 'topic'
+    PERSONALITY = 'personality'
+    KIND_CHOICES = [(TOPIC, 'Topic'), (PERSONALITY, 'Personality')]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'name'], name='server_tag_kind_name_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}:{self.name}"
+
+class GroupTag(models.Model):
+    """
+    Normalized copy of Group.tags / Group.group_personality, kept in sync by
+    the Group post_save signal. The strings stay the API representation.
+    """
+    # The composite unique constraint and index below cover both foreign keys.
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, related_name='group_tags', db_index=False)
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='group_tags', db_index=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['group', 'tag'], name='server_grouptag_group_tag_uniq'),
+        ]
+        indexes = [
+            # Tag filters look groups up by tag.
+            models.Index(fields=['tag', 'group'], name='server_grouptag_tag_idx'),
+        ]
+
+class SimilarGroup(models.Model):
+    """
+    One of a group's top-k most similar groups, precomputed by similarity.py
+    and kept current through SimilarGroupRefresh. The detail page reads a group's
+    rows best first through the (group, score) index.
+    """
+    # The unique constraint and index below both lead with group.
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, related_name='similar_groups', db_index=False)
+    other = models.ForeignKey(Group, on_delete=models.CASCADE, related_name='similar_to')
+    score = models.FloatField()
+    factors = models.JSONField(default=dict)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['group', 'other'], name='server_similargroup_pair_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['group', '-score'], name='server_similargroup_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.group_id} ~ {self.other_id} ({self.score:.1f})"
+
+class SimilarGroupRefresh(models.Model):
+    """
+    A group whose similar groups need rescoring. The Group signals queue it
+    and the scheduler's refresh_similar_groups task drains the queue, so
+    saving a group never scores the catalogue inside the request.
+    """
+    group = models.OneToOneField(Group, on_delete=models.CASCADE, primary_key=True, related_name='similar_refresh')
+    queued_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['queued_at'], name='server_simrefresh_queued_idx'),
+        ]
+
+    def __str__(self):
+        return f"Rescore {self.group_id} (queued {self.queued_at})"
+
+class GroupSignature(models.Model):
+    """
+    MinHash signature of a group's topic and personality tag ids, packed as
+    little-endian uint32s (see minhash.py). Groups without tags have no row.
+    """
+    group = models.OneToOneField(Group, on_delete=models.CASCADE, primary_key=True, related_name='signature')
+    signature = models.BinaryField()
+
+    def __str__(self):
+        return f"Signature of {self.group_id}"
+
+class GroupBucket(models.Model):
+    """
+    One LSH band of a group's signature, hashed to a bucket. Groups sharing
+    a (band, bucket) pair are likely to share tags; see minhash.py.
+    """
+    # The unique constraint leads with group; lookups go through the bucket index.
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, related_name='lsh_buckets', db_index=False)
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['group', 'band'], name='server_groupbucket_group_band_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['band', 'bucket', 'group'], name='server_groupbucket_bucket_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.group_id} in band {self.band} bucket {self.bucket}"
+
 class FlashcardFolder(models.Model):
     name = models.CharField(max_length=255)
     creator = models.ForeignKey(User, on_delete=models.CASCADE, related_name='flashcard_folders')
@@ -115,6 +259,9 @@ class FlashcardFolder(models.Model):
 
     @property
     def flashcard_count(self):
+        # Listings annotate flashcard_total instead of counting per folder
+        if hasattr(self, 'flashcard_total'):
+            return self.flashcard_total
         return self.flashcards.count()
 
 class Flashcard(models.Model):
@@ -145,6 +292,10 @@ class GroupSession(models.Model):
     date = models.DateField()
     start_time = models.TimeField()
     end_time = models.TimeField()
+    # Denormalized from date/start_time/end_time on save so "upcoming" and
+    # "past" are single range scans on an aware datetime.
+    starts_at = models.DateTimeField(editable=False)
+    ends_at = models.DateTimeField(editable=False)
     location = models.CharField(max_length=255)
     meeting_format = models.CharField(max_length=100, blank=True, default="")
     description = models.TextField(blank=True)
@@ -152,10 +303,122 @@ class GroupSession(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     attendees = models.ManyToManyField(User, related_name='joined_sessions', blank=True)
+    # Maintained with F() updates by session_attendance.join/leave, never by save().
+    attendee_count = models.PositiveIntegerField(default=0, editable=False)
+    # Set when this row is a materialized occurrence of a recurring session.
+    recurrence = models.ForeignKey('RecurringSession', on_delete=models.SET_NULL, null=True, blank=True, related_name='occurrences')
+    occurrence_date = models.DateField(null=True, blank=True)
+    # Set once attendees have been reminded (see reminders.py); cleared when the time changes.
+    reminder_sent_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Upcoming sessions of a group: group = X AND ends_at >= now
+            models.Index(fields=['group', 'ends_at'], name='server_gsession_group_end_idx'),
+            # Expiry across all groups: ends_at < now
+            models.Index(fields=['ends_at'], name='server_gsession_end_idx'),
+            # Reminder scan: unreminded sessions with starts_at in (now, now + window]
+            models.Index(fields=['starts_at'], name='server_gsession_remind_idx', condition=models.Q(reminder_sent_at__isnull=True)),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['recurrence', 'occurrence_date'], name='server_gsession_occurrence_uniq'),
+        ]
 
     def __str__(self):
         return f"Session for {self.group.group_name} on {self.date} from {self.start_time} to {self.end_time}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored bounds so saves can apply duration deltas to GroupStudyProgress.
+        instance._loaded_bounds = (instance.__dict__.get('starts_at'), instance.__dict__.get('ends_at'))
+        return instance
+
+    @property
+    def duration_hours(self):
+        return session_hours(self.starts_at, self.ends_at)
+
+    def refresh_bounds(self):
+        self.starts_at, self.ends_at = session_bounds(self.date, self.start_time, self.end_time)
+
+    def save(self, *args, **kwargs):
+        self.refresh_bounds()
+        rescheduled = not self._state.adding and getattr(self, '_loaded_bounds', None) != (self.starts_at, self.ends_at)
+        if rescheduled:
+            self.reminder_sent_at = None
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'starts_at', 'ends_at'} | ({'reminder_sent_at'} if rescheduled else set())
+        elif not self._state.adding:
+            # A full save must not write back a stale attendee_count (or
+            # reminder marker) over a concurrent join/leave or reminder run.
+            skipped = {'attendee_count'} if rescheduled else {'attendee_count', 'reminder_sent_at'}
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields if not f.primary_key and f.name not in skipped
+            ]
+        super().save(*args, **kwargs)
+
+class RecurringSession(models.Model):
+    """
+    A session that repeats on an RRULE-style schedule (FREQ, INTERVAL, BYDAY,
+    UNTIL, COUNT). Occurrences are expanded on demand by recurrence.py and
+    only become GroupSession rows when someone RSVPs, so storage grows with
+    the number of rules rather than the number of meetings.
+    """
+    DAILY = 'DAILY'
+    WEEKLY = 'WEEKLY'
+    MONTHLY = 'MONTHLY'
+    FREQUENCY_CHOICES = [(DAILY, 'Daily'), (WEEKLY, 'Weekly'), (MONTHLY, 'Monthly')]
+
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, related_name='recurring_sessions')
+    creator = models.ForeignKey(User, on_delete=models.CASCADE, related_name='created_recurring_sessions')
+    topic = models.CharField(max_length=255, blank=True, default="")
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    location = models.CharField(max_length=255)
+    meeting_format = models.CharField(max_length=100, blank=True, default="")
+    description = models.TextField(blank=True)
+    extra_details = models.TextField(blank=True, default="")
+    frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES, default=WEEKLY)
+    interval = models.PositiveSmallIntegerField(default=1)
+    by_weekday = models.CharField(max_length=20, blank=True, default="", help_text="Comma-separated weekdays, Monday=0 (weekly rules only)")
+    starts_on = models.DateField()
+    until = models.DateField(null=True, blank=True)
+    count = models.PositiveIntegerField(null=True, blank=True)
+    # Occurrences ending before this have been credited to group progress.
+    credited_through = models.DateTimeField(default=timezone.now)
+    exhausted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['exhausted', 'credited_through'], name='server_recur_credit_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.frequency.title()} session for {self.group.group_name} from {self.starts_on}"
+
+    @property
+    def weekdays(self):
+        days = sorted({int(d) for d in self.by_weekday.split(',') if d.strip() != ''})
+        return days or [self.starts_on.weekday()]
+
+class RecurrenceException(models.Model):
+    """
+    An occurrence removed from its rule's expansion: either cancelled, or
+    materialized as a GroupSession (which then stands on its own).
+    """
+    rule = models.ForeignKey(RecurringSession, on_delete=models.CASCADE, related_name='exceptions')
+    date = models.DateField()
+    materialized = models.BooleanField(default=False)
+
+    class Meta:
+        unique_together = ('rule', 'date')
+
+    def __str__(self):
+        return f"{'Materialized' if self.materialized else 'Cancelled'} {self.date} of rule {self.rule_id}"
+
 class GroupFile(models.Model):
     group = models.ForeignKey(Group, on_delete=models.CASCADE, related_name='files')
     uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='uploaded_files')
@@ -176,18 +439,173 @@ class GroupFile(models.Model):
             size /= 1024.0
         return f"{size:.1f} TB"
 
+class GroupStudyProgress(models.Model):
+    """
+    Study-hour totals per group, maintained incrementally as sessions are
+    created, edited, deleted and expired. Scheduled totals cover sessions that
+    still exist; completed totals cover expired ones.
+    """
+    group = models.OneToOneField(Group, on_delete=models.CASCADE, primary_key=True, related_name='study_progress')
+    completed_hours = models.FloatField(default=0)
+    completed_sessions = models.PositiveIntegerField(default=0)
+    scheduled_hours = models.FloatField(default=0)
+    scheduled_sessions = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Progress for {self.group_id}: {self.completed_hours:.2f}h completed, {self.scheduled_hours:.2f}h scheduled"
+
+class GroupStats(models.Model):
+    """
+    Member and rating counters per group, maintained from membership and
+    rating signals so listing and sorting groups never aggregates the join
+    tables. member_count counts membership rows (the creator is added on top
+    when they are not a member). rating_avg is stored alongside the sum and
+    count so the rating sort can use an index; it is 0 while unrated.
+    """
+    group = models.OneToOneField(Group, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    member_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.FloatField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_avg = models.FloatField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['member_count'], name='server_groupstats_members_idx'),
+            models.Index(fields=['rating_avg'], name='server_groupstats_rating_idx'),
+        ]
+
+    @property
+    def average_rating(self):
+        return self.rating_avg if self.rating_count else None
+
+    def __str__(self):
+        return f"Stats for {self.group_id}: {self.member_count} members, {self.rating_count} ratings"
+
+class SessionHistory(models.Model):
+    """
+    Append-only archive of expired sessions. Only the columns needed for
+    aggregates are kept; attendees are SessionHistoryAttendee rows, two
+    integers each, so per-user aggregates are indexed queries.
+    """
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, related_name='session_history')
+    session_id = models.PositiveBigIntegerField()
+    starts_at = models.DateTimeField()
+    ends_at = models.DateTimeField()
+    duration_hours = models.FloatField()
+    attendee_count = models.PositiveIntegerField(default=0)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['group', 'starts_at'], name='server_shistory_group_idx'),
+            models.Index(fields=['starts_at'], name='server_shistory_start_idx'),
+        ]
+
+    def __str__(self):
+        return f"Session {self.session_id} of group {self.group_id} at {self.starts_at} ({self.attendee_count} attendees)"
+
+    @property
+    def attendee_id_list(self):
+        return sorted(self.attendees.values_list('user_id', flat=True))
+
+    def attended_by(self, user_id):
+        return self.attendees.filter(user_id=user_id).exists()
+
+class SessionHistoryAttendee(models.Model):
+    """
+    One attendee of an archived session. user_id is a plain id, like
+    SessionHistory.session_id, so history outlives deleted accounts.
+    """
+    history = models.ForeignKey(SessionHistory, on_delete=models.CASCADE, related_name='attendees')
+    user_id = models.PositiveBigIntegerField()
+
+    class Meta:
+        indexes = [
+            # Per-user aggregates: user_id = X, then join to the history row
+            models.Index(fields=['user_id', 'history'], name='server_shattendee_user_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['history', 'user_id'], name='server_shattendee_uniq'),
+        ]
+
+    def __str__(self):
+        return f"User {self.user_id} attended session {self.history_id}"
+
 class CompletedSessionCounter(models.Model):
+    """
+    Number of completed sessions, spread over COMPLETED_SESSION_COUNTER_SHARDS
+    rows (pk 1..N) so concurrent writers rarely contend for the same row.
+    Increments are single atomic UPDATEs; the total is the sum of the shards
+    and is cached for COMPLETED_SESSION_COUNTER_CACHE_SECONDS.
+    """
+    CACHE_KEY = 'completed_session_counter_total'
+
     count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
-        return f"Completed Sessions: {self.count}"
+        return f"Completed Sessions (shard {self.pk}): {self.count}"
+
+    @classmethod
+    def shard_count(cls):
+        return max(1, getattr(settings, 'COMPLETED_SESSION_COUNTER_SHARDS', 1))
 
     @classmethod
     def increment(cls, amount=1):
-        obj, _ = cls.objects.get_or_create(pk=1)
-        obj.count += amount
-        obj.save()
-        return obj.count
+        """Atomically add ``amount`` to a random shard. Returns the shard's pk."""
+        shard = random.randint(1, cls.shard_count())
+        if not cls.objects.filter(pk=shard).update(count=F('count') + amount):
+            try:
+                with transaction.atomic():
+                    cls.objects.create(pk=shard, count=amount)
+            except IntegrityError:
+                # Another writer created the shard first; it exists now.
+                cls.objects.filter(pk=shard).update(count=F('count') + amount)
+        # The cache is shared (settings.CACHES), so every process rereads the total.
+        transaction.on_commit(lambda: cache.delete(cls.CACHE_KEY))
+        return shard
+
+    @classmethod
+    def total(cls):
+        total = cache.get(cls.CACHE_KEY)
+        if total is None:
+            total = cls.objects.aggregate(total=Sum('count'))['total'] or 0
+            cache.set(cls.CACHE_KEY, total, getattr(settings, 'COMPLETED_SESSION_COUNTER_CACHE_SECONDS', 60))
+        return total
+
+class UserNotification(models.Model):
+    """A notification addressed to one user (session reminders and the like)."""
+    REMINDER = 'reminder'
+    KIND_CHOICES = [(REMINDER, 'Session reminder')]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
+    session = models.ForeignKey(GroupSession, on_delete=models.SET_NULL, null=True, blank=True, related_name='user_notifications')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default=REMINDER)
+    message = models.TextField()
+    is_read = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='server_unotif_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"Notification for {self.user_id}: {self.message[:30]}"
+
+class CalendarFeedToken(models.Model):
+    """Secret that authenticates a user's iCalendar feed URL (calendar apps cannot send JWTs)."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='calendar_token')
+    token = models.CharField(max_length=64, unique=True, default=generate_feed_token)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Calendar feed token for {self.user.email}"
+
+    def rotate(self):
+        self.token = generate_feed_token()
+        self.created_at = timezone.now()
+        self.save(update_fields=['token', 'created_at'])
 
 class GroupNotification(models.Model):
     group = models.ForeignKey(Group, on_delete=models.CASCADE, related_name='notifications')
@@ -218,6 +636,13 @@ class GroupRating(models.Model):
         unique_together = ['user', 'group']
         ordering = ['-created_at']
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored rating so saves can apply the change to GroupStats.
+        instance._loaded_rating = instance.__dict__.get('rating')
+        return instance
+
     def __str__(self):
         return f"{self.user.name} rated {self.group.group_name} {self.rating}/5"
 
@@ -272,3 +697,26 @@ class Report(models.Model):
 
     def __str__(self):
         return f"{self.type} report (ID {self.target_id}) - {self.status}";
+
+class SchedulerLease(models.Model):
+    """Leader-election lease for the background scheduler; only the holder runs tasks."""
+    name = models.CharField(max_length=100, unique=True)
+    holder = models.CharField(max_length=255, blank=True, default="")
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.name} held by {self.holder or 'nobody'} until {self.expires_at}"
+
+class ScheduledTaskState(models.Model):
+    """Last-run statistics for a periodic task, published by the scheduler."""
+    name = models.CharField(max_length=100, unique=True)
+    last_started_at = models.DateTimeField(null=True, blank=True)
+    last_duration_ms = models.FloatField(default=0)
+    last_lag_ms = models.FloatField(default=0)
+    last_result = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+    last_holder = models.CharField(max_length=255, blank=True, default="")
+    run_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.run_count} run(s), last at {self.last_started_at}"
@@ -0,0 +1,94 @@
+"""
+Keyset (cursor) pagination helpers.
+
+A cursor is the ordering values of the last row on the previous page,
+encoded as URL-safe base64 JSON. The next page continues with a range
+condition on those values rather than an OFFSET, so every page costs the
+same however deep the client has scrolled and rows inserted before the
+cursor never shift later pages. The last ordering field must be unique
+(normally the primary key) so ties are broken deterministically.
+"""
+import base64
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _field_name(ordering_field):
+    return ordering_field.lstrip('-')
+
+
+def _to_json(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def encode_cursor(values):
+    raw = json.dumps([_to_json(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, model, ordering):
+    """Decode ``cursor`` into Python values for ``ordering``; raises InvalidCursor."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidCursor('Malformed cursor')
+    if not isinstance(values, list) or len(values) != len(ordering):
+        raise InvalidCursor('Cursor does not match this ordering')
+    decoded = []
+    for ordering_field, value in zip(ordering, values):
+        try:
+            field = model._meta.get_field(_field_name(ordering_field))
+        except FieldDoesNotExist:
+            # Annotations keep their JSON value (numbers and strings compare as-is).
+            decoded.append(value)
+            continue
+        try:
+            decoded.append(field.to_python(value))
+        except ValidationError:
+            raise InvalidCursor('Malformed cursor')
+    return decoded
+
+
+def keyset_filter(ordering, values):
+    """Q selecting rows strictly after ``values`` in ``ordering`` (fields may be prefixed with '-')."""
+    condition = Q()
+    for i, ordering_field in enumerate(ordering):
+        name = _field_name(ordering_field)
+        lookup = 'lt' if ordering_field.startswith('-') else 'gt'
+        term = Q(**{f'{name}__{lookup}': values[i]})
+        for prev_field, prev_value in zip(ordering[:i], values[:i]):
+            term &= Q(**{_field_name(prev_field): prev_value})
+        condition |= term
+    return condition
+
+
+def paginate_keyset(queryset, ordering, cursor=None, page_size=50):
+    """
+    Return (rows, next_cursor) for one page of ``queryset`` ordered by
+    ``ordering``. next_cursor is None on the last page. Costs one query.
+    """
+    if cursor:
+        queryset = queryset.filter(keyset_filter(ordering, decode_cursor(cursor, queryset.model, ordering)))
+    rows = list(queryset.order_by(*ordering)[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, _field_name(f)) for f in ordering])
+    return rows, next_cursor
+
+
+def page_size_param(request, default=50, maximum=200):
+    """Read ?page_size=, clamped to [1, maximum]; invalid values fall back to ``default``."""
+    try:
+        size = int(request.query_params.get('page_size', default))
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, maximum))
@@ -0,0 +1,233 @@
+"""
+Lazy expansion of recurring sessions.
+
+A RecurringSession stores the rule once; occurrences are computed for the
+window being viewed. Expansion jumps straight to the first period in the
+window (daily/weekly rules need no iteration from the series start, even
+with COUNT), so its cost depends on the window size, not on how long the
+rule has been running. An occurrence becomes a GroupSession only when
+someone RSVPs (materialize()), and elapsed virtual occurrences are credited
+to group progress per rule by credit_elapsed_occurrences().
+"""
+import calendar
+import logging
+from datetime import date, timedelta
+from functools import lru_cache
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import (
+    SESSION_TIME_ZONE, CompletedSessionCounter, GroupNotification, GroupSession, RecurrenceException,
+    RecurringSession, session_bounds, session_hours,
+)
+from .session_expiry import credit_groups
+
+logger = logging.getLogger(__name__)
+
+WEEKDAY_CODES = ['MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU']
+
+
+def as_rrule(rule):
+    """Render the rule as an RFC 5545 RRULE string."""
+    parts = [f"FREQ={rule.frequency}", f"INTERVAL={rule.interval}"]
+    if rule.frequency == RecurringSession.WEEKLY:
+        parts.append('BYDAY=' + ','.join(WEEKDAY_CODES[d] for d in rule.weekdays))
+    if rule.until:
+        parts.append(f"UNTIL={rule.until:%Y%m%d}")
+    if rule.count:
+        parts.append(f"COUNT={rule.count}")
+    return ';'.join(parts)
+
+
+def _daily(rule, from_date):
+    step = rule.interval
+    k = max(0, -(-(from_date - rule.starts_on).days // step))
+    while True:
+        yield k, rule.starts_on + timedelta(days=k * step)
+        k += 1
+
+
+def _weekly(rule, from_date):
+    days = rule.weekdays
+    week0 = rule.starts_on - timedelta(days=rule.starts_on.weekday())
+    skipped_first = sum(1 for d in days if d < rule.starts_on.weekday())
+    period = max(0, (from_date - week0).days // (7 * rule.interval))
+    while True:
+        week_start = week0 + timedelta(weeks=period * rule.interval)
+        index = period * len(days) - (skipped_first if period else 0)
+        for d in days:
+            if period == 0 and d < rule.starts_on.weekday():
+                continue
+            yield index, week_start + timedelta(days=d)
+            index += 1
+        period += 1
+
+
+def _monthly(rule, from_date):
+    # Months without the start day are skipped (as RFC 5545 does), so the
+    # series index has to be counted from the start when COUNT is set.
+    start = rule.starts_on
+    period = 0
+    if not rule.count:
+        months = (from_date.year - start.year) * 12 + from_date.month - start.month
+        period = max(0, months // rule.interval)
+    index = 0
+    while True:
+        month = start.month - 1 + period * rule.interval
+        year, month = start.year + month // 12, month % 12 + 1
+        if start.day <= calendar.monthrange(year, month)[1]:
+            yield index, date(year, month, start.day)
+            index += 1
+        period += 1
+
+
+EXPANDERS = {
+    RecurringSession.DAILY: _daily,
+    RecurringSession.WEEKLY: _weekly,
+    RecurringSession.MONTHLY: _monthly,
+}
+
+
+def occurrence_dates(rule, start_date, end_date, excluded=()):
+    """Dates of the rule's occurrences in [start_date, end_date], minus ``excluded``."""
+    dates = []
+    for index, occurrence in EXPANDERS[rule.frequency](rule, max(start_date, rule.starts_on)):
+        if occurrence > end_date or (rule.until and occurrence > rule.until) or (rule.count and index >= rule.count):
+            break
+        if occurrence >= start_date and occurrence not in excluded:
+            dates.append(occurrence)
+    return dates
+
+
+def is_occurrence(rule, occurrence):
+    return occurrence in occurrence_dates(rule, occurrence, occurrence)
+
+
+def last_occurrence(rule):
+    """
+    The final occurrence date of a bounded rule (or UNTIL when that comes
+    first, an upper bound), or None if the rule repeats forever.
+    """
+    if rule.count:
+        for index, occurrence in EXPANDERS[rule.frequency](rule, rule.starts_on):
+            if index == rule.count - 1 or (rule.until and occurrence > rule.until):
+                return min(occurrence, rule.until) if rule.until else occurrence
+    return rule.until
+
+
+def _local_dates(start, end):
+    """Local calendar dates that can hold sessions overlapping the aware [start, end) range."""
+    return start.astimezone(SESSION_TIME_ZONE).date(), end.astimezone(SESSION_TIME_ZONE).date()
+
+
+@lru_cache(maxsize=16384)
+def _bounds(occurrence, start_time, end_time):
+    # Localizing is the bulk of expansion cost; rules sharing a time slot
+    # repeat the same (date, time) pairs across a window.
+    return session_bounds(occurrence, start_time, end_time)
+
+
+def expand(rules, start, end):
+    """
+    Virtual occurrences of ``rules`` overlapping the aware [start, end) window,
+    as (rule, date, starts_at, ends_at) sorted by start. Rules should be
+    fetched with prefetch_related('exceptions').
+    """
+    start_date, end_date = _local_dates(start, end)
+    occurrences = []
+    for rule in rules:
+        excluded = {e.date for e in rule.exceptions.all()}
+        for occurrence in occurrence_dates(rule, start_date, end_date, excluded):
+            starts_at, ends_at = _bounds(occurrence, rule.start_time, rule.end_time)
+            if ends_at >= start and starts_at < end:
+                occurrences.append((rule, occurrence, starts_at, ends_at))
+    occurrences.sort(key=lambda o: (o[2], o[0].id))
+    return occurrences
+
+
+def materialize(rule, occurrence):
+    """
+    Return the GroupSession for ``occurrence`` of ``rule``, creating it (and
+    detaching the date from the rule's expansion) on first use. Raises
+    ValueError if the date is not an occurrence, was cancelled or has already
+    ended (elapsed occurrences are credited by credit_elapsed_occurrences()).
+    """
+    existing = GroupSession.objects.filter(recurrence=rule, occurrence_date=occurrence).first()
+    if existing:
+        return existing
+    if not is_occurrence(rule, occurrence) or RecurrenceException.objects.filter(rule=rule, date=occurrence).exists():
+        raise ValueError(f"{occurrence} is not an occurrence of this session")
+    if session_bounds(occurrence, rule.start_time, rule.end_time)[1] <= timezone.now():
+        raise ValueError(f"The session on {occurrence} has already ended")
+    try:
+        with transaction.atomic():
+            RecurrenceException.objects.create(rule=rule, date=occurrence, materialized=True)
+            return GroupSession.objects.create(
+                group_id=rule.group_id,
+                creator_id=rule.creator_id,
+                recurrence=rule,
+                occurrence_date=occurrence,
+                topic=rule.topic,
+                date=occurrence,
+                start_time=rule.start_time,
+                end_time=rule.end_time,
+                location=rule.location,
+                meeting_format=rule.meeting_format,
+                description=rule.description,
+                extra_details=rule.extra_details,
+            )
+    except IntegrityError:
+        # A concurrent RSVP materialized it first.
+        return GroupSession.objects.get(recurrence=rule, occurrence_date=occurrence)
+
+
+def credit_elapsed_occurrences(now=None):
+    """
+    Credit virtual occurrences that ended since each rule's credited_through
+    watermark to their group's study hours, then advance the watermarks.
+    Work is per rule plus the occurrences elapsed since the last run, and the
+    number of queries is constant. Returns the number of occurrences credited.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        rules = list(
+            RecurringSession.objects
+            .filter(exhausted=False, credited_through__lt=now)
+            .select_for_update(skip_locked=True)
+            .prefetch_related('exceptions')
+        )
+        if not rules:
+            return 0
+
+        hours_by_group = {}
+        sessions_by_group = {}
+        notifications = []
+        exhausted_ids = []
+        for rule in rules:
+            for _, occurrence, starts_at, ends_at in expand([rule], rule.credited_through, now):
+                if not (rule.credited_through <= ends_at < now):
+                    continue
+                hours = session_hours(starts_at, ends_at)
+                hours_by_group[rule.group_id] = hours_by_group.get(rule.group_id, 0) + hours
+                sessions_by_group[rule.group_id] = sessions_by_group.get(rule.group_id, 0) + 1
+                notifications.append(GroupNotification(
+                    group_id=rule.group_id,
+                    message=f"Session at {rule.location} on {occurrence} from {rule.start_time} to {rule.end_time} just ended. {hours:.2f} hours added to group progress."
+                ))
+            last = last_occurrence(rule)
+            if last is not None and session_bounds(last, rule.start_time, rule.end_time)[1] < now:
+                exhausted_ids.append(rule.id)
+
+        credit_groups(hours_by_group, sessions_by_group, from_scheduled=False)
+        GroupNotification.objects.bulk_create(notifications)
+        RecurringSession.objects.filter(id__in=[r.id for r in rules]).update(credited_through=now)
+        if exhausted_ids:
+            RecurringSession.objects.filter(id__in=exhausted_ids).update(exhausted=True)
+        credited = sum(sessions_by_group.values())
+        if credited:
+            CompletedSessionCounter.increment(credited)
+
+    if credited:
+        logger.info(f"RECURRING_SESSIONS - Credited {credited} elapsed occurrence(s) across {len(hours_by_group)} group(s)")
+    return credited
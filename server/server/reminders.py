@@ -0,0 +1,78 @@
+"""
+Session reminders.
+
+Every tick the scheduler scans for sessions that start within
+SESSION_REMINDER_WINDOW_MINUTES and have not been reminded yet. The scan is
+a range read on a partial index over starts_at that only holds unreminded
+sessions, so the work per tick is proportional to the sessions in the
+window, not the size of the table. Each session's attendees get one
+UserNotification, all inserted in a single batch, and the sessions are
+stamped with reminder_sent_at in the same transaction, which makes ticks
+idempotent. Optionally (SESSION_REMINDER_EMAILS) the reminders are also
+emailed over one SMTP connection once the transaction commits.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import send_mass_mail
+from django.db import transaction
+from django.utils import timezone
+
+from .models import GroupSession, UserNotification
+
+logger = logging.getLogger(__name__)
+
+
+def reminder_window():
+    return timedelta(minutes=getattr(settings, 'SESSION_REMINDER_WINDOW_MINUTES', 60))
+
+
+def _send_reminder_emails(messages):
+    try:
+        sent = send_mass_mail(messages, fail_silently=False)
+        logger.info(f"SESSION_REMINDERS - Emailed {sent} reminder(s)")
+    except Exception as e:
+        # Notifications are already stored; a mail outage must not undo them.
+        logger.error(f"SESSION_REMINDERS - Failed to email reminders: {e}")
+
+
+def send_session_reminders(now=None, window=None, send_emails=None):
+    """Remind attendees of sessions starting in (now, now + window]. Returns the number of sessions handled."""
+    now = now or timezone.now()
+    window = window or reminder_window()
+    if send_emails is None:
+        send_emails = getattr(settings, 'SESSION_REMINDER_EMAILS', False)
+
+    with transaction.atomic():
+        due = list(
+            GroupSession.objects
+            .filter(reminder_sent_at__isnull=True, starts_at__gt=now, starts_at__lte=now + window)
+            .select_for_update(skip_locked=True, of=('self',))
+            .values_list('id', 'date', 'start_time', 'end_time', 'location', 'group__group_name')
+        )
+        if not due:
+            return 0
+        sessions = {row[0]: row[1:] for row in due}
+
+        attendees = (
+            GroupSession.attendees.through.objects
+            .filter(groupsession_id__in=sessions)
+            .values_list('groupsession_id', 'user_id', 'user__email')
+        )
+        notifications = []
+        emails = []
+        for session_id, user_id, email in attendees:
+            session_date, start_time, end_time, location, group_name = sessions[session_id]
+            message = f"Reminder: your {group_name} session at {location} starts on {session_date} at {start_time} (until {end_time})."
+            notifications.append(UserNotification(user_id=user_id, session_id=session_id, kind=UserNotification.REMINDER, message=message))
+            if send_emails and email:
+                emails.append((f"Upcoming session: {group_name}", message, settings.DEFAULT_FROM_EMAIL, [email]))
+
+        UserNotification.objects.bulk_create(notifications, batch_size=500)
+        GroupSession.objects.filter(id__in=sessions).update(reminder_sent_at=now)
+        if emails:
+            transaction.on_commit(lambda: _send_reminder_emails(emails))
+
+    logger.info(f"SESSION_REMINDERS - Reminded {len(notifications)} attendee(s) of {len(sessions)} session(s)")
+    return len(sessions)
@@ -0,0 +1,227 @@
+"""
+Leader-elected background scheduler for periodic maintenance tasks.
+
+Tasks register themselves with ``@periodic_task(name, interval)`` (see tasks.py)
+and are run by ``python manage.py run_scheduler``. Any number of scheduler
+processes may run; a lease row in the database makes sure only one of them,
+the leader, executes tasks at a time. The leader renews the lease before each
+task and, from a heartbeat thread, every third of its TTL while a task runs,
+so a task may take longer than the TTL; if the lease is lost anyway (the
+database was unreachable for a whole TTL) the remaining due tasks are left
+to the new leader. After every run the task's duration,
+result (rows processed) and lag behind its due time are published to
+``ScheduledTaskState`` and the log.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import ScheduledTaskState, SchedulerLease
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = 'scheduler'
+
+
+class PeriodicTask:
+    def __init__(self, name, func, interval):
+        self.name = name
+        self.func = func
+        self.interval = interval
+
+    def is_due(self, state, now):
+        return self.due_at(state, now) <= now
+
+    def due_at(self, state, now):
+        if state is None or state.last_started_at is None:
+            return now
+        return state.last_started_at + self.interval
+
+
+class TaskRegistry:
+    def __init__(self):
+        self._tasks = {}
+
+    def register(self, name, func, interval):
+        if not isinstance(interval, timedelta):
+            interval = timedelta(seconds=interval)
+        self._tasks[name] = PeriodicTask(name, func, interval)
+
+    def unregister(self, name):
+        self._tasks.pop(name, None)
+
+    def __iter__(self):
+        return iter(list(self._tasks.values()))
+
+    def __len__(self):
+        return len(self._tasks)
+
+
+registry = TaskRegistry()
+
+
+def periodic_task(name, interval):
+    """Decorator registering ``func`` to run every ``interval`` (seconds or timedelta)."""
+    def decorator(func):
+        registry.register(name, func, interval)
+        return func
+    return decorator
+
+
+def default_holder_id():
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def acquire_lease(holder, ttl, name=LEASE_NAME):
+    """
+    Try to become (or remain) the leader. The conditional UPDATE is atomic, so
+    at most one holder can win an expired lease. Returns True when ``holder``
+    owns the lease for the next ``ttl``.
+    """
+    now = timezone.now()
+    try:
+        _, created = SchedulerLease.objects.get_or_create(name=name, defaults={'holder': holder, 'expires_at': now + ttl})
+        if created:
+            return True
+    except IntegrityError:
+        # Another process created the row first; compete for it below.
+        pass
+    return SchedulerLease.objects.filter(name=name).filter(
+        Q(holder=holder) | Q(expires_at__lt=now)
+    ).update(holder=holder, expires_at=now + ttl) == 1
+
+
+def release_lease(holder, name=LEASE_NAME):
+    SchedulerLease.objects.filter(name=name, holder=holder).update(expires_at=timezone.now())
+
+
+class LeaseHeartbeat:
+    """
+    Context manager renewing ``holder``'s lease every third of ``ttl`` from a
+    background thread. ``held`` turns False once a renewal fails.
+    """
+
+    def __init__(self, holder, ttl, name=LEASE_NAME):
+        self.holder = holder
+        self.ttl = ttl
+        self.name = name
+        self.held = True
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f'lease-heartbeat-{name}', daemon=True)
+
+    def beat(self):
+        """Renew the lease now; returns whether it is still held."""
+        if self.held:
+            try:
+                self.held = acquire_lease(self.holder, self.ttl, self.name)
+            except Exception as e:
+                logger.exception(f"SCHEDULER_HEARTBEAT_ERROR - {e}")
+        return self.held
+
+    def _run(self):
+        try:
+            while not self._stop.wait(self.ttl.total_seconds() / 3) and self.beat():
+                pass
+        finally:
+            # The thread has its own database connection.
+            connection.close()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+class Scheduler:
+    def __init__(self, tasks=None, holder=None, lease_ttl=None):
+        self.tasks = registry if tasks is None else tasks
+        self.holder = holder or default_holder_id()
+        self.lease_ttl = lease_ttl or timedelta(seconds=getattr(settings, 'SCHEDULER_LEASE_SECONDS', 30))
+        self.is_leader = False
+
+    def tick(self):
+        """Run every due task if this process holds the lease. Returns the names of the tasks run."""
+        close_old_connections()
+        is_leader = acquire_lease(self.holder, self.lease_ttl)
+        if is_leader != self.is_leader:
+            logger.info(f"SCHEDULER_LEADERSHIP - {self.holder} {'acquired' if is_leader else 'lost'} the lease")
+            self.is_leader = is_leader
+        if not is_leader:
+            return []
+
+        now = timezone.now()
+        states = {s.name: s for s in ScheduledTaskState.objects.filter(name__in=[t.name for t in self.tasks])}
+        due = [task for task in self.tasks if task.is_due(states.get(task.name), now)]
+        if not due:
+            return []
+        ran = []
+        with LeaseHeartbeat(self.holder, self.lease_ttl) as heartbeat:
+            for task in due:
+                if ran and not heartbeat.beat():
+                    break
+                self.run_task(task, task.due_at(states.get(task.name), now))
+                ran.append(task.name)
+        if not heartbeat.held:
+            logger.warning(f"SCHEDULER_LEADERSHIP - {self.holder} lost the lease while running tasks")
+            self.is_leader = False
+        return ran
+
+    def run_task(self, task, due_at):
+        started_at = timezone.now()
+        lag_ms = max(0.0, (started_at - due_at).total_seconds() * 1000)
+        started = time.perf_counter()
+        result, error = 0, ''
+        try:
+            result = task.func() or 0
+        except Exception as e:
+            error = str(e)
+            logger.exception(f"SCHEDULER_TASK_ERROR - {task.name}: {e}")
+        duration_ms = (time.perf_counter() - started) * 1000
+        self.publish(task, started_at, duration_ms, lag_ms, result, error)
+        return result
+
+    def publish(self, task, started_at, duration_ms, lag_ms, result, error):
+        stats = {
+            'last_started_at': started_at,
+            'last_duration_ms': duration_ms,
+            'last_lag_ms': lag_ms,
+            'last_result': result,
+            'last_error': error,
+            'last_holder': self.holder,
+        }
+        updated = ScheduledTaskState.objects.filter(name=task.name).update(run_count=F('run_count') + 1, **stats)
+        if not updated:
+            ScheduledTaskState.objects.create(name=task.name, run_count=1, **stats)
+        logger.info(
+            f"SCHEDULER_TASK_RUN - {task.name}: result={result} duration_ms={duration_ms:.1f} lag_ms={lag_ms:.1f}"
+            + (f" error={error}" if error else "")
+        )
+
+    def run_forever(self, tick_seconds=None, max_ticks=None):
+        tick_seconds = tick_seconds or getattr(settings, 'SCHEDULER_TICK_SECONDS', 5)
+        ticks = 0
+        try:
+            while max_ticks is None or ticks < max_ticks:
+                try:
+                    self.tick()
+                except Exception as e:
+                    # Keep the loop alive through transient database errors.
+                    logger.exception(f"SCHEDULER_TICK_ERROR - {e}")
+                ticks += 1
+                if max_ticks is None or ticks < max_ticks:
+                    time.sleep(tick_seconds)
+        finally:
+            if self.is_leader:
+                release_lease(self.holder)
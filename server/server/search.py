@@ -0,0 +1,173 @@
+"""
+Ranked full-text search over groups.
+
+PostgreSQL: server_group.search_vector is a weighted tsvector (group name
+and subject code A, course name B, description C) maintained by a BEFORE
+INSERT/UPDATE trigger, which only recomputes it when one of those columns
+changes (or the vector is cleared), and covered by a GIN index (migration
+0034). The column is not a model field, so it is read through RawSQL here.
+
+SQLite (local/dev): server_group_fts is an FTS5 table holding a copy of the
+same four columns keyed by group id, kept in sync by the Group post_save /
+post_delete signals. Bulk writes bypass signals, so rebuild_search_index
+repopulates it. bm25() is weighted to match the PostgreSQL weights.
+
+Both backends match every query term as a word prefix ("comp100",
+"calc"). The old icontains filter also matched inside words, which matters
+for the digits of a subject code ("10001" in COMP10001) and for short
+fragments, so a query with a term containing a digit or shorter than
+SUBSTRING_TERM_LENGTH characters also ORs in the icontains filter. Those
+queries scan the table as before; rows found only by substring rank 0.
+Other mid-word matches ("ython") are no longer found. Where neither index
+is available the icontains filter is used alone, unranked.
+"""
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = 'english'
+FTS_TABLE = 'server_group_fts'
+SEARCH_FIELDS = ('group_name', 'subject_code', 'course_name', 'description')
+# bm25() column weights, in SEARCH_FIELDS order (PostgreSQL A, A, B, C).
+BM25_WEIGHTS = (10.0, 10.0, 4.0, 2.0)
+# Terms shorter than this, or containing a digit, are also matched as substrings.
+SUBSTRING_TERM_LENGTH = 3
+
+CREATE_FTS_TABLE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"{', '.join(SEARCH_FIELDS)}, tokenize='porter unicode61')"
+)
+
+_fts_available = False
+
+
+def search_terms(query):
+    """Word tokens of ``query``, lowercased; also strips FTS query syntax from user input."""
+    return re.findall(r'\w+', query.lower())
+
+
+def fts_available():
+    """Whether the SQLite FTS5 table exists (a positive answer is cached for the process)."""
+    global _fts_available
+    if not _fts_available and connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            _fts_available = cursor.fetchone() is not None
+    return _fts_available
+
+
+def has_search_index():
+    return connection.vendor == 'postgresql' or fts_available()
+
+
+def icontains_filter(query):
+    condition = Q()
+    for field in SEARCH_FIELDS:
+        condition |= Q(**{f'{field}__icontains': query})
+    return condition
+
+
+def needs_substring_match(terms):
+    return any(len(term) < SUBSTRING_TERM_LENGTH or any(c.isdigit() for c in term) for term in terms)
+
+
+def _ranked(queryset, sql, params, rank):
+    return queryset.annotate(search_rank=RawSQL(sql, params, output_field=FloatField())) if rank else queryset
+
+
+def search_groups(queryset, query, rank=True):
+    """
+    Filter ``queryset`` (of Group) to matches for ``query`` and, with
+    ``rank``, annotate each row with ``search_rank`` (higher is more
+    relevant). Without a search index the icontains filter is applied and
+    every rank is 0. Skip ranking when the queryset is also aggregated:
+    SQLite cannot group by bm25().
+    """
+    terms = search_terms(query)
+    if not terms:
+        return _ranked(queryset.none(), '0', [], rank)
+    table = queryset.model._meta.db_table
+    substring = needs_substring_match(terms)
+
+    if connection.vendor == 'postgresql':
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        condition = Q(search_match=True)
+        if substring:
+            condition |= icontains_filter(query)
+        matches = queryset.alias(search_match=RawSQL(
+            f"{table}.search_vector @@ to_tsquery(%s, %s)", [SEARCH_CONFIG, tsquery], output_field=BooleanField(),
+        )).filter(condition)
+        # ts_rank() is float4; cast so the rank a cursor carries back (a Python float) compares equal on ties.
+        return _ranked(matches, f"ts_rank({table}.search_vector, to_tsquery(%s, %s))::float8", [SEARCH_CONFIG, tsquery], rank)
+
+    if fts_available():
+        match = ' '.join(f'"{term}"*' for term in terms)
+        weights = ', '.join(str(w) for w in BM25_WEIGHTS)
+        if substring:
+            # Rows matched only by substring have no FTS row to join, so the
+            # full-text matches are an id subquery and ranked per row instead.
+            matches = queryset.filter(
+                Q(id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match]))
+                | icontains_filter(query)
+            )
+            return _ranked(matches, (
+                f"COALESCE((SELECT -bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = {table}.id), 0)"
+            ), [match], rank)
+        # bm25() only works inside the MATCH query, so the FTS table is joined
+        # in rather than read through a correlated subquery (which would rerun
+        # the full-text match for every row). It is lower-is-better, so it is
+        # negated to rank like ts_rank.
+        matches = queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f"{FTS_TABLE}.rowid = {table}.id", f"{FTS_TABLE} MATCH %s"],
+            params=[match],
+        )
+        return _ranked(matches, f"-bm25({FTS_TABLE}, {weights})", [], rank)
+
+    return _ranked(queryset.filter(icontains_filter(query)), '0', [], rank)
+
+
+def index_group(group):
+    """Refresh the group's row in the SQLite FTS table (PostgreSQL keeps its own column up to date)."""
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [group.id])
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(SEARCH_FIELDS)}) VALUES (%s, %s, %s, %s, %s)",
+            [group.id, *(getattr(group, field) or '' for field in SEARCH_FIELDS)],
+        )
+
+
+def unindex_group(group_id):
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [group_id])
+
+
+def rebuild_index():
+    """Repopulate the search index from server_group. Returns the number of groups indexed."""
+    from .models import Group
+
+    global _fts_available
+    table = Group._meta.db_table
+    coalesced = [f"COALESCE({field}, '')" for field in SEARCH_FIELDS]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # The trigger recomputes search_vector whenever it is cleared.
+            cursor.execute(f"UPDATE {table} SET search_vector = NULL")
+            return cursor.rowcount
+        if connection.vendor != 'sqlite':
+            return 0
+        cursor.execute(CREATE_FTS_TABLE)
+        _fts_available = True
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(SEARCH_FIELDS)}) "
+            f"SELECT id, {', '.join(coalesced)} FROM {table}"
+        )
+        return cursor.rowcount
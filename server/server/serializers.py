@@ -1,5 +1,10 @@
+from django.db.models import Case, Exists, F, FloatField, IntegerField, OuterRef, Prefetch, Subquery, Value, When
+from django.db.models.functions import Coalesce, Left
 from rest_framework import serializers
-from .models import User, Group, Message, GroupSession, GroupFile, GroupRating, FlashcardFolder, Flashcard
+from .models import User, Group, Message, GroupSession, GroupFile, GroupRating, FlashcardFolder, Flashcard, RecurringSession, UserNotification
+from .group_stats import get_stats
+from .recurrence import as_rrule
+from .sparse_fields import SparseFieldsMixin, wants
 
 class UserSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
@@ -17,7 +22,90 @@ class UserSerializer(serializers.ModelSerializer):
         user.save()
         return user
 
-class GroupSerializer(serializers.ModelSerializer):
+def annotate_group_stats(queryset, user=None):
+    """
+    Annotate a Group queryset with what GroupSerializer and
+    GroupDetailSerializer compute per group: member and rating counts and
+    the average rating (read from the group's GroupStats row) and, for a
+    signed-in ``user``, whether they joined and their own rating. A listing
+    is one query however many groups it returns; member ids still come from
+    a prefetch.
+    """
+    members = Group.members.through.objects.filter(group_id=OuterRef('pk'))
+    queryset = queryset.select_related('creator').prefetch_related(
+        Prefetch('members', queryset=User.objects.only('id')),
+    ).annotate(
+        member_total=Coalesce(F('stats__member_count'), 0),
+        creator_is_member=Exists(members.filter(user_id=OuterRef('creator_id'))),
+        rating_avg=Case(When(stats__rating_count__gt=0, then=F('stats__rating_avg')), default=None, output_field=FloatField()),
+        rating_total=Coalesce(F('stats__rating_count'), 0),
+    ).annotate(
+        # What member_count shows (a creator who left still counts); the members sort orders by it too.
+        num_members=F('member_total') + Case(
+            When(creator__isnull=False, creator_is_member=False, then=Value(1)), default=Value(0), output_field=IntegerField(),
+        ),
+    )
+    if user is not None and user.is_authenticated:
+        ratings = GroupRating.objects.filter(group_id=OuterRef('pk'), user_id=user.id).order_by()
+        queryset = queryset.annotate(
+            user_joined=Exists(members.filter(user_id=user.id)),
+            user_rating_value=Subquery(ratings.values('rating')[:1]),
+        )
+    return queryset
+
+
+class GroupStatsMixin:
+    """
+    Per-group computed fields. They read the annotate_group_stats()
+    annotations when present and fall back to per-object queries (and the
+    GroupStats row) for instances loaded without them.
+    """
+
+    def get_member_count(self, obj):
+        if hasattr(obj, 'num_members'):
+            return obj.num_members
+        count = obj.members.count()
+        if obj.creator and obj.creator not in obj.members.all():
+            count += 1
+        return count
+
+    def _request_user(self):
+        request = self.context.get('request')
+        if request and request.user.is_authenticated:
+            return request.user
+        return None
+
+    def get_joined(self, obj):
+        user = self._request_user()
+        if user is None:
+            return False
+        if hasattr(obj, 'user_joined'):
+            return obj.user_joined
+        return obj.members.filter(id=user.id).exists()
+
+    def get_average_rating(self, obj):
+        if hasattr(obj, 'rating_avg'):
+            return obj.rating_avg
+        return get_stats(obj.id).average_rating
+
+    def get_rating_count(self, obj):
+        if hasattr(obj, 'rating_total'):
+            return obj.rating_total
+        return get_stats(obj.id).rating_count
+
+    def get_user_rating(self, obj):
+        user = self._request_user()
+        if user is None:
+            return None
+        if hasattr(obj, 'user_rating_value'):
+            return float(obj.user_rating_value) if obj.user_rating_value is not None else None
+        try:
+            rating = GroupRating.objects.get(user=user, group=obj)
+            return float(rating.rating)
+        except GroupRating.DoesNotExist:
+            return None
+
+class GroupSerializer(SparseFieldsMixin, GroupStatsMixin, serializers.ModelSerializer):
     creator_name = serializers.CharField(source='creator.name', read_only=True)
     creator_email = serializers.CharField(source='creator.email', read_only=True)
     member_count = serializers.SerializerMethodField()
@@ -51,38 +139,64 @@ class GroupSerializer(serializers.ModelSerializer):
             data['location'] = 'TBD'
             
         return data
-    
-    def get_member_count(self, obj):
-        count = obj.members.count()
-        if obj.creator and obj.creator not in obj.members.all():
-            count += 1
-        return count
-    
-    def get_joined(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.members.filter(id=request.user.id).exists()
-        return False
-    
-    def get_average_rating(self, obj):
-        from .models import GroupRating
-        return GroupRating.get_average_rating(obj)
-    
-    def get_rating_count(self, obj):
-        from .models import GroupRating
-        return GroupRating.get_rating_count(obj)
-    
-    def get_user_rating(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            try:
-                rating = GroupRating.objects.get(user=request.user, group=obj)
-                return float(rating.rating)
-            except GroupRating.DoesNotExist:
-                return None
-        return None
 
-class GroupDetailSerializer(serializers.ModelSerializer):
+# Cards show the start of the description; the full text is on the detail page.
+CARD_DESCRIPTION_LENGTH = 300
+
+class GroupCardSerializer(SparseFieldsMixin, GroupStatsMixin, serializers.ModelSerializer):
+    """
+    Read-only group summary for list endpoints (discover, dashboard,
+    recommendations, profile). Leaves out group_guidelines and truncates the
+    description; use setup_eager_loading() so neither text column is read in
+    full. Member ids (``members``) and the untruncated description
+    (``full_description``) are returned only when ?fields= names them.
+    """
+    creator_name = serializers.CharField(source='creator.name', read_only=True)
+    creator_email = serializers.CharField(source='creator.email', read_only=True)
+    description = serializers.SerializerMethodField()
+    member_count = serializers.SerializerMethodField()
+    joined = serializers.SerializerMethodField()
+    average_rating = serializers.SerializerMethodField()
+    rating_count = serializers.SerializerMethodField()
+    user_rating = serializers.SerializerMethodField()
+    full_description = serializers.CharField(source='description', read_only=True)
+    opt_in_fields = ('members', 'full_description')
+
+    class Meta:
+        model = Group
+        fields = [
+            'id', 'group_name', 'subject_code', 'course_name', 'description', 'year_level', 'meeting_format',
+            'primary_language', 'meeting_schedule', 'location', 'tags', 'group_personality', 'created_at',
+            'creator', 'creator_name', 'creator_email', 'member_count', 'joined', 'average_rating',
+            'rating_count', 'user_rating', 'members', 'full_description',
+        ]
+        read_only_fields = fields
+
+    @staticmethod
+    def setup_eager_loading(queryset, user=None, fields=None):
+        """
+        annotate_group_stats() without the member prefetch, with the long text
+        columns deferred and only a description prefix selected.
+        """
+        queryset = annotate_group_stats(queryset, user).prefetch_related(None)
+        if fields is not None and 'full_description' in fields:
+            queryset = queryset.defer('group_guidelines')
+        else:
+            queryset = queryset.defer('description', 'group_guidelines')
+        if wants(fields, 'description'):
+            # One character over the limit tells get_description() the text was cut.
+            queryset = queryset.annotate(description_preview=Left('description', CARD_DESCRIPTION_LENGTH + 1))
+        if fields is not None and 'members' in fields:
+            queryset = queryset.prefetch_related(Prefetch('members', queryset=User.objects.only('id')))
+        return queryset
+
+    def get_description(self, obj):
+        text = obj.description_preview if hasattr(obj, 'description_preview') else obj.description
+        if text and len(text) > CARD_DESCRIPTION_LENGTH:
+            return text[:CARD_DESCRIPTION_LENGTH].rstrip() + '…'
+        return text
+
+class GroupDetailSerializer(SparseFieldsMixin, GroupStatsMixin, serializers.ModelSerializer):
     creator_name = serializers.CharField(source='creator.name', read_only=True)
     creator_email = serializers.CharField(source='creator.email', read_only=True)
     member_count = serializers.SerializerMethodField()
@@ -95,36 +209,6 @@ class GroupDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = Group
         fields = '__all__'
-    
-    def get_member_count(self, obj):
-        count = obj.members.count()
-        if obj.creator and obj.creator not in obj.members.all():
-            count += 1
-        return count
-    
-    def get_joined(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.members.filter(id=request.user.id).exists()
-        return False
-    
-    def get_average_rating(self, obj):
-        from .models import GroupRating
-        return GroupRating.get_average_rating(obj)
-    
-    def get_rating_count(self, obj):
-        from .models import GroupRating
-        return GroupRating.get_rating_count(obj)
-    
-    def get_user_rating(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            try:
-                rating = GroupRating.objects.get(user=request.user, group=obj)
-                return float(rating.rating)
-            except GroupRating.DoesNotExist:
-                return None
-        return None
 
 class UserProfileSerializer(serializers.ModelSerializer):
     languages = serializers.SerializerMethodField()
@@ -165,31 +249,36 @@ class UserProfileSerializer(serializers.ModelSerializer):
             return [interest.strip() for interest in obj.interests_hobbies.split(',') if interest.strip()]
         return []
 
-class MessageSerializer(serializers.ModelSerializer):
+class MessageSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     user = serializers.PrimaryKeyRelatedField(read_only=True)
     user_name = serializers.CharField(source='user.name', read_only=True)
     class Meta:
         model = Message
         fields = ['id', 'user', 'user_name', 'text', 'timestamp'] 
 
-class GroupSessionSerializer(serializers.ModelSerializer):
+class GroupSessionSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     creator_name = serializers.CharField(source='creator.name', read_only=True)
-    attendee_count = serializers.SerializerMethodField()
+    attendee_count = serializers.IntegerField(read_only=True)
     attendees = serializers.SerializerMethodField()
     class Meta:
         model = GroupSession
-        fields = ['id', 'group', 'creator', 'creator_name', 'topic', 'date', 'start_time', 'end_time', 'location', 'meeting_format', 'description', 'extra_details', 'created_at', 'updated_at', 'attendee_count', 'attendees']
-        read_only_fields = ['group', 'creator', 'creator_name', 'created_at', 'updated_at', 'attendee_count', 'attendees']
+        fields = ['id', 'group', 'creator', 'creator_name', 'topic', 'date', 'start_time', 'end_time', 'location', 'meeting_format', 'description', 'extra_details', 'created_at', 'updated_at', 'attendee_count', 'attendees', 'recurrence', 'occurrence_date']
+        read_only_fields = ['group', 'creator', 'creator_name', 'created_at', 'updated_at', 'attendee_count', 'attendees', 'recurrence', 'occurrence_date']
 
-    def get_attendee_count(self, obj):
-        return obj.attendees.count()
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Load creators and attendee IDs up front so a listing costs a fixed number of queries."""
+        return queryset.select_related('creator').prefetch_related(
+            Prefetch('attendees', queryset=User.objects.only('id'))
+        )
 
     def get_attendees(self, obj):
-        return list(obj.attendees.values_list('id', flat=True))
+        # Served from the prefetch cache when setup_eager_loading() was applied.
+        return [user.id for user in obj.attendees.all()]
 
     def validate(self, data):
-        from datetime import datetime, date, time
-        import pytz
+        from datetime import datetime
+        from .models import SESSION_TIME_ZONE
         # Get date, start_time, end_time from data or instance
         session_date = data.get('date') or getattr(self.instance, 'date', None)
         start_time = data.get('start_time') or getattr(self.instance, 'start_time', None)
@@ -200,8 +289,7 @@ class GroupSessionSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError('Date, start time, and end time are required.')
 
         # 2. Start time cannot be in the past (if date is today)
-        tz = pytz.timezone('Australia/Sydney')
-        now = datetime.now(tz)
+        now = datetime.now(SESSION_TIME_ZONE)
         if session_date == now.date() and start_time < now.time():
             raise serializers.ValidationError('Start time cannot be in the past.')
 
@@ -211,7 +299,66 @@ class GroupSessionSerializer(serializers.ModelSerializer):
 
         return data
 
-class GroupFileSerializer(serializers.ModelSerializer):
+class UpcomingSessionSerializer(GroupSessionSerializer):
+    """Session plus its group's name, for cross-group listings (select_related('group', 'creator'))."""
+    group_name = serializers.CharField(source='group.group_name', read_only=True)
+
+    class Meta(GroupSessionSerializer.Meta):
+        fields = GroupSessionSerializer.Meta.fields + ['group_name', 'starts_at', 'ends_at']
+        read_only_fields = GroupSessionSerializer.Meta.read_only_fields + ['group_name', 'starts_at', 'ends_at']
+
+class RecurringSessionSerializer(serializers.ModelSerializer):
+    creator_name = serializers.CharField(source='creator.name', read_only=True)
+    rrule = serializers.SerializerMethodField()
+
+    class Meta:
+        model = RecurringSession
+        fields = ['id', 'group', 'creator', 'creator_name', 'topic', 'start_time', 'end_time', 'location', 'meeting_format', 'description', 'extra_details', 'frequency', 'interval', 'by_weekday', 'starts_on', 'until', 'count', 'rrule', 'created_at', 'updated_at']
+        read_only_fields = ['group', 'creator', 'creator_name', 'rrule', 'created_at', 'updated_at']
+
+    def get_rrule(self, obj):
+        return as_rrule(obj)
+
+    def validate_by_weekday(self, value):
+        try:
+            days = sorted({int(d) for d in value.split(',') if d.strip() != ''})
+        except ValueError:
+            raise serializers.ValidationError('Weekdays must be comma-separated numbers (Monday=0).')
+        if any(d < 0 or d > 6 for d in days):
+            raise serializers.ValidationError('Weekdays must be between 0 (Monday) and 6 (Sunday).')
+        return ','.join(str(d) for d in days)
+
+    def validate_interval(self, value):
+        if value < 1:
+            raise serializers.ValidationError('Interval must be at least 1.')
+        return value
+
+    def validate(self, data):
+        from datetime import datetime
+        from .models import SESSION_TIME_ZONE
+        start_time = data.get('start_time') or getattr(self.instance, 'start_time', None)
+        end_time = data.get('end_time') or getattr(self.instance, 'end_time', None)
+        starts_on = data.get('starts_on') or getattr(self.instance, 'starts_on', None)
+        until = data.get('until', getattr(self.instance, 'until', None))
+        if not start_time or not end_time or not starts_on:
+            raise serializers.ValidationError('Start date, start time, and end time are required.')
+        # As for one-off sessions, a series starting today cannot start in the past
+        now = datetime.now(SESSION_TIME_ZONE)
+        if starts_on == now.date() and start_time < now.time():
+            raise serializers.ValidationError('Start time cannot be in the past.')
+        if end_time <= start_time:
+            raise serializers.ValidationError('End time must be after start time.')
+        if until and until < starts_on:
+            raise serializers.ValidationError('The repeat-until date must not be before the start date.')
+        return data
+
+class UserNotificationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UserNotification
+        fields = ['id', 'kind', 'message', 'session', 'is_read', 'created_at']
+        read_only_fields = ['id', 'kind', 'message', 'session', 'created_at']
+
+class GroupFileSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     uploaded_by_name = serializers.CharField(source='uploaded_by.name', read_only=True)
     uploaded_by_email = serializers.CharField(source='uploaded_by.email', read_only=True)
     file_size_display = serializers.CharField(source='get_file_size_display', read_only=True)
@@ -225,8 +372,8 @@ class GroupFileSerializer(serializers.ModelSerializer):
     def to_representation(self, instance):
         """Custom representation to ensure uploaded_by_email is included"""
         data = super().to_representation(instance)
-        # Ensure uploaded_by_email is always included
-        if instance.uploaded_by:
+        # Ensure uploaded_by_email is always included (unless a sparse fieldset left it out)
+        if instance.uploaded_by and 'uploaded_by_email' in self.fields:
             data['uploaded_by_email'] = instance.uploaded_by.email
         return data
     
@@ -245,11 +392,17 @@ class GroupRatingSerializer(serializers.ModelSerializer):
         fields = ['id', 'user', 'user_name', 'group', 'rating', 'created_at', 'updated_at', 'average_rating', 'rating_count']
         read_only_fields = ['user', 'user_name', 'created_at', 'updated_at', 'average_rating', 'rating_count']
     
+    def group_stats(self, obj):
+        # The rating signals have already updated the counters by the time a saved rating is serialized
+        if not hasattr(obj, '_group_stats'):
+            obj._group_stats = get_stats(obj.group_id)
+        return obj._group_stats
+
     def get_average_rating(self, obj):
-        return GroupRating.get_average_rating(obj.group)
+        return self.group_stats(obj).average_rating
     
     def get_rating_count(self, obj):
-        return GroupRating.get_rating_count(obj.group)
+        return self.group_stats(obj).rating_count
 
 class FlashcardFolderSerializer(serializers.ModelSerializer):
     creator_name = serializers.CharField(source='creator.name', read_only=True)
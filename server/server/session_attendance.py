@@ -0,0 +1,86 @@
+"""
+Joining and leaving sessions without materializing the attendee list.
+
+Membership is checked and changed through the attendees through table, whose
+(groupsession_id, user_id) unique index makes both the EXISTS check and the
+insert cheap, and GroupSession.attendee_count is kept in step with an F()
+update in the same transaction. The unique index also decides races: when two
+requests join the same user concurrently only one insert succeeds, so the
+count is bumped exactly once.
+
+Attendee rows changed any other way (the admin, attendees.add(), the cascade
+when a user is deleted) are recounted by the signals in signals.py, and
+reconcile_group_stats repairs any count that has still drifted.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import GroupSession
+
+Attendance = GroupSession.attendees.through
+
+
+def is_attending(session_id, user_id):
+    return Attendance.objects.filter(groupsession_id=session_id, user_id=user_id).exists()
+
+
+def _bump(session_id, delta):
+    # updated_at moves too so ETags built from it see attendance changes.
+    GroupSession.objects.filter(id=session_id).update(
+        attendee_count=Greatest(F('attendee_count') + delta, Value(0)),
+        updated_at=timezone.now(),
+    )
+
+
+def attendee_count(session_id):
+    return GroupSession.objects.filter(id=session_id).values_list('attendee_count', flat=True).first() or 0
+
+
+def attendee_ids(session_id):
+    """Ids of the session's attendees, read from the through table's index without loading users."""
+    return list(Attendance.objects.filter(groupsession_id=session_id).values_list('user_id', flat=True))
+
+
+def _actual_count():
+    return Coalesce(Subquery(
+        Attendance.objects.filter(groupsession_id=OuterRef('pk'))
+        .order_by().values('groupsession_id').annotate(count=Count('*')).values('count')
+    ), 0)
+
+
+def drifted_sessions(session_ids=None):
+    """{session_id: (stored attendee_count, actual count)} for sessions whose count is wrong."""
+    sessions = GroupSession.objects.annotate(actual=_actual_count()).exclude(attendee_count=F('actual'))
+    if session_ids is not None:
+        sessions = sessions.filter(id__in=list(session_ids))
+    return {session_id: (stored, actual) for session_id, stored, actual in sessions.values_list('id', 'attendee_count', 'actual')}
+
+
+def recount(session_ids=None):
+    """Reset attendee_count from the through table for ``session_ids`` (default: every session). Returns the number of rows updated."""
+    sessions = GroupSession.objects.all()
+    if session_ids is not None:
+        sessions = sessions.filter(id__in=list(session_ids))
+    return sessions.update(attendee_count=_actual_count(), updated_at=timezone.now())
+
+
+def join(session_id, user_id):
+    """Add the user to the session. Returns False if they were already attending."""
+    try:
+        with transaction.atomic():
+            Attendance.objects.create(groupsession_id=session_id, user_id=user_id)
+            _bump(session_id, 1)
+    except IntegrityError:
+        return False
+    return True
+
+
+def leave(session_id, user_id):
+    """Remove the user from the session. Returns False if they were not attending."""
+    with transaction.atomic():
+        deleted, _ = Attendance.objects.filter(groupsession_id=session_id, user_id=user_id).delete()
+        if deleted:
+            _bump(session_id, -1)
+    return bool(deleted)
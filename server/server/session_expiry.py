@@ -0,0 +1,97 @@
+"""
+Set-based expiry of past study sessions.
+
+Expired sessions are selected with a single range query on the ends_at index
+and then processed in bulk: one UPDATE adds the study hours to every affected
+group, one more moves them from scheduled to completed in GroupStudyProgress,
+the sessions are archived into SessionHistory, notifications are bulk-inserted,
+reminders are detached and attendees/sessions are deleted with one statement
+each, all inside a single transaction. The number of queries per run
+therefore does not depend on how many sessions exist or expire.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.utils import timezone
+
+from .cache_versions import bump_version
+from .detail_cache import invalidate_groups as invalidate_group_details
+from .models import CompletedSessionCounter, Group, GroupNotification, GroupSession, UserNotification, session_hours
+from .session_history import archive_sessions
+from .study_progress import complete_sessions
+
+logger = logging.getLogger(__name__)
+
+
+def expired_sessions_filter(now=None):
+    """Return a Q matching sessions that ended before ``now`` (a range scan on ends_at)."""
+    return Q(ends_at__lt=now or timezone.now())
+
+
+def credit_groups(hours_by_group, sessions_by_group, from_scheduled=True):
+    """Add completed study hours to many groups and their progress rows."""
+    if not hours_by_group:
+        return
+    # One UPDATE for all groups: each row gets its own aggregated total via
+    # CASE. The groups' session listings changed too, so bump their stamp.
+    Group.objects.filter(id__in=hours_by_group).update(
+        total_study_hours=F('total_study_hours') + Case(
+            *[When(id=group_id, then=Value(hours)) for group_id, hours in hours_by_group.items()],
+            default=Value(0.0),
+            output_field=FloatField(),
+        ),
+        sessions_updated_at=timezone.now(),
+    )
+    bump_version('group_list')
+    invalidate_group_details(hours_by_group)
+    complete_sessions(hours_by_group, sessions_by_group, from_scheduled=from_scheduled)
+
+
+def expire_past_sessions(now=None):
+    """
+    Expire every session that has ended: archive it to SessionHistory, credit
+    its duration to the group's study hours, notify the group and bump the
+    completed sessions counter.
+    Returns the number of sessions expired.
+    """
+    with transaction.atomic():
+        # skip_locked lets concurrent runners share the work instead of
+        # blocking on (and double counting) the same rows.
+        expired = list(
+            GroupSession.objects
+            .filter(expired_sessions_filter(now))
+            .select_for_update(skip_locked=True)
+            .values_list('id', 'group_id', 'date', 'start_time', 'end_time', 'location', 'starts_at', 'ends_at')
+        )
+        if not expired:
+            return 0
+
+        session_ids = []
+        hours_by_group = {}
+        sessions_by_group = {}
+        notifications = []
+        for session_id, group_id, session_date, start_time, end_time, location, starts_at, ends_at in expired:
+            duration_hours = session_hours(starts_at, ends_at)
+            session_ids.append(session_id)
+            hours_by_group[group_id] = hours_by_group.get(group_id, 0) + duration_hours
+            sessions_by_group[group_id] = sessions_by_group.get(group_id, 0) + 1
+            notifications.append(GroupNotification(
+                group_id=group_id,
+                message=f"Session at {location} on {session_date} from {start_time} to {end_time} just ended. {duration_hours:.2f} hours added to group progress."
+            ))
+
+        credit_groups(hours_by_group, sessions_by_group)
+        archive_sessions((session_id, group_id, starts_at, ends_at) for session_id, group_id, *_, starts_at, ends_at in expired)
+        GroupNotification.objects.bulk_create(notifications)
+        GroupSession.attendees.through.objects.filter(groupsession_id__in=session_ids).delete()
+        # The raw DELETE below bypasses on_delete, so apply the reminders'
+        # SET_NULL here or the foreign key check fails.
+        UserNotification.objects.filter(session_id__in=session_ids).update(session=None)
+        # Attendees are already gone, so skip the collector (which would reload
+        # and delete the sessions in batches) and issue a single DELETE.
+        GroupSession.objects.filter(id__in=session_ids)._raw_delete(GroupSession.objects.db)
+        CompletedSessionCounter.increment(len(session_ids))
+
+    logger.info(f"SESSION_EXPIRY - Expired {len(session_ids)} session(s) across {len(hours_by_group)} group(s)")
+    return len(session_ids)
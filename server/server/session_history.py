@@ -0,0 +1,99 @@
+"""
+Archiving of expired sessions into SessionHistory and aggregates over it.
+
+Session expiry calls archive_sessions() before deleting the live rows, which
+keeps GroupSession limited to upcoming sessions while history stays queryable.
+Every aggregate runs in the database: time-based ones on the starts_at
+indexes, per-user ones over the narrow SessionHistoryAttendee rows (indexed
+on user_id) joined to their history rows.
+"""
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncWeek
+
+from .models import SESSION_TIME_ZONE, GroupSession, SessionHistory, SessionHistoryAttendee, session_hours
+
+
+def archive_sessions(sessions):
+    """
+    Append history rows for ``sessions``, an iterable of
+    (session_id, group_id, starts_at, ends_at). Must run before the sessions'
+    attendee rows are deleted. Returns the number of rows archived.
+    """
+    sessions = list(sessions)
+    if not sessions:
+        return 0
+    attendees = {}
+    for session_id, user_id in (
+        GroupSession.attendees.through.objects
+        .filter(groupsession_id__in=[s[0] for s in sessions])
+        .values_list('groupsession_id', 'user_id')
+    ):
+        attendees.setdefault(session_id, []).append(user_id)
+
+    rows = [
+        SessionHistory(
+            group_id=group_id,
+            session_id=session_id,
+            starts_at=starts_at,
+            ends_at=ends_at,
+            duration_hours=session_hours(starts_at, ends_at),
+            attendee_count=len(attendees.get(session_id, [])),
+        )
+        for session_id, group_id, starts_at, ends_at in sessions
+    ]
+    # bulk_create sets the primary keys (RETURNING on PostgreSQL and SQLite 3.35+).
+    SessionHistory.objects.bulk_create(rows, batch_size=500)
+    SessionHistoryAttendee.objects.bulk_create([
+        SessionHistoryAttendee(history_id=row.id, user_id=user_id)
+        for row in rows for user_id in attendees.get(row.session_id, [])
+    ], batch_size=1000)
+    return len(rows)
+
+
+def _history(group_id=None, since=None, until=None):
+    history = SessionHistory.objects.all()
+    if group_id is not None:
+        history = history.filter(group_id=group_id)
+    if since is not None:
+        history = history.filter(starts_at__gte=since)
+    if until is not None:
+        history = history.filter(starts_at__lt=until)
+    return history
+
+
+def hours_per_week(group_id=None, since=None, until=None):
+    """Return [{'week', 'hours', 'sessions', 'attendances'}] ordered by week (Melbourne weeks)."""
+    return list(
+        _history(group_id, since, until)
+        .annotate(week=TruncWeek('starts_at', tzinfo=SESSION_TIME_ZONE))
+        .values('week')
+        .annotate(hours=Sum('duration_hours'), sessions=Count('id'), attendances=Sum('attendee_count'))
+        .order_by('week')
+    )
+
+
+def _attendance(group_id=None, since=None, until=None):
+    attendance = SessionHistoryAttendee.objects.all()
+    if group_id is not None:
+        attendance = attendance.filter(history__group_id=group_id)
+    if since is not None:
+        attendance = attendance.filter(history__starts_at__gte=since)
+    if until is not None:
+        attendance = attendance.filter(history__starts_at__lt=until)
+    return attendance
+
+
+def attendance_by_user(group_id=None, since=None, until=None):
+    """Return {user_id: archived sessions attended}, counted with one GROUP BY."""
+    return dict(
+        _attendance(group_id, since, until)
+        .values('user_id').annotate(sessions=Count('id')).order_by()
+        .values_list('user_id', 'sessions')
+    )
+
+
+def hours_attended(user_id, group_id=None, since=None, until=None):
+    """Total archived session hours ``user_id`` attended."""
+    return _attendance(group_id, since, until).filter(user_id=user_id).aggregate(
+        hours=Sum('history__duration_hours'),
+    )['hours'] or 0
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 
 from pathlib import Path
 import os
+import sys
 from dotenv import load_dotenv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -91,7 +92,6 @@ MIDDLEWARE.extend([
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'server.middleware.SessionCleanupMiddleware',  # Session cleanup middleware
 ])
 
 ROOT_URLCONF = 'server.urls'
@@ -148,6 +148,37 @@ else:
         }
     }
 
+# The migration history creates server_report twice (0014_report and
+# 0014_remove_groupsession_time_...), so test databases are built from the models.
+if len(sys.argv) > 1 and sys.argv[1] == 'test':
+    MIGRATION_MODULES = {'server': None}
+    # SQLite's in-memory test database fails concurrent writers with "table is
+    # locked" at once; a file database makes them wait on the busy timeout.
+    if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+        DATABASES['default']['TEST'] = {'NAME': BASE_DIR / 'test_db.sqlite3'}
+        DATABASES['default']['OPTIONS'] = {'timeout': 30}
+
+# Every process (each gunicorn worker and run_scheduler) must share one cache:
+# cached lists, facets and detail pages are invalidated by bumping version
+# counters in it (cache_versions.py), and a per-process LocMemCache would keep
+# those bumps in the process that made them. Redis when REDIS_URL is set,
+# otherwise a database table (created by migration 0039_cache_table).
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'server_cache',
+            'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', '20000'))},
+        }
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -282,6 +313,33 @@ DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL')
 # Email verification settings
 EMAIL_VERIFICATION_EXPIRY_HOURS = 24
 
+# Background scheduler (python manage.py run_scheduler)
+SCHEDULER_TICK_SECONDS = int(os.environ.get('SCHEDULER_TICK_SECONDS', '5'))
+SCHEDULER_LEASE_SECONDS = int(os.environ.get('SCHEDULER_LEASE_SECONDS', '30'))
+SESSION_EXPIRY_INTERVAL_SECONDS = int(os.environ.get('SESSION_EXPIRY_INTERVAL_SECONDS', '60'))
+RECURRING_SESSION_CREDIT_INTERVAL_SECONDS = int(os.environ.get('RECURRING_SESSION_CREDIT_INTERVAL_SECONDS', '60'))
+# Attendees are reminded once a session starts within this many minutes.
+SESSION_REMINDER_WINDOW_MINUTES = int(os.environ.get('SESSION_REMINDER_WINDOW_MINUTES', '60'))
+SESSION_REMINDER_INTERVAL_SECONDS = int(os.environ.get('SESSION_REMINDER_INTERVAL_SECONDS', '60'))
+SESSION_REMINDER_EMAILS = os.environ.get('SESSION_REMINDER_EMAILS', 'False') == 'True'
+
+# Groups queued for similar-group rescoring are processed this often, at most this many per run
+SIMILAR_GROUPS_REFRESH_INTERVAL_SECONDS = int(os.environ.get('SIMILAR_GROUPS_REFRESH_INTERVAL_SECONDS', '30'))
+SIMILAR_GROUPS_REFRESH_BATCH = int(os.environ.get('SIMILAR_GROUPS_REFRESH_BATCH', '100'))
+# Full rebuild, which restores pairs the incremental LSH lookup missed
+SIMILAR_GROUPS_REBUILD_INTERVAL_SECONDS = int(os.environ.get('SIMILAR_GROUPS_REBUILD_INTERVAL_SECONDS', '86400'))
+
+# Completed sessions counter: rows to spread increments over, and how long the summed total is cached
+COMPLETED_SESSION_COUNTER_SHARDS = int(os.environ.get('COMPLETED_SESSION_COUNTER_SHARDS', '8'))
+COMPLETED_SESSION_COUNTER_CACHE_SECONDS = int(os.environ.get('COMPLETED_SESSION_COUNTER_CACHE_SECONDS', '60'))
+
+# Discover page facet counts are cached per filter set (and invalidated on group changes) for this long
+GROUP_FACETS_CACHE_SECONDS = int(os.environ.get('GROUP_FACETS_CACHE_SECONDS', '300'))
+# Public /api/groups/ responses are cached per query (and invalidated on any change they show) for this long
+GROUP_LIST_CACHE_SECONDS = int(os.environ.get('GROUP_LIST_CACHE_SECONDS', '60'))
+# Shared parts of /api/groups/<id>/ are cached per group (and invalidated on any change they show) for this long
+GROUP_DETAIL_CACHE_SECONDS = int(os.environ.get('GROUP_DETAIL_CACHE_SECONDS', '300'))
+
 # AWS S3 Configuration
 AWS_ACCESS_KEY_ID = os.environ.get('AWS_ACCESS_KEY_ID')
 AWS_SECRET_ACCESS_KEY = os.environ.get('AWS_SECRET_ACCESS_KEY')
@@ -0,0 +1,247 @@
+"""
+Model signal handlers that keep denormalized data in sync.
+
+Connected in ServerConfig.ready().
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache_versions import bump_version
+from .detail_cache import invalidate_groups as invalidate_group_details
+from .models import (
+    Group, GroupRating, GroupSession, GroupStats, GroupStudyProgress, RecurrenceException, RecurringSession, User,
+    session_hours,
+)
+from .group_stats import adjust_members, adjust_ratings, refresh_stats
+from .minhash import refresh_signatures
+from .search import SEARCH_FIELDS, index_group, unindex_group
+from .session_attendance import recount as recount_attendees
+from .similarity import TRACKED_FIELDS, queue_refresh as queue_similar_refresh
+from .study_progress import adjust_scheduled, rebuild_progress
+from .tags import TAG_FIELDS, sync_group_tags
+
+
+def touch_group_sessions(group_id):
+    Group.objects.filter(id=group_id).update(sessions_updated_at=timezone.now())
+    bump_version('group_list')
+    invalidate_group_details([group_id])
+
+
+@receiver(post_save, sender=Group)
+def create_group_progress(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        GroupStudyProgress.objects.get_or_create(
+            group=instance,
+            defaults={'completed_hours': instance.total_study_hours or 0},
+        )
+
+
+@receiver(post_save, sender=Group)
+def create_group_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        GroupStats.objects.get_or_create(group=instance)
+
+
+@receiver(post_save, sender=Group)
+def index_group_for_search(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw and (update_fields is None or set(update_fields) & set(SEARCH_FIELDS)):
+        index_group(instance)
+
+
+@receiver(post_save, sender=Group)
+def sync_group_tag_rows(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    kinds = [kind for kind, field in TAG_FIELDS.items() if update_fields is None or field in update_fields]
+    if kinds:
+        sync_group_tags(instance, kinds)
+
+
+# Connected after sync_group_tag_rows, so the signature and the rescore read current tag rows.
+@receiver(post_save, sender=Group)
+def refresh_group_signature(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if not raw and (created or update_fields is None or set(update_fields) & set(TAG_FIELDS.values())):
+        refresh_signatures([instance.id])
+
+
+@receiver(post_save, sender=Group)
+def rescore_similar_groups(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if not raw and (created or update_fields is None or set(update_fields) & TRACKED_FIELDS):
+        queue_similar_refresh([instance.id])
+
+
+@receiver(pre_delete, sender=Group)
+def remember_similar_listings(sender, instance, **kwargs):
+    instance._listed_by = list(instance.similar_to.values_list('group_id', flat=True))
+
+
+@receiver(post_delete, sender=Group)
+def refill_similar_listings(sender, instance, **kwargs):
+    # The cascade removed this group from other groups' lists; refill them.
+    queue_similar_refresh(getattr(instance, '_listed_by', []))
+
+
+@receiver(post_delete, sender=Group)
+def unindex_group_for_search(sender, instance, **kwargs):
+    unindex_group(instance.id)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group_caches(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_version('group_facets')
+        bump_version('group_list')
+        invalidate_group_details([instance.id])
+
+
+@receiver(m2m_changed, sender=Group.members.through)
+def invalidate_group_caches_on_membership(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_version('group_list')
+        if not reverse:
+            invalidate_group_details([instance.id])
+        elif action == 'post_clear':
+            # Stashed by track_membership_changed on pre_clear.
+            invalidate_group_details(getattr(instance, '_cleared_group_ids', []))
+        else:
+            invalidate_group_details(pk_set or [])
+
+
+@receiver(m2m_changed, sender=Group.members.through)
+def track_membership_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    # reverse: instance is a User and pk_set holds group ids (user.joined_groups.add(...)).
+    if action == 'pre_clear' and reverse:
+        instance._cleared_group_ids = list(instance.joined_groups.values_list('id', flat=True))
+    elif action == 'post_add' and pk_set:
+        # Django drops ids that were already linked, so pk_set is exactly what was added.
+        if reverse:
+            adjust_members(pk_set, 1)
+        else:
+            adjust_members([instance.id], len(pk_set))
+    elif action == 'post_remove' and pk_set:
+        # pk_set may name rows that didn't exist, so recount instead of subtracting.
+        refresh_stats(pk_set if reverse else [instance.id])
+    elif action == 'post_clear':
+        refresh_stats(getattr(instance, '_cleared_group_ids', []) if reverse else [instance.id])
+
+
+@receiver(pre_delete, sender=User)
+def remember_joined_groups(sender, instance, **kwargs):
+    # Membership rows are removed by the cascade without m2m_changed.
+    instance._joined_group_ids = list(instance.joined_groups.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=User)
+def recount_joined_groups(sender, instance, **kwargs):
+    refresh_stats(getattr(instance, '_joined_group_ids', []))
+    invalidate_group_details(getattr(instance, '_joined_group_ids', []))
+
+
+@receiver(pre_delete, sender=User)
+def remember_joined_sessions(sender, instance, **kwargs):
+    # Attendee rows are removed by the cascade without m2m_changed.
+    instance._joined_session_ids = list(instance.joined_sessions.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=User)
+def recount_joined_sessions(sender, instance, **kwargs):
+    recount_attendees(getattr(instance, '_joined_session_ids', []))
+
+
+@receiver(m2m_changed, sender=GroupSession.attendees.through)
+def track_attendees_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    # session_attendance.join/leave write the through table directly and keep
+    # the count themselves; this covers the admin and attendees.add()/set().
+    # reverse: instance is a User and pk_set holds session ids.
+    if action == 'pre_clear' and reverse:
+        instance._cleared_session_ids = list(instance.joined_sessions.values_list('id', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        recount_attendees((pk_set or []) if reverse else [instance.id])
+    elif action == 'post_clear':
+        recount_attendees(getattr(instance, '_cleared_session_ids', []) if reverse else [instance.id])
+
+
+@receiver(post_save, sender=GroupRating)
+def track_rating_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    rating = float(instance.rating)
+    if created:
+        adjust_ratings(instance.group_id, rating, 1)
+    elif getattr(instance, '_loaded_rating', None) is not None:
+        delta = rating - float(instance._loaded_rating)
+        if delta:
+            adjust_ratings(instance.group_id, delta, 0)
+    else:
+        # Saved without being loaded first, so the previous rating is unknown.
+        refresh_stats([instance.group_id])
+    instance._loaded_rating = instance.rating
+
+
+@receiver(post_delete, sender=GroupRating)
+def track_rating_deleted(sender, instance, **kwargs):
+    # Never recreate a missing row: the group itself may be being deleted.
+    adjust_ratings(instance.group_id, -float(instance.rating), -1, rebuild_missing=False)
+
+
+@receiver(post_save, sender=GroupRating)
+@receiver(post_delete, sender=GroupRating)
+def invalidate_group_caches_on_rating(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_version('group_list')
+        invalidate_group_details([instance.group_id])
+
+
+@receiver(post_save, sender=User)
+def invalidate_group_caches_on_rename(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    # The list shows creator names, detail pages their emails too; logins only write last_login.
+    if raw or created:
+        return
+    changed = {'name', 'email'} if update_fields is None else set(update_fields)
+    if 'name' in changed:
+        bump_version('group_list')
+    if changed & {'name', 'email'}:
+        invalidate_group_details(Group.objects.filter(creator=instance).values_list('id', flat=True))
+
+
+@receiver(post_save, sender=GroupSession)
+def track_session_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    new_bounds = (instance.starts_at, instance.ends_at)
+    if created:
+        adjust_scheduled(instance.group_id, session_hours(*new_bounds), 1)
+    elif hasattr(instance, '_loaded_bounds'):
+        delta = session_hours(*new_bounds) - session_hours(*instance._loaded_bounds)
+        if delta:
+            adjust_scheduled(instance.group_id, delta, 0)
+    else:
+        # Saved without being loaded first, so the previous duration is unknown.
+        rebuild_progress(instance.group_id)
+    instance._loaded_bounds = new_bounds
+    touch_group_sessions(instance.group_id)
+
+
+@receiver(post_delete, sender=GroupSession)
+def track_session_deleted(sender, instance, **kwargs):
+    # Never recreate a missing row here: the session may be going away because
+    # its group (and progress row) is being deleted.
+    adjust_scheduled(instance.group_id, -session_hours(instance.starts_at, instance.ends_at), -1, rebuild_missing=False)
+    touch_group_sessions(instance.group_id)
+
+
+@receiver(post_save, sender=RecurringSession)
+@receiver(post_delete, sender=RecurringSession)
+def track_recurring_session_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        touch_group_sessions(instance.group_id)
+
+
+@receiver(post_save, sender=RecurrenceException)
+@receiver(post_delete, sender=RecurrenceException)
+def track_recurrence_exception_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        for group_id in Group.objects.filter(recurring_sessions=instance.rule_id).values_list('id', flat=True):
+            touch_group_sessions(group_id)
@@ -0,0 +1,288 @@
+"""
+Precomputed similar groups.
+
+Two groups are scored on subject code, topic and personality tag overlap,
+year level and meeting format (score_pair). Each group's TOP_K best matches
+scoring above MIN_SCORE are stored as SimilarGroup rows, so the detail page
+reads them with one indexed query instead of scoring every group.
+
+A pair can only score above MIN_SCORE if the groups share a subject or a
+tag, or share both year level and meeting format. So when a group is
+created or changed only those candidates are rescored, and the stored lists
+of the groups it enters, moves in or leaves are patched. A list that loses
+an entry while full is recomputed, since a group outside it may now belong
+in it. That work happens in the scheduler: the Group signals only queue the
+group (queue_refresh) and the refresh_similar_groups task drains the queue
+(process_refresh_queue).
+
+Groups sharing a tag are found through MinHash/LSH bucket collisions
+(minhash.py) rather than the exact tag join, which for popular tags matches
+a large part of the catalogue. Groups with little tag overlap may be
+missed, so a pair that shares neither a subject nor year level and meeting
+format and overlaps weakly can be left out until the next full rebuild,
+which the rebuild_similar_groups task runs every
+SIMILAR_GROUPS_REBUILD_INTERVAL_SECONDS (daily by default).
+
+Full rebuilds score the whole catalogue at once, with NumPy/SciPy matrix
+operations when they are installed (similarity_matrix.py) and in-memory
+candidate buckets otherwise. scan_similar_groups() is the original scan
+over every group, kept as the reference that ``manage.py
+rebuild_similar_groups --check`` compares the table against.
+"""
+from collections import defaultdict, namedtuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .detail_cache import invalidate_all as invalidate_all_details, invalidate_groups as invalidate_group_details
+from .minhash import colliding_groups, rebuild_signatures
+from .models import Group, GroupTag, SimilarGroup, SimilarGroupRefresh, Tag
+from .tags import TAG_FIELDS, tag_sets
+
+TOP_K = 10
+MIN_SCORE = 10
+# Group fields the score reads; the tag strings are read through GroupTag.
+SCORED_FIELDS = ('subject_code', 'year_level', 'meeting_format')
+# Saving any of these rescores the group.
+TRACKED_FIELDS = set(SCORED_FIELDS) | set(TAG_FIELDS.values())
+
+Profile = namedtuple('Profile', ['id', 'subject_code', 'year_level', 'meeting_format', 'topics', 'personality'])
+
+
+def load_profiles(groups):
+    """{group_id: Profile} for a Group queryset, in two queries."""
+    tags = tag_sets(groups.values('id'))
+    return {
+        row[0]: Profile(*row, tags[row[0]][Tag.TOPIC], tags[row[0]][Tag.PERSONALITY])
+        for row in groups.values_list('id', *SCORED_FIELDS)
+    }
+
+
+def score_pair(group, other):
+    """(score, factors) for two profiles; symmetric."""
+    score = 0
+    factors = {}
+
+    # 1. Subject code match (highest weight: 40 points)
+    if group.subject_code == other.subject_code:
+        score += 40
+        factors['subject_code'] = True
+
+    # 2. Tags overlap (up to 25 points)
+    if group.topics and other.topics:
+        tag_similarity = len(group.topics & other.topics) / len(group.topics | other.topics)
+        score += tag_similarity * 25
+        factors['tags_overlap'] = tag_similarity
+
+    # 3. Group personality overlap (up to 20 points)
+    if group.personality and other.personality:
+        personality_similarity = len(group.personality & other.personality) / len(group.personality | other.personality)
+        score += personality_similarity * 20
+        factors['personality_overlap'] = personality_similarity
+
+    # 4. Year level match (10 points)
+    if group.year_level == other.year_level:
+        score += 10
+        factors['year_level'] = True
+
+    # 5. Meeting format match (5 points)
+    if group.meeting_format == other.meeting_format:
+        score += 5
+        factors['meeting_format'] = True
+
+    return score, factors
+
+
+def rank(matches):
+    """Sort (other_id, score, factors) tuples best first; ties go to the older group."""
+    return sorted(matches, key=lambda match: (-match[1], match[0]))
+
+
+def score_candidates(profile, candidates):
+    """Every candidate scoring above MIN_SCORE against ``profile``, best first."""
+    matches = []
+    for other in candidates:
+        if other.id != profile.id:
+            score, factors = score_pair(profile, other)
+            if score > MIN_SCORE:
+                matches.append((other.id, score, factors))
+    return rank(matches)
+
+
+def candidate_filter(profile, exact=False):
+    """
+    Q for the groups that can score above MIN_SCORE against ``profile``.
+    Groups sharing its tags are found by LSH bucket collision, or with
+    ``exact`` by every group sharing any tag.
+    """
+    candidates = Q(subject_code=profile.subject_code) | Q(
+        year_level=profile.year_level, meeting_format=profile.meeting_format,
+    )
+    tokens = profile.topics | profile.personality
+    if tokens and exact:
+        candidates |= Q(id__in=GroupTag.objects.filter(tag_id__in=tokens).values('group_id'))
+    elif tokens:
+        candidates |= Q(id__in=colliding_groups(tokens))
+    return candidates
+
+
+def compute_similar(profile, exact=False):
+    """``profile``'s matches among its candidates, best first."""
+    candidates = load_profiles(Group.objects.filter(candidate_filter(profile, exact)).exclude(id=profile.id))
+    return score_candidates(profile, candidates.values())
+
+
+def save_lists(lists, replace=True):
+    """
+    Store the top TOP_K of each group's ranked matches in ``lists``,
+    replacing its rows and invalidating its detail page. Rebuilds pass
+    replace=False after clearing the table and invalidate every page.
+    """
+    if not lists:
+        return
+    with transaction.atomic():
+        if replace:
+            SimilarGroup.objects.filter(group_id__in=list(lists)).delete()
+            invalidate_group_details(lists)
+        SimilarGroup.objects.bulk_create([
+            SimilarGroup(group_id=group_id, other_id=other_id, score=score, factors=factors)
+            for group_id, matches in lists.items()
+            for other_id, score, factors in matches[:TOP_K]
+        ], batch_size=1000)
+
+
+def stored_lists(group_ids):
+    """{group_id: ranked (other_id, score, factors)} as stored."""
+    lists = defaultdict(list)
+    for row in SimilarGroup.objects.filter(group_id__in=group_ids).values_list('group_id', 'other_id', 'score', 'factors'):
+        lists[row[0]].append(row[1:])
+    return {group_id: rank(matches) for group_id, matches in lists.items()}
+
+
+def recompute(group_ids, exact=False):
+    """Recompute the stored lists of ``group_ids`` from their candidates."""
+    profiles = load_profiles(Group.objects.filter(id__in=group_ids))
+    save_lists({group_id: compute_similar(profile, exact) for group_id, profile in profiles.items()})
+
+
+def refresh_similar_groups(group_id, exact=False):
+    """Rescore a created or changed group and patch the lists it enters, moves in or leaves."""
+    profile = load_profiles(Group.objects.filter(id=group_id)).get(group_id)
+    if profile is None:
+        return
+    matches = compute_similar(profile, exact)
+    scores = {other_id: (score, factors) for other_id, score, factors in matches}
+    listing = set(SimilarGroup.objects.filter(other_id=group_id).values_list('group_id', flat=True))
+    current = stored_lists(set(scores) | listing)
+
+    lists, stale = {group_id: matches}, []
+    for neighbour_id in set(scores) | listing:
+        entries = current.get(neighbour_id, [])
+        old = next((entry for entry in entries if entry[0] == group_id), None)
+        new = scores.get(neighbour_id)
+        if old and len(entries) >= TOP_K and (new is None or new[0] < old[1]):
+            stale.append(neighbour_id)
+            continue
+        updated = [entry for entry in entries if entry[0] != group_id]
+        if new:
+            updated.append((group_id, *new))
+        updated = rank(updated)[:TOP_K]
+        if updated != entries:
+            lists[neighbour_id] = updated
+    with transaction.atomic():
+        save_lists(lists)
+        recompute(stale, exact)
+
+
+def queue_refresh(group_ids):
+    """Queue ``group_ids`` for rescoring by the scheduler; a group already queued moves to the back."""
+    now = timezone.now()
+    SimilarGroupRefresh.objects.bulk_create(
+        [SimilarGroupRefresh(group_id=group_id, queued_at=now) for group_id in set(group_ids)],
+        update_conflicts=True, unique_fields=['group'], update_fields=['queued_at'],
+    )
+
+
+def process_refresh_queue(limit=None, exact=False):
+    """Rescore up to ``limit`` queued groups, oldest first. Returns the number rescored."""
+    limit = limit or getattr(settings, 'SIMILAR_GROUPS_REFRESH_BATCH', 100)
+    pending = list(SimilarGroupRefresh.objects.order_by('queued_at').values_list('group_id', 'queued_at')[:limit])
+    for group_id, queued_at in pending:
+        with transaction.atomic():
+            refresh_similar_groups(group_id, exact)
+            # A group queued again while it was being rescored stays queued.
+            SimilarGroupRefresh.objects.filter(group_id=group_id, queued_at__lte=queued_at).delete()
+    return len(pending)
+
+
+def matrix_engine_available():
+    """Whether NumPy and SciPy are installed for the vectorized rebuild (similarity_matrix.py)."""
+    # Both are in requirements.txt; without them (e.g. a slim dev install) rebuilds use the Python scorer.
+    try:
+        import numpy  # noqa: F401 - only probed here
+        import scipy.sparse  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def bucketed_lists(profiles, group_ids=None):
+    """
+    {group_id: ranked matches} for ``group_ids`` (default: every profile),
+    scoring each against its candidates in Python.
+    """
+    buckets = defaultdict(set)
+    for profile in profiles.values():
+        buckets['subject', profile.subject_code].add(profile.id)
+        buckets['year_format', profile.year_level, profile.meeting_format].add(profile.id)
+        for tag_id in profile.topics | profile.personality:
+            buckets['tag', tag_id].add(profile.id)
+
+    lists = {}
+    for group_id in (profiles if group_ids is None else group_ids):
+        profile = profiles[group_id]
+        candidate_ids = buckets['subject', profile.subject_code] | buckets['year_format', profile.year_level, profile.meeting_format]
+        for tag_id in profile.topics | profile.personality:
+            candidate_ids = candidate_ids | buckets['tag', tag_id]
+        lists[group_id] = score_candidates(profile, (profiles[other_id] for other_id in candidate_ids))[:TOP_K]
+    return lists
+
+
+def matrix_lists(profiles):
+    """{group_id: ranked matches} for every profile, picking neighbours with blocked matrix scoring."""
+    from .similarity_matrix import top_neighbours
+
+    return {
+        group_id: rank((other_id, *score_pair(profiles[group_id], profiles[other_id])) for other_id in other_ids)
+        for group_id, other_ids in top_neighbours(profiles, TOP_K, MIN_SCORE).items()
+    }
+
+
+def rebuild_similar_groups(engine=None):
+    """
+    Recompute every group's list, and the LSH buckets incremental updates
+    use, and return the number of groups. ``engine`` is 'matrix' or
+    'python'; by default the matrix engine is used when NumPy and SciPy are
+    installed.
+    """
+    if engine is None:
+        engine = 'matrix' if matrix_engine_available() else 'python'
+    started = timezone.now()
+    rebuild_signatures()
+    profiles = load_profiles(Group.objects.all())
+    lists = matrix_lists(profiles) if engine == 'matrix' else bucketed_lists(profiles)
+    with transaction.atomic():
+        SimilarGroup.objects.all().delete()
+        save_lists(lists, replace=False)
+        # Everything queued before the rebuild read the catalogue is covered by it.
+        SimilarGroupRefresh.objects.filter(queued_at__lte=started).delete()
+        invalidate_all_details()
+    return len(profiles)
+
+
+def scan_similar_groups(group_id, profiles=None):
+    """Reference: score ``group_id`` against every other group, best first."""
+    profiles = profiles if profiles is not None else load_profiles(Group.objects.all())
+    return score_candidates(profiles[group_id], profiles.values())
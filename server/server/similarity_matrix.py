@@ -0,0 +1,108 @@
+"""
+Vectorized similarity scoring for full rebuilds (requires NumPy and SciPy).
+
+Every group is encoded once: subject code, year level and meeting format as
+integer category codes, and topic and personality tags as sparse 0/1
+incidence matrices (groups x tags). Then, a block of rows at a time against
+every group:
+
+- tag intersections are sparse products T[block] @ T.T; unions follow
+  from the row sizes, giving the Jaccard overlap;
+- equality features compare category codes (the same as the product of
+  one-hot matrices, without materializing them), and together with the
+  intersections mark the candidate pairs that can score above the
+  minimum;
+- only candidate pairs are scored, summing score_pair()'s weighted terms
+  in the same order so the floating-point scores are identical.
+
+Only the top-k neighbour ids per group are returned; similarity.py rescores
+those pairs with score_pair() to store the exact score and factors. This
+module imports NumPy at load time, so import it only after checking
+similarity.matrix_engine_available().
+"""
+import numpy as np
+from scipy import sparse
+
+# Rows scored per block; the dense block is BLOCK_SIZE x number of groups.
+BLOCK_SIZE = 128
+
+
+def category_codes(values):
+    """Integer codes for ``values``; equal values get equal codes."""
+    codes = {}
+    return np.array([codes.setdefault(value, len(codes)) for value in values], dtype=np.int32)
+
+
+def incidence(tag_sets):
+    """Sparse groups x tags 0/1 matrix (CSR) for a list of tag id sets."""
+    columns = {}
+    indices, indptr = [], [0]
+    for tags in tag_sets:
+        indices.extend(columns.setdefault(tag_id, len(columns)) for tag_id in tags)
+        indptr.append(len(indices))
+    data = np.ones(len(indices), dtype=np.int32)
+    return sparse.csr_matrix((data, indices, indptr), shape=(len(tag_sets), max(len(columns), 1)))
+
+
+def intersections(matrix, transposed, rows, count):
+    """Dense (rows x groups) count of shared tags, from the sparse product of the incidence matrices."""
+    product = (matrix[rows] @ transposed).tocoo()
+    shared = np.zeros((len(rows), count), dtype=np.int16)
+    shared[product.row, product.col] = product.data
+    return shared
+
+
+def jaccard(shared, size, other_size):
+    """Jaccard overlap from shared counts and set sizes; 0 where either side has no tags."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where((size > 0) & (other_size > 0), shared / (size + other_size - shared), 0.0)
+
+
+def top_neighbours(profiles, k, min_score, block_size=BLOCK_SIZE):
+    """
+    {group_id: ids of its k best neighbours scoring above ``min_score``},
+    best first with ties going to the lower id, for a {group_id: Profile}
+    dict.
+    """
+    ids = np.array(sorted(profiles), dtype=np.int64)
+    ordered = [profiles[group_id] for group_id in ids.tolist()]
+    count = len(ordered)
+    subject = category_codes(p.subject_code for p in ordered)
+    year = category_codes(p.year_level for p in ordered)
+    meeting_format = category_codes(p.meeting_format for p in ordered)
+    year_format = category_codes(zip(year.tolist(), meeting_format.tolist()))
+    topics = incidence([p.topics for p in ordered])
+    personality = incidence([p.personality for p in ordered])
+    topics_t, personality_t = topics.T.tocsc(), personality.T.tocsc()
+    topic_sizes, personality_sizes = np.diff(topics.indptr), np.diff(personality.indptr)
+
+    neighbours = {}
+    for start in range(0, count, block_size):
+        rows = np.arange(start, min(start + block_size, count))
+        shared_topics = intersections(topics, topics_t, rows, count)
+        shared_personality = intersections(personality, personality_t, rows, count)
+        # Only pairs sharing a subject, a tag, or both year and format can score above min_score.
+        candidates = (subject[rows, None] == subject[None, :]) | (year_format[rows, None] == year_format[None, :])
+        candidates |= (shared_topics > 0) | (shared_personality > 0)
+        candidates[np.arange(len(rows)), rows] = False
+        r, c = np.nonzero(candidates)
+        row = rows[r]
+
+        # score_pair()'s terms, added in the same order so the floats match exactly.
+        scores = np.where(subject[row] == subject[c], 40.0, 0.0)
+        scores += jaccard(shared_topics[r, c], topic_sizes[row], topic_sizes[c]) * 25
+        scores += jaccard(shared_personality[r, c], personality_sizes[row], personality_sizes[c]) * 20
+        scores += np.where(year[row] == year[c], 10.0, 0.0)
+        scores += np.where(meeting_format[row] == meeting_format[c], 5.0, 0.0)
+        above = scores > min_score
+        r, c, scores = r[above], c[above], scores[above]
+
+        # Best first within each row, ties to the lower id (nonzero() yields
+        # columns in order and both sorts are stable); keep each row's first k.
+        order = np.argsort(-scores, kind='stable')
+        order = order[np.argsort(r[order], kind='stable')]
+        r, c = r[order], c[order]
+        first = np.searchsorted(r, np.arange(len(rows) + 1))
+        for offset in range(len(rows)):
+            neighbours[int(ids[rows[offset]])] = ids[c[first[offset]:min(first[offset] + k, first[offset + 1])]].tolist()
+    return neighbours
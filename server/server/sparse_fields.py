@@ -0,0 +1,47 @@
+"""
+Sparse fieldsets for read endpoints.
+
+``?fields=id,group_name,member_count`` limits each object in a response to
+the named fields, so a client that renders a few columns doesn't pay for
+serializing (or downloading) the rest. Unknown names are ignored; without
+the parameter every field is returned.
+
+Serializers opt in with SparseFieldsMixin and take the requested names as a
+``fields`` argument; hand-built responses filter their dicts with
+select_fields(). Fields a serializer lists in ``opt_in_fields`` are left out
+unless ?fields= names them.
+"""
+
+FIELDS_PARAM = 'fields'
+
+
+def requested_fields(request):
+    """The field names asked for in ?fields=, or None when the parameter is absent or empty."""
+    names = {name.strip() for name in request.query_params.get(FIELDS_PARAM, '').split(',')}
+    names.discard('')
+    return names or None
+
+
+def wants(fields, name):
+    return fields is None or name in fields
+
+
+def select_fields(rows, fields):
+    """``rows`` (a list of dicts) reduced to ``fields``."""
+    if fields is None:
+        return rows
+    return [{key: value for key, value in row.items() if key in fields} for row in rows]
+
+
+class SparseFieldsMixin:
+    """Drops every serializer field not named in the ``fields`` argument before any value is computed."""
+    opt_in_fields = ()
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        else:
+            for name in self.opt_in_fields:
+                self.fields.pop(name, None)
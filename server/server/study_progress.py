@@ -0,0 +1,94 @@
+"""
+Incremental maintenance of GroupStudyProgress.
+
+Session saves and deletes apply their duration delta to the group's scheduled
+totals (see signals.py) and session expiry moves expired hours from scheduled
+to completed in bulk, so the group detail view can read progress from a single
+row instead of iterating the group's sessions. rebuild_progress() recomputes
+the counters from the source rows and is used to repair drift.
+"""
+from django.db.models import Case, F, FloatField, IntegerField, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import Group, GroupSession, GroupStudyProgress, session_hours
+
+
+def compute_scheduled(group_ids=None):
+    """Return {group_id: (scheduled_hours, scheduled_sessions)} computed from GroupSession rows."""
+    sessions = GroupSession.objects.all()
+    if group_ids is not None:
+        sessions = sessions.filter(group_id__in=group_ids)
+    totals = {}
+    for group_id, starts_at, ends_at in sessions.values_list('group_id', 'starts_at', 'ends_at').iterator():
+        hours, count = totals.get(group_id, (0, 0))
+        totals[group_id] = (hours + session_hours(starts_at, ends_at), count + 1)
+    return totals
+
+
+def rebuild_progress(group_id):
+    """Recompute a group's progress row from its sessions, creating it if needed."""
+    hours, count = compute_scheduled([group_id]).get(group_id, (0, 0))
+    completed_hours = Group.objects.filter(id=group_id).values_list('total_study_hours', flat=True).first() or 0
+    progress, created = GroupStudyProgress.objects.get_or_create(
+        group_id=group_id,
+        defaults={'scheduled_hours': hours, 'scheduled_sessions': count, 'completed_hours': completed_hours},
+    )
+    if not created:
+        progress.scheduled_hours = hours
+        progress.scheduled_sessions = count
+        progress.save(update_fields=['scheduled_hours', 'scheduled_sessions', 'updated_at'])
+    return progress
+
+
+def get_progress(group):
+    """Return the group's progress row, rebuilding it if it has never been created."""
+    try:
+        return group.study_progress
+    except GroupStudyProgress.DoesNotExist:
+        return rebuild_progress(group.id)
+
+
+def adjust_scheduled(group_id, hours, sessions, rebuild_missing=True):
+    """Apply a scheduled hours/sessions delta to a group's progress row."""
+    updated = GroupStudyProgress.objects.filter(group_id=group_id).update(
+        scheduled_hours=Greatest(F('scheduled_hours') + hours, Value(0.0)),
+        scheduled_sessions=Greatest(F('scheduled_sessions') + sessions, Value(0)),
+        updated_at=timezone.now(),
+    )
+    if not updated and rebuild_missing:
+        # No row yet: build it from the source rows, which already include this change.
+        rebuild_progress(group_id)
+
+
+def complete_sessions(hours_by_group, sessions_by_group, from_scheduled=True):
+    """
+    Move expired sessions from scheduled to completed for many groups in one
+    UPDATE. With from_scheduled=False the hours are only added to completed
+    (for sessions that were never counted as scheduled).
+    """
+    if not hours_by_group:
+        return
+    GroupStudyProgress.objects.bulk_create(
+        [GroupStudyProgress(group_id=group_id) for group_id in hours_by_group],
+        ignore_conflicts=True,
+    )
+
+    def per_group(values, output_field):
+        return Case(
+            *[When(group_id=group_id, then=Value(value)) for group_id, value in values.items()],
+            default=Value(0),
+            output_field=output_field,
+        )
+
+    hours = per_group(hours_by_group, FloatField())
+    sessions = per_group(sessions_by_group, IntegerField())
+    changes = {
+        'completed_hours': F('completed_hours') + hours,
+        'completed_sessions': F('completed_sessions') + sessions,
+        'updated_at': timezone.now(),
+    }
+    if from_scheduled:
+        changes['scheduled_hours'] = Greatest(F('scheduled_hours') - hours, Value(0.0))
+        changes['scheduled_sessions'] = Greatest(F('scheduled_sessions') - sessions, Value(0))
+    GroupStudyProgress.objects.filter(group_id__in=hours_by_group).update(**changes)
@@ -0,0 +1,75 @@
+"""
+Normalized group tags.
+
+Group.tags (topics) and Group.group_personality stay comma-separated strings
+in the API; every save mirrors them into Tag/GroupTag rows with canonical
+names, so tag filters are indexed joins on GroupTag(tag, group) and
+similarity scoring reads tag ids instead of re-splitting strings.
+"""
+import re
+from collections import defaultdict
+
+from django.db.models import Count
+
+from .models import GroupTag, Tag
+
+# Group field holding each kind's comma-separated string.
+TAG_FIELDS = {Tag.TOPIC: 'tags', Tag.PERSONALITY: 'group_personality'}
+
+
+def canonical_tags(value):
+    """Split a comma-separated string into unique canonical tag names, keeping their order."""
+    names = []
+    for part in (value or '').split(','):
+        name = re.sub(r'\s+', ' ', part).strip().lower()[:100]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def get_tags(kind, names):
+    """Tag rows for ``names`` of ``kind``, creating any that are missing."""
+    if not names:
+        return []
+    existing = {tag.name: tag for tag in Tag.objects.filter(kind=kind, name__in=names)}
+    missing = [Tag(kind=kind, name=name) for name in names if name not in existing]
+    if missing:
+        Tag.objects.bulk_create(missing, ignore_conflicts=True)
+        existing.update((tag.name, tag) for tag in Tag.objects.filter(kind=kind, name__in=[t.name for t in missing]))
+    return [existing[name] for name in names]
+
+
+def sync_group_tags(group, kinds=None):
+    """Make the group's GroupTag rows match its tag strings. Only the differences are written."""
+    kinds = kinds or list(TAG_FIELDS)
+    wanted = {tag.id for kind in kinds for tag in get_tags(kind, canonical_tags(getattr(group, TAG_FIELDS[kind])))}
+    current = set(GroupTag.objects.filter(group=group, tag__kind__in=kinds).values_list('tag_id', flat=True))
+    if current - wanted:
+        GroupTag.objects.filter(group=group, tag_id__in=current - wanted).delete()
+    if wanted - current:
+        GroupTag.objects.bulk_create(
+            [GroupTag(group=group, tag_id=tag_id) for tag_id in wanted - current], ignore_conflicts=True,
+        )
+
+
+def filter_by_tags(queryset, kind, value, match='any'):
+    """
+    Restrict a Group queryset to groups tagged with any (or, with
+    match='all', every one) of the comma-separated tags in ``value``.
+    """
+    names = canonical_tags(value)
+    if not names:
+        return queryset
+    tagged = GroupTag.objects.filter(tag__kind=kind, tag__name__in=names)
+    if match == 'all':
+        tagged = tagged.values('group_id').annotate(matched=Count('tag_id')).filter(matched=len(names))
+    return queryset.filter(id__in=tagged.values('group_id'))
+
+
+def tag_sets(group_ids=None):
+    """{group_id: {kind: set of tag ids}} for ``group_ids`` (default: every group), read in one query."""
+    sets = defaultdict(lambda: {kind: set() for kind in TAG_FIELDS})
+    rows = GroupTag.objects.all() if group_ids is None else GroupTag.objects.filter(group_id__in=group_ids)
+    for group_id, tag_id, kind in rows.values_list('group_id', 'tag_id', 'tag__kind'):
+        sets[group_id][kind].add(tag_id)
+    return sets
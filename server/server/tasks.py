@@ -0,0 +1,39 @@
+"""
+Periodic tasks run by the background scheduler (see scheduler.py).
+
+Each task returns the number of rows it processed, which the scheduler
+publishes alongside the run duration and lag.
+"""
+from django.conf import settings
+
+from .recurrence import credit_elapsed_occurrences
+from .reminders import send_session_reminders
+from .scheduler import periodic_task
+from .session_expiry import expire_past_sessions
+from .similarity import process_refresh_queue, rebuild_similar_groups
+
+
+@periodic_task('expire_sessions', getattr(settings, 'SESSION_EXPIRY_INTERVAL_SECONDS', 60))
+def expire_sessions():
+    return expire_past_sessions()
+
+
+@periodic_task('credit_recurring_sessions', getattr(settings, 'RECURRING_SESSION_CREDIT_INTERVAL_SECONDS', 60))
+def credit_recurring_sessions():
+    return credit_elapsed_occurrences()
+
+
+@periodic_task('send_session_reminders', getattr(settings, 'SESSION_REMINDER_INTERVAL_SECONDS', 60))
+def session_reminders():
+    return send_session_reminders()
+
+
+@periodic_task('refresh_similar_groups', getattr(settings, 'SIMILAR_GROUPS_REFRESH_INTERVAL_SECONDS', 30))
+def refresh_similar_groups():
+    return process_refresh_queue()
+
+
+# LSH can miss weakly overlapping pairs; the full rebuild scores every pair.
+@periodic_task('rebuild_similar_groups', getattr(settings, 'SIMILAR_GROUPS_REBUILD_INTERVAL_SECONDS', 86400))
+def similar_groups_rebuild():
+    return rebuild_similar_groups()
@@ -0,0 +1,1036 @@
+import random
+import threading
+import time
+from datetime import date, datetime, time as dtime, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .benchmarking import LOCAL_CACHES, make_groups, make_sessions, make_users
+from .conflicts import find_overlaps
+from .group_stats import compute_stats, refresh_stats
+from .minhash import BAND_ROWS, BANDS, band_buckets, signature, unpack_signature
+from .models import (
+    SESSION_TIME_ZONE, CompletedSessionCounter, Flashcard, FlashcardFolder, Group, GroupBucket, GroupFile,
+    GroupNotification, GroupRating, GroupSession, GroupSignature, GroupStats, GroupTag, RecurrenceException,
+    RecurringSession, Message, ScheduledTaskState, SchedulerLease, SimilarGroup, SimilarGroupRefresh, Tag, User,
+    UserNotification,
+)
+from .recurrence import credit_elapsed_occurrences, expand, last_occurrence, materialize, occurrence_dates
+from .reminders import send_session_reminders
+from .scheduler import Scheduler, TaskRegistry, acquire_lease, registry, release_lease
+from .session_expiry import expire_past_sessions
+from .session_history import attendance_by_user, hours_attended, hours_per_week
+from . import search, tasks
+from .views import BUNDLE_PRIVATE_SECTIONS, BUNDLE_QUERY_BUDGET
+from .similarity import TOP_K, process_refresh_queue, rebuild_similar_groups, stored_lists
+from .tags import TAG_FIELDS, canonical_tags
+
+
+def make_user(email, **fields):
+    return User.objects.create_user(
+        **fields, email=email, password='password', name=email.split('@')[0], major='Science',
+        year_level='1', preferred_study_format='Online', languages_spoken='English',
+    )
+
+
+def make_group(creator, **fields):
+    fields.setdefault('group_name', 'Group')
+    fields.setdefault('subject_code', 'COMP10001')
+    fields.setdefault('description', 'Study group')
+    fields.setdefault('year_level', '1')
+    fields.setdefault('meeting_format', 'Online')
+    fields.setdefault('primary_language', 'English')
+    fields.setdefault('meeting_schedule', 'Weekly')
+    fields.setdefault('location', 'Library')
+    group = Group.objects.create(creator=creator, **fields)
+    group.members.add(creator)
+    return group
+
+
+def make_session(group, creator, starts_at, hours=1):
+    local = starts_at.astimezone(SESSION_TIME_ZONE)
+    return GroupSession.objects.create(
+        group=group, creator=creator, date=local.date(), start_time=local.time(),
+        end_time=(local + timedelta(hours=hours)).time(), location='Library',
+    )
+
+
+class SessionExpiryTests(TransactionTestCase):
+    # Expiry commits its own transaction, where deferred foreign keys are checked.
+
+    def test_expiry_after_reminder(self):
+        user = make_user('reminded@example.com')
+        group = make_group(user)
+        now = SESSION_TIME_ZONE.localize(datetime(2030, 5, 6, 10, 0))
+        session = make_session(group, user, now + timedelta(minutes=30))
+        session.attendees.add(user)
+
+        self.assertEqual(send_session_reminders(now=now), 1)
+        notification = UserNotification.objects.get(user=user)
+        self.assertEqual(notification.session_id, session.id)
+
+        self.assertEqual(expire_past_sessions(now=now + timedelta(hours=2)), 1)
+        self.assertFalse(GroupSession.objects.filter(id=session.id).exists())
+        notification.refresh_from_db()
+        self.assertIsNone(notification.session_id)
+
+
+def make_rule(group, **fields):
+    fields.setdefault('start_time', dtime(10, 0))
+    fields.setdefault('end_time', dtime(12, 0))
+    fields.setdefault('location', 'Library')
+    fields.setdefault('starts_on', date(2030, 5, 6))  # a Monday
+    return RecurringSession.objects.create(group=group, creator=group.creator, **fields)
+
+
+class RecurringSessionTests(TestCase):
+
+    def setUp(self):
+        self.creator = make_user('series@example.com')
+        self.group = make_group(self.creator)
+
+    def dates(self, start, end, **fields):
+        rule = RecurringSession(start_time=dtime(10, 0), end_time=dtime(12, 0), starts_on=date(2030, 5, 6), **fields)
+        return occurrence_dates(rule, start, end)
+
+    def test_expansion_follows_interval_count_and_until(self):
+        may, june = date(2030, 5, 1), date(2030, 6, 30)
+        self.assertEqual(
+            self.dates(may, june, frequency='DAILY', interval=3, count=4),
+            [date(2030, 5, 6), date(2030, 5, 9), date(2030, 5, 12), date(2030, 5, 15)],
+        )
+        # A window starting mid-series still stops at COUNT.
+        self.assertEqual(
+            self.dates(date(2030, 5, 10), june, frequency='DAILY', interval=3, count=4),
+            [date(2030, 5, 12), date(2030, 5, 15)],
+        )
+        # Every other week on Monday and Wednesday, until a Monday.
+        self.assertEqual(
+            self.dates(may, june, frequency='WEEKLY', interval=2, by_weekday='0,2', until=date(2030, 6, 3)),
+            [date(2030, 5, 6), date(2030, 5, 8), date(2030, 5, 20), date(2030, 5, 22), date(2030, 6, 3)],
+        )
+        # Months without the 31st are skipped and do not count.
+        rule = RecurringSession(frequency='MONTHLY', interval=1, count=3, starts_on=date(2030, 1, 31))
+        self.assertEqual(
+            occurrence_dates(rule, date(2030, 1, 1), date(2030, 12, 31)),
+            [date(2030, 1, 31), date(2030, 3, 31), date(2030, 5, 31)],
+        )
+        self.assertEqual(last_occurrence(rule), date(2030, 5, 31))
+
+    def test_exceptions_are_left_out_of_the_expansion(self):
+        rule = make_rule(self.group, frequency='WEEKLY', count=4)
+        RecurrenceException.objects.create(rule=rule, date=date(2030, 5, 13))
+        start = SESSION_TIME_ZONE.localize(datetime(2030, 5, 1))
+        rules = RecurringSession.objects.filter(id=rule.id).prefetch_related('exceptions')
+        self.assertEqual(
+            [occurrence for _, occurrence, _, _ in expand(rules, start, start + timedelta(days=60))],
+            [date(2030, 5, 6), date(2030, 5, 20), date(2030, 5, 27)],
+        )
+
+    def test_an_occurrence_has_at_most_one_session(self):
+        rule = make_rule(self.group, frequency='WEEKLY')
+        session = materialize(rule, date(2030, 5, 13))
+        self.assertEqual(materialize(rule, date(2030, 5, 13)), session)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            GroupSession.objects.create(
+                group=self.group, creator=self.creator, recurrence=rule, occurrence_date=date(2030, 5, 13),
+                date=date(2030, 5, 13), start_time=dtime(10, 0), end_time=dtime(12, 0), location='Library',
+            )
+        with self.assertRaises(ValueError):
+            materialize(rule, date(2030, 5, 14))
+
+    def test_cancel_and_join_occurrences(self):
+        rule = make_rule(self.group, frequency='WEEKLY')
+        member = make_user('attendee@example.com')
+        self.group.members.add(member)
+        creator, attendee = APIClient(), APIClient()
+        creator.force_authenticate(self.creator)
+        attendee.force_authenticate(member)
+        url = f'/api/recurring-sessions/{rule.id}/occurrences/'
+
+        self.assertEqual(attendee.post(f'{url}2030-05-13/cancel/').status_code, 403)
+        self.assertEqual(creator.post(f'{url}2030-05-14/cancel/').status_code, 400)
+        self.assertEqual(creator.post(f'{url}2030-05-13/cancel/').status_code, 204)
+        self.assertEqual(creator.post(f'{url}2030-05-13/cancel/').status_code, 400)
+        self.assertEqual(attendee.post(f'{url}2030-05-13/join/').status_code, 400)
+
+        self.assertEqual(attendee.post(f'{url}2030-05-20/join/').status_code, 200)
+        session = GroupSession.objects.get(recurrence=rule, occurrence_date=date(2030, 5, 20))
+        self.assertEqual(list(session.attendees.values_list('id', flat=True)), [member.id])
+        self.assertEqual(attendee.post(f'{url}2030-05-20/join/').json()['session_id'], session.id)
+
+    def test_series_use_the_one_off_session_time_rules(self):
+        client = APIClient()
+        client.force_authenticate(self.creator)
+        url = f'/api/groups/{self.group.id}/recurring-sessions/'
+        series = {'location': 'Library', 'frequency': 'WEEKLY', 'starts_on': '2030-05-06'}
+        response = client.post(url, {**series, 'start_time': '00:00:00', 'end_time': '02:00:00'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('midnight', response.json()['error'])
+        self.assertEqual(client.post(url, {**series, 'start_time': '10:00:00', 'end_time': '12:00:00'}).status_code, 201)
+
+    def test_elapsed_occurrences_are_credited_once(self):
+        rule = make_rule(
+            self.group, frequency='DAILY', count=4, credited_through=SESSION_TIME_ZONE.localize(datetime(2030, 5, 6)),
+        )
+        RecurrenceException.objects.create(rule=rule, date=date(2030, 5, 8))
+        now = SESSION_TIME_ZONE.localize(datetime(2030, 5, 8, 13, 0))
+        self.assertEqual(credit_elapsed_occurrences(now=now), 2)
+        self.assertEqual(credit_elapsed_occurrences(now=now), 0)
+        self.assertEqual(credit_elapsed_occurrences(now=now + timedelta(days=2)), 1)
+        self.group.refresh_from_db()
+        rule.refresh_from_db()
+        self.assertEqual(self.group.total_study_hours, 6)
+        self.assertTrue(rule.exhausted)
+
+    def test_crediting_is_its_own_task(self):
+        names = {task.name: task.func for task in registry}
+        self.assertIs(names['credit_recurring_sessions'], tasks.credit_recurring_sessions)
+        self.assertIs(names['expire_sessions'], tasks.expire_sessions)
+
+
+class CalendarFeedTests(TestCase):
+
+    def setUp(self):
+        self.user = make_user('calendar@example.com')
+        self.group = make_group(self.user, group_name='Feed group')
+        self.session = make_session(self.group, self.user, SESSION_TIME_ZONE.localize(datetime(2030, 5, 6, 10, 0)))
+        self.rule = make_rule(self.group, frequency='WEEKLY', count=3)
+        outsider = make_user('outsider@example.com')
+        self.hidden = make_session(make_group(outsider), outsider, SESSION_TIME_ZONE.localize(datetime(2030, 5, 7, 10, 0)))
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+        self.token = self.api.get('/api/me/calendar-token/').json()['token']
+
+    def feed(self, method='get', token=None, **headers):
+        return getattr(self.client, method)('/api/me/calendar.ics', {'token': token or self.token}, **headers)
+
+    def test_feed_lists_the_users_sessions(self):
+        response = self.feed()
+        self.assertEqual(response.status_code, 200)
+        body = b''.join(response.streaming_content).decode()
+        self.assertTrue(body.startswith('BEGIN:VCALENDAR'))
+        self.assertTrue(body.rstrip().endswith('END:VCALENDAR'))
+        self.assertIn(f'UID:session-{self.session.id}@', body)
+        self.assertIn(f'UID:recurring-{self.rule.id}@', body)
+        self.assertIn('RRULE:FREQ=WEEKLY;INTERVAL=1;BYDAY=MO;COUNT=3', body)
+        self.assertNotIn(f'UID:session-{self.hidden.id}@', body)
+
+    def test_token_authenticates_the_feed(self):
+        self.assertEqual(self.client.get('/api/me/calendar.ics').status_code, 401)
+        self.assertEqual(self.feed(token='not-a-token').status_code, 401)
+        rotated = self.api.post('/api/me/calendar-token/').json()['token']
+        self.assertEqual(self.feed().status_code, 401)
+        self.assertEqual(self.feed(token=rotated).status_code, 200)
+
+    def test_conditional_requests(self):
+        etag = self.feed()['ETag']
+        self.assertEqual(self.feed(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        head = self.feed('head')
+        self.assertEqual((head.status_code, head['ETag']), (200, etag))
+        self.assertFalse(head.streaming)
+        self.assertEqual(head.content, b'')
+        self.assertEqual(self.feed('head', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_session_change_invalidates_the_feed(self):
+        etag = self.feed()['ETag']
+        self.session.location = 'Baillieu Library'
+        self.session.save()
+        response = self.feed(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn('LOCATION:Baillieu Library', b''.join(response.streaming_content).decode())
+
+
+class MySessionsTests(TestCase):
+
+    def setUp(self):
+        self.user = make_user('agenda@example.com')
+        self.group = make_group(self.user)
+        start = SESSION_TIME_ZONE.localize(datetime(2030, 5, 6, 10, 0))
+        # Created out of start order; two share a start time.
+        self.sessions = [
+            make_session(self.group, self.user, start + timedelta(days=days)) for days in (3, 0, 1, 1, 2)
+        ]
+        outsider = make_user('elsewhere@example.com')
+        make_session(make_group(outsider), outsider, start)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_keyset_pages_follow_start_time(self):
+        expected = [s.id for s in sorted(self.sessions, key=lambda s: (s.starts_at, s.id))]
+        body = self.client.get('/api/me/sessions/', {'page_size': 2}).json()
+        seen = [row['id'] for row in body['results']]
+        while body['next_cursor']:
+            body = self.client.get('/api/me/sessions/', {'page_size': 2, 'cursor': body['next_cursor']}).json()
+            seen += [row['id'] for row in body['results']]
+        self.assertEqual(seen, expected)
+
+        window = {'from': '2030-05-07', 'to': '2030-05-08'}
+        self.assertEqual(len(self.client.get('/api/me/sessions/', window).json()['results']), 2)
+
+    def test_not_modified_is_answered_before_reading_the_page(self):
+        etag = self.client.get('/api/me/sessions/')['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/me/sessions/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        # Each page has its own validator.
+        self.assertNotEqual(self.client.get('/api/me/sessions/', {'page_size': 2})['ETag'], etag)
+
+    def test_changes_give_a_new_etag(self):
+        etag = self.client.get('/api/me/sessions/')['ETag']
+        self.sessions[0].location = 'Online'
+        self.sessions[0].save()
+        response = self.client.get('/api/me/sessions/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        etag = response['ETag']
+        self.group.group_name = 'Renamed'
+        self.group.save()
+        response = self.client.get('/api/me/sessions/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({row['group_name'] for row in response.json()['results']}, {'Renamed'})
+
+        etag = response['ETag']
+        self.sessions[1].delete()
+        self.assertEqual(self.client.get('/api/me/sessions/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+def brute_force_overlaps(intervals):
+    """Every clashing pair by comparing all pairs: {(frozenset of items, overlap start, overlap end)}."""
+    overlaps = set()
+    for i, (start_a, end_a, a) in enumerate(intervals):
+        for start_b, end_b, b in intervals[i + 1:]:
+            start, end = max(start_a, start_b), min(end_a, end_b)
+            if start < end:
+                overlaps.add((frozenset((a, b)), start, end))
+    return overlaps
+
+
+class SessionConflictTests(TestCase):
+
+    def assert_matches_brute_force(self, intervals):
+        found = find_overlaps(intervals)
+        self.assertEqual(len(found), len({(a, b) for a, b, _, _ in found}))
+        self.assertEqual({(frozenset((a, b)), start, end) for a, b, start, end in found}, brute_force_overlaps(intervals))
+        starts = {item: start for start, _, item in intervals}
+        for a, b, _, _ in found:
+            self.assertLessEqual(starts[a], starts[b])
+
+    def test_touching_sessions_do_not_clash(self):
+        self.assertEqual(find_overlaps([(0, 2, 'a'), (2, 4, 'b'), (4, 5, 'c')]), [])
+
+    def test_nested_and_multiple_overlaps(self):
+        intervals = [(0, 10, 'outer'), (2, 3, 'inner'), (2, 5, 'shares start'), (4, 12, 'late'), (10, 11, 'after outer')]
+        self.assert_matches_brute_force(intervals)
+        self.assertIn(('outer', 'inner', 2, 3), find_overlaps(intervals))
+
+    def test_random_intervals_match_brute_force(self):
+        rng = random.Random(3)
+        for _ in range(50):
+            intervals = []
+            for item in range(rng.randrange(1, 40)):
+                start = rng.randrange(48)
+                intervals.append((start, start + rng.randrange(1, 8), item))
+            self.assert_matches_brute_force(intervals)
+
+    def test_join_warns_about_clashing_sessions(self):
+        user = make_user('busy@example.com')
+        group = make_group(user)
+        start = SESSION_TIME_ZONE.localize(datetime(2030, 5, 6, 10, 0))
+        first = make_session(group, user, start, hours=2)
+        touching = make_session(group, user, start + timedelta(hours=2))
+        clashing = make_session(group, user, start + timedelta(hours=1), hours=2)
+        client = APIClient()
+        client.force_authenticate(user)
+
+        client.post(f'/api/sessions/{first.id}/join/')
+        self.assertNotIn('warning', client.post(f'/api/sessions/{touching.id}/join/').json())
+        body = client.post(f'/api/sessions/{clashing.id}/join/').json()
+        self.assertEqual(body['warning'], 'This session overlaps 2 other session(s) you have joined.')
+        self.assertEqual([row['id'] for row in body['conflicts']], [first.id, touching.id])
+
+
+class GroupDetailCacheTests(TestCase):
+
+    def test_expiry_invalidates_cached_detail(self):
+        user = make_user('detail@example.com')
+        group = make_group(user)
+        now = SESSION_TIME_ZONE.localize(datetime(2030, 5, 6, 10, 0))
+        make_session(group, user, now, hours=2)
+        url = f'/api/groups/{group.id}/'
+
+        self.assertEqual(self.client.get(url).json()['total_study_hours'], 0)
+        # The scheduler process expires sessions; its bump reaches the web process through the shared cache.
+        with self.captureOnCommitCallbacks(execute=True):
+            expire_past_sessions(now=now + timedelta(hours=3))
+        self.assertEqual(self.client.get(url).json()['total_study_hours'], 2)
+
+
+class GroupFacetsCacheTests(TestCase):
+
+    def test_new_group_invalidates_cached_facets(self):
+        user = make_user('facets@example.com')
+        make_group(user, subject_code='COMP10001')
+        url = '/api/groups/facets/?year_level=1'
+
+        self.assertEqual(self.client.get(url).json()['total'], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            make_group(user, subject_code='MAST10006')
+        facets = self.client.get(url).json()
+        self.assertEqual(facets['total'], 2)
+        self.assertEqual(
+            {row['value']: row['count'] for row in facets['subject']},
+            {'COMP10001': 1, 'MAST10006': 1},
+        )
+
+
+class GroupListPaginationTests(TestCase):
+
+    def test_list_is_a_plain_array_by_default(self):
+        user = make_user('array@example.com')
+        groups = make_groups(60, user)
+
+        body = self.client.get('/api/groups/').json()
+        self.assertIsInstance(body, list)
+        self.assertEqual(sorted(row['id'] for row in body), sorted(group.id for group in groups))
+
+    def test_page_size_or_cursor_asks_for_pages(self):
+        user = make_user('pages@example.com')
+        groups = make_groups(60, user)
+
+        body = self.client.get('/api/groups/', {'page_size': 50}).json()
+        self.assertEqual(len(body['results']), 50)
+        seen = [row['id'] for row in body['results']]
+        body = self.client.get('/api/groups/', {'cursor': body['next_cursor']}).json()
+        self.assertIsNone(body['next_cursor'])
+        seen += [row['id'] for row in body['results']]
+        self.assertEqual(sorted(seen), sorted(group.id for group in groups))
+
+    def test_members_sort_follows_member_count(self):
+        creator = make_user('sorter@example.com')
+        joiner = make_user('joiner@example.com')
+        left = make_group(creator, group_name='Creator left')
+        left.members.remove(creator)
+        left.members.add(joiner)
+        alone = make_group(creator, group_name='Creator only')
+        empty = make_group(creator, group_name='Empty')
+        empty.members.remove(creator)
+        # One-member groups of either kind tie, so created_at puts the newest first.
+        body = self.client.get('/api/groups/', {'sort': 'members', 'page_size': 1}).json()
+        rows = body['results']
+        while body['next_cursor']:
+            body = self.client.get('/api/groups/', {'sort': 'members', 'cursor': body['next_cursor']}).json()
+            rows += body['results']
+        self.assertEqual([row['id'] for row in rows], [left.id, empty.id, alone.id])
+        self.assertEqual([row['member_count'] for row in rows], [2, 1, 1])
+
+    def test_mine_lists_created_and_joined_groups(self):
+        user = make_user('mine@example.com')
+        other = make_user('other@example.com')
+        created = make_group(user)
+        joined = make_group(other)
+        joined.members.add(user)
+        make_group(other)
+        client = APIClient()
+        client.force_authenticate(user)
+        body = client.get('/api/groups/', {'mine': 'true'}).json()
+        self.assertEqual(sorted(row['id'] for row in body), sorted([created.id, joined.id]))
+        self.assertEqual(self.client.get('/api/groups/', {'mine': 'true'}).status_code, 401)
+
+
+class GroupSearchTests(TestCase):
+
+    def setUp(self):
+        creator = make_user('search@example.com')
+        self.by_name = make_group(creator, group_name='Calculus crammers', subject_code='MAST10006', description='Weekly problem sets.')
+        self.by_description = make_group(
+            creator, group_name='Late night study', subject_code='MAST10007', description='We revise calculus before exams.',
+        )
+        self.by_code = make_group(creator, group_name='Intro programming', subject_code='COMP10001', description='Python labs.')
+        # Tests build their schema from the models, so the FTS5 table only exists once rebuilt.
+        self.addCleanup(setattr, search, '_fts_available', False)
+        self.assertEqual(search.rebuild_index(), 3)
+
+    def ids(self, query, **params):
+        return [row['id'] for row in self.client.get('/api/groups/', {'search': query, **params}).json()]
+
+    def test_name_matches_rank_above_description_matches(self):
+        self.assertEqual(self.ids('calculus'), [self.by_name.id, self.by_description.id])
+        self.assertEqual(self.ids('calc'), [self.by_name.id, self.by_description.id])
+
+    def test_cursor_walks_the_relevance_order(self):
+        twin = make_group(self.by_name.creator, group_name='Calculus crammers', subject_code='MAST10006', description='Weekly problem sets.')
+        expected = self.ids('calculus')
+        self.assertEqual(set(expected), {self.by_name.id, twin.id, self.by_description.id})
+        body = self.client.get('/api/groups/', {'search': 'calculus', 'page_size': 1}).json()
+        walked = [row['id'] for row in body['results']]
+        while body['next_cursor']:
+            body = self.client.get('/api/groups/', {'search': 'calculus', 'cursor': body['next_cursor']}).json()
+            walked += [row['id'] for row in body['results']]
+        self.assertEqual(walked, expected)
+
+    def test_digits_still_match_inside_subject_codes(self):
+        self.assertEqual(self.ids('10001'), [self.by_code.id])
+        # Longer alphabetic fragments only match at the start of a word.
+        self.assertEqual(self.ids('ython'), [])
+        self.assertEqual(self.ids('pyth'), [self.by_code.id])
+
+
+class SessionHistoryTests(TestCase):
+
+    def test_aggregates_over_archived_sessions(self):
+        creator = make_user('history@example.com')
+        # Ids beyond 32 bits must archive as well (DEFAULT_AUTO_FIELD is BigAutoField).
+        big = make_user('big-id@example.com', id=2 ** 32 + 5)
+        group = make_group(creator)
+        now = SESSION_TIME_ZONE.localize(datetime(2030, 5, 6, 10, 0))
+        first = make_session(group, creator, now, hours=2)
+        first.attendees.add(creator, big)
+        second = make_session(group, creator, now + timedelta(days=1), hours=1)
+        second.attendees.add(big)
+
+        self.assertEqual(expire_past_sessions(now=now + timedelta(days=2)), 2)
+        self.assertEqual(attendance_by_user(group.id), {creator.id: 1, big.id: 2})
+        self.assertEqual(hours_attended(big.id), 3)
+        self.assertEqual(hours_attended(big.id, since=now + timedelta(hours=12)), 1)
+        self.assertEqual(hours_attended(creator.id, group_id=group.id), 2)
+        self.assertEqual([week['hours'] for week in hours_per_week(group.id)], [3])
+
+
+class SessionAttendeeCountTests(TestCase):
+
+    def setUp(self):
+        self.creator = make_user('attend@example.com')
+        self.group = make_group(self.creator)
+        self.session = make_session(self.group, self.creator, SESSION_TIME_ZONE.localize(datetime(2030, 5, 6, 10, 0)))
+
+    def attendee_count(self):
+        self.session.refresh_from_db()
+        return self.session.attendee_count
+
+    def test_join_response_lists_attendees(self):
+        other = make_user('other@example.com')
+        self.session.attendees.add(other)
+        client = APIClient()
+        client.force_authenticate(self.creator)
+
+        body = client.post(f'/api/sessions/{self.session.id}/join/').json()
+        self.assertEqual(body['attendee_count'], 2)
+        self.assertEqual(sorted(body['attendees']), sorted([self.creator.id, other.id]))
+
+    def test_direct_attendee_changes_are_recounted(self):
+        users = [make_user(f'attendee{i}@example.com') for i in range(3)]
+        self.session.attendees.add(*users)
+        self.assertEqual(self.attendee_count(), 3)
+        self.session.attendees.remove(users[0])
+        self.assertEqual(self.attendee_count(), 2)
+        users[1].delete()
+        self.assertEqual(self.attendee_count(), 1)
+        users[2].joined_sessions.clear()
+        self.assertEqual(self.attendee_count(), 0)
+
+    def test_reconcile_repairs_drifted_count(self):
+        self.session.attendees.add(self.creator)
+        GroupSession.objects.filter(id=self.session.id).update(attendee_count=7)
+
+        call_command('reconcile_group_stats', '--check', stdout=StringIO())
+        self.assertEqual(self.attendee_count(), 7)
+        call_command('reconcile_group_stats', stdout=StringIO())
+        self.assertEqual(self.attendee_count(), 1)
+
+
+class CompletedSessionCounterTests(TransactionTestCase):
+    # Writers need their own connections and committed transactions to race for real.
+
+    def test_parallel_increments_are_not_lost(self):
+        workers, increments = 8, 50
+        errors = []
+        start = threading.Barrier(workers)
+
+        def writer():
+            try:
+                start.wait()
+                for _ in range(increments):
+                    CompletedSessionCounter.increment()
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=writer) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(CompletedSessionCounter.total(), workers * increments)
+
+
+def task_registry(*names, interval=600, func=None):
+    """A TaskRegistry of ``names`` recording their runs in the returned list."""
+    runs = []
+    tasks = TaskRegistry()
+    for name in names:
+        tasks.register(name, func or (lambda name=name: runs.append(name)), interval)
+    return tasks, runs
+
+
+class SchedulerTests(TransactionTestCase):
+    # tick() calls close_old_connections(), which closes a connection left in TestCase's transaction;
+    # the heartbeat also renews the lease from its own thread and connection.
+    ttl = timedelta(seconds=30)
+
+    def test_acquire_lease(self):
+        self.assertTrue(acquire_lease('a', self.ttl))
+        self.assertFalse(acquire_lease('b', self.ttl))
+        first = SchedulerLease.objects.get().expires_at
+        self.assertTrue(acquire_lease('a', self.ttl))
+        self.assertGreater(SchedulerLease.objects.get().expires_at, first)
+
+        SchedulerLease.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertTrue(acquire_lease('b', self.ttl))
+        self.assertFalse(acquire_lease('a', self.ttl))
+        release_lease('b')
+        self.assertTrue(acquire_lease('a', self.ttl))
+
+    def test_leadership_hands_over_when_the_lease_expires(self):
+        tasks, runs = task_registry('sweep', interval=0)
+        first, second = Scheduler(tasks, 'first', self.ttl), Scheduler(tasks, 'second', self.ttl)
+        self.assertEqual(first.tick(), ['sweep'])
+        self.assertEqual(second.tick(), [])
+        self.assertFalse(second.is_leader)
+
+        SchedulerLease.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(second.tick(), ['sweep'])
+        self.assertEqual(first.tick(), [])
+        self.assertEqual((first.is_leader, second.is_leader), (False, True))
+        self.assertEqual(runs, ['sweep', 'sweep'])
+        self.assertEqual(ScheduledTaskState.objects.get(name='sweep').last_holder, 'second')
+
+    def test_overdue_task_catches_up_with_one_run(self):
+        tasks, runs = task_registry('sweep', interval=600)
+        ScheduledTaskState.objects.create(name='sweep', last_started_at=timezone.now() - timedelta(hours=1), run_count=3)
+        scheduler = Scheduler(tasks, 'leader', self.ttl)
+        self.assertEqual(scheduler.tick(), ['sweep'])
+        self.assertEqual(scheduler.tick(), [])
+        state = ScheduledTaskState.objects.get(name='sweep')
+        self.assertEqual((runs, state.run_count, state.last_holder), (['sweep'], 4, 'leader'))
+        # Due 50 minutes ago.
+        self.assertAlmostEqual(state.last_lag_ms / 60000, 50, delta=1)
+
+    def test_tasks_stop_once_the_lease_is_lost(self):
+        def stolen():
+            SchedulerLease.objects.update(holder='usurper', expires_at=timezone.now() + self.ttl)
+        tasks, runs = task_registry('steal', 'sweep')
+        tasks.register('steal', stolen, 600)
+        scheduler = Scheduler(tasks, 'leader', self.ttl)
+        self.assertEqual(scheduler.tick(), ['steal'])
+        self.assertEqual(runs, [])
+        self.assertFalse(scheduler.is_leader)
+
+    def test_lease_is_renewed_while_a_task_outlives_its_ttl(self):
+        ttl = timedelta(seconds=0.6)
+        tasks, _ = task_registry('slow', func=lambda: time.sleep(1.5))
+        scheduler = Scheduler(tasks, 'leader', ttl)
+        self.assertEqual(scheduler.tick(), ['slow'])
+        self.assertTrue(scheduler.is_leader)
+        self.assertEqual(SchedulerLease.objects.get().holder, 'leader')
+        self.assertFalse(acquire_lease('other', ttl))
+
+
+# Response caches off, and a local cache so the counts are the views' own queries.
+@override_settings(CACHES=LOCAL_CACHES, GROUP_LIST_CACHE_SECONDS=0, GROUP_DETAIL_CACHE_SECONDS=0)
+class GroupQueryCountTests(TestCase):
+
+    def seed(self, count):
+        users = [make_user(f'member{i}@example.com') for i in range(4)]
+        groups = make_groups(count, users[0])
+        for i, group in enumerate(groups):
+            group.members.add(*users[:i % 4 + 1])
+            GroupRating.objects.bulk_create([GroupRating(group=group, user=user, rating=4.0) for user in users[:i % 3]])
+        # Bulk inserts skip the signals that maintain the counters
+        refresh_stats([group.id for group in groups])
+        client = APIClient()
+        client.force_authenticate(users[1])
+        # Bulk-created groups have no progress row yet; the first detail read creates it.
+        client.get(f'/api/groups/{groups[0].id}/')
+        return groups, client
+
+    def assert_fixed_queries(self, count):
+        groups, client = self.seed(count)
+        with self.assertNumQueries(1):
+            self.client.get('/api/groups/')
+        with self.assertNumQueries(3):
+            client.get('/api/groups/')
+        with self.assertNumQueries(5):
+            client.get(f'/api/groups/{groups[0].id}/')
+
+    def test_few_groups(self):
+        self.assert_fixed_queries(3)
+
+    def test_many_groups(self):
+        self.assert_fixed_queries(40)
+
+
+@override_settings(CACHES=LOCAL_CACHES, GROUP_DETAIL_CACHE_SECONDS=0)
+class GroupBundleQueryTests(TestCase):
+    # Every section of /api/groups/<id>/bundle/, with the detail cache off.
+
+    def seed(self, rows):
+        rng = random.Random(rows)
+        users = make_users(rows + 1)
+        creator, viewer = users[0], users[1]
+        group, = make_groups(1, creator)
+        group.members.add(*users[1:])
+        Message.objects.bulk_create([Message(group=group, user=rng.choice(users), text=f'Message {i}') for i in range(rows)])
+        GroupNotification.objects.bulk_create([GroupNotification(group=group, message=f'Notification {i}') for i in range(rows)])
+        GroupFile.objects.bulk_create([
+            GroupFile(group=group, uploaded_by=rng.choice(users), file=f'group_files/bench-{i}.txt',
+                      original_filename=f'bench-{i}.txt', file_size=1024)
+            for i in range(rows)
+        ])
+        GroupRating.objects.bulk_create([GroupRating(group=group, user=user, rating=4.0) for user in users[1:]])
+        make_sessions(rows, [group], creator, (timezone.now() + timedelta(days=7)).date())
+        for session in group.sessions.all():
+            session.attendees.add(*rng.sample(users, 3))
+        folders = FlashcardFolder.objects.bulk_create([
+            FlashcardFolder(name=f'Folder {i}', creator=viewer, group=group) for i in range(rows)
+        ])
+        Flashcard.objects.bulk_create([Flashcard(folder=folder, question='Q', answer='A') for folder in folders for _ in range(3)])
+        # Bulk inserts skip the signals that maintain the counters
+        refresh_stats([group.id])
+        outsider = make_user(f'outsider{rows}@example.com')
+        # Bulk-created groups have no progress row yet; the first read creates it.
+        self.bundle(group, viewer)
+        return group, viewer, outsider
+
+    def bundle(self, group, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.get(f'/api/groups/{group.id}/bundle/').json()
+
+    def test_bundle_queries_are_fixed_and_within_budget(self):
+        member_queries, outsider_queries = 10, 5
+        self.assertLessEqual(member_queries, BUNDLE_QUERY_BUDGET)
+        for rows in (3, 40):
+            group, viewer, outsider = self.seed(rows)
+            with self.subTest(rows=rows, user='member'), self.assertNumQueries(member_queries):
+                body = self.bundle(group, viewer)
+            self.assertNotIn('errors', body)
+            # Private sections are refused without being queried.
+            with self.subTest(rows=rows, user='non-member'), self.assertNumQueries(outsider_queries):
+                body = self.bundle(group, outsider)
+            self.assertEqual(set(body['errors']), set(BUNDLE_PRIVATE_SECTIONS))
+
+
+@override_settings(CACHES=LOCAL_CACHES, GROUP_LIST_CACHE_SECONDS=0)
+class GroupCardPayloadTests(TestCase):
+    card_fields = {
+        'id', 'group_name', 'subject_code', 'course_name', 'description', 'year_level', 'meeting_format',
+        'primary_language', 'meeting_schedule', 'location', 'tags', 'group_personality', 'created_at',
+        'creator', 'creator_name', 'creator_email', 'member_count', 'joined', 'average_rating',
+        'rating_count', 'user_rating',
+    }
+
+    def setUp(self):
+        self.creator = make_user('cards@example.com')
+        self.member = make_user('carded@example.com')
+        self.group = make_group(self.creator, description='x' * 500, group_guidelines='Be kind.')
+        self.group.members.add(self.member)
+
+    def test_cards_leave_out_members_and_long_text(self):
+        (row,) = self.client.get('/api/groups/').json()
+        self.assertEqual(set(row), self.card_fields)
+        self.assertEqual(row['description'], 'x' * 300 + '…')
+        self.assertEqual(row['member_count'], 2)
+
+    def test_members_and_full_description_on_request(self):
+        (row,) = self.client.get('/api/groups/', {'fields': 'id,members,full_description'}).json()
+        self.assertEqual(set(row), {'id', 'members', 'full_description'})
+        self.assertEqual(sorted(row['members']), sorted([self.creator.id, self.member.id]))
+        self.assertEqual(row['full_description'], 'x' * 500)
+
+    def test_opt_in_fields_cost_a_fixed_number_of_queries(self):
+        for i in range(20):
+            make_group(self.creator, group_name=f'More {i}').members.add(self.member)
+        with self.assertNumQueries(1):
+            self.client.get('/api/groups/', {'fields': 'id,full_description'})
+        # One more for the member prefetch, however many groups there are.
+        with self.assertNumQueries(2):
+            self.client.get('/api/groups/', {'fields': 'id,members'})
+
+
+class GroupTagSyncTests(TestCase):
+
+    def setUp(self):
+        self.creator = make_user('tagged@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.creator)
+
+    def assertTagsMatchStrings(self):
+        """GroupTag rows must equal the canonical tags recomputed from every group's strings."""
+        expected = {
+            (group.id, kind, name)
+            for group in Group.objects.all()
+            for kind, field in TAG_FIELDS.items()
+            for name in canonical_tags(getattr(group, field))
+        }
+        self.assertEqual(set(GroupTag.objects.values_list('group_id', 'tag__kind', 'tag__name')), expected)
+
+    def test_rows_follow_create_update_and_delete(self):
+        first = make_group(self.creator, tags='Exam Prep, algorithms,exam  prep', group_personality='Quiet')
+        second = make_group(self.creator, tags='algorithms', group_personality='Chatty, quiet')
+        self.assertTagsMatchStrings()
+
+        response = self.client.put(f'/api/groups/{first.id}/update/', {'tags': 'Proofs, algorithms'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertTagsMatchStrings()
+
+        second.group_personality = ''
+        second.save(update_fields=['group_personality'])
+        self.assertTagsMatchStrings()
+
+        self.assertEqual(self.client.delete(f'/api/groups/{first.id}/delete/').status_code, 200)
+        self.assertTagsMatchStrings()
+        self.assertFalse(GroupTag.objects.filter(group_id=first.id).exists())
+
+
+class GroupStatsSyncTests(TestCase):
+
+    def setUp(self):
+        self.creator = make_user('counted@example.com')
+        self.members = [make_user(f'counted{i}@example.com') for i in range(3)]
+
+    def rate(self, user, group, rating):
+        client = APIClient()
+        client.force_authenticate(user)
+        self.assertIn(client.post(f'/api/groups/{group.id}/rating/', {'rating': rating}, format='json').status_code, (200, 201))
+
+    def assertStatsMatchSourceRows(self):
+        """Every GroupStats row must equal compute_stats() run over the membership and rating rows."""
+        fresh = compute_stats()
+        expected = {}
+        for group_id in Group.objects.values_list('id', flat=True):
+            members, rating_sum, rating_count = fresh.get(group_id, (0, 0.0, 0))
+            expected[group_id] = (members, rating_sum, rating_count, round(rating_sum / rating_count, 6) if rating_count else 0.0)
+        stored = {
+            group_id: (members, rating_sum, rating_count, round(rating_avg, 6))
+            for group_id, members, rating_sum, rating_count, rating_avg in GroupStats.objects.values_list(
+                'group_id', 'member_count', 'rating_sum', 'rating_count', 'rating_avg',
+            )
+        }
+        self.assertEqual(stored, expected)
+
+    def test_counters_follow_create_update_and_delete(self):
+        first = make_group(self.creator)
+        second = make_group(self.creator, group_name='Second')
+        first.members.add(*self.members)
+        self.members[0].joined_groups.add(second)
+        self.assertStatsMatchSourceRows()
+
+        self.rate(self.members[0], first, 4.5)
+        self.rate(self.members[1], first, 2.0)
+        self.rate(self.members[0], second, 3.0)
+        self.assertStatsMatchSourceRows()
+
+        # Updates through the API, a loaded instance and one saved blind.
+        self.rate(self.members[0], first, 1.5)
+        rating = GroupRating.objects.get(user=self.members[1], group=first)
+        rating.rating = 5
+        rating.save()
+        blind = GroupRating.objects.defer('rating').get(id=rating.id)
+        blind.rating = 3.5
+        blind.save()
+        self.assertStatsMatchSourceRows()
+
+        first.members.remove(self.members[2], self.creator)
+        self.members[0].joined_groups.clear()
+        self.assertStatsMatchSourceRows()
+
+        GroupRating.objects.get(user=self.members[1], group=first).delete()
+        self.members[1].delete()
+        self.assertStatsMatchSourceRows()
+
+        second.delete()
+        self.assertStatsMatchSourceRows()
+
+
+class GroupSignatureSyncTests(TestCase):
+
+    def setUp(self):
+        self.creator = make_user('hashed@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.creator)
+
+    def assertSignaturesMatchTags(self):
+        """Stored signatures and buckets must equal those recomputed from every group's tag strings."""
+        tag_ids = {(tag.kind, tag.name): tag.id for tag in Tag.objects.all()}
+        signatures, buckets = {}, set()
+        for group in Group.objects.all():
+            values = signature({
+                tag_ids[kind, name]
+                for kind, field in TAG_FIELDS.items()
+                for name in canonical_tags(getattr(group, field))
+            })
+            if values is not None:
+                signatures[group.id] = values
+                buckets.update((group.id, band, bucket) for band, bucket in band_buckets(values))
+        self.assertEqual(
+            {group_id: unpack_signature(packed) for group_id, packed in GroupSignature.objects.values_list('group_id', 'signature')},
+            signatures,
+        )
+        self.assertEqual(set(GroupBucket.objects.values_list('group_id', 'band', 'bucket')), buckets)
+
+    def test_signatures_follow_create_update_and_delete(self):
+        first = make_group(self.creator, tags='graphs, proofs', group_personality='quiet')
+        second = make_group(self.creator, tags='graphs', group_personality='Quiet, chatty')
+        make_group(self.creator, tags='', group_personality='')
+        self.assertSignaturesMatchTags()
+
+        response = self.client.put(f'/api/groups/{first.id}/update/', {'tags': 'Graphs, induction'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        second.group_personality = ''
+        second.save(update_fields=['group_personality'])
+        self.assertSignaturesMatchTags()
+
+        # Losing every tag drops the signature instead of leaving a stale one.
+        second.tags = ''
+        second.save()
+        self.assertFalse(GroupSignature.objects.filter(group_id=second.id).exists())
+        self.assertSignaturesMatchTags()
+
+        self.assertEqual(self.client.delete(f'/api/groups/{first.id}/delete/').status_code, 200)
+        self.assertSignaturesMatchTags()
+
+
+def original_similar_groups(group, limit):
+    """The scoring find_similar_groups() did per request before similarity.py: (other id, score), best first."""
+    similar_groups = []
+    for other_group in Group.objects.exclude(id=group.id).order_by('id'):
+        score = 0
+        if group.subject_code == other_group.subject_code:
+            score += 40
+        if group.tags and other_group.tags:
+            group_tags = set([tag.strip().lower() for tag in group.tags.split(',')])
+            other_tags = set([tag.strip().lower() for tag in other_group.tags.split(',')])
+            if group_tags and other_tags:
+                score += len(group_tags.intersection(other_tags)) / len(group_tags.union(other_tags)) * 25
+        if group.group_personality and other_group.group_personality:
+            group_personality = set([p.strip().lower() for p in group.group_personality.split(',')])
+            other_personality = set([p.strip().lower() for p in other_group.group_personality.split(',')])
+            if group_personality and other_personality:
+                score += len(group_personality.intersection(other_personality)) / len(group_personality.union(other_personality)) * 20
+        if group.year_level == other_group.year_level:
+            score += 10
+        if group.meeting_format == other_group.meeting_format:
+            score += 5
+        if score > 10:
+            similar_groups.append((other_group.id, score))
+    similar_groups.sort(key=lambda x: x[1], reverse=True)
+    return similar_groups[:limit]
+
+
+TOPICS = ['algorithms', 'calculus', 'databases', 'essays', 'exam prep', 'labs', 'proofs', 'python', 'statistics']
+PERSONALITIES = ['quiet', 'talkative', 'patient', 'collaborative', 'analytical', 'creative', 'visual learner']
+
+
+def make_catalogue(creator, count, seed=7):
+    rng = random.Random(seed)
+    return [
+        make_group(
+            creator,
+            group_name=f'Catalogue {i}',
+            subject_code=rng.choice(['COMP10001', 'COMP10002', 'MAST10006', 'PHYC10003']),
+            year_level=rng.choice(['1st Year', '2nd Year', '3rd Year']),
+            meeting_format=rng.choice(['Virtual', 'In-person', 'Hybrid']),
+            tags=', '.join(rng.sample(TOPICS, rng.randrange(4))),
+            group_personality=', '.join(rng.sample(PERSONALITIES, rng.randrange(3))),
+        )
+        for i in range(count)
+    ]
+
+
+class SimilarGroupsTests(TestCase):
+
+    def setUp(self):
+        self.creator = make_user('similar@example.com')
+
+    def assert_matches_original(self, groups):
+        stored = stored_lists([group.id for group in groups])
+        for group in groups:
+            expected = original_similar_groups(group, TOP_K)
+            actual = [(other_id, score) for other_id, score, _ in stored.get(group.id, [])]
+            self.assertEqual([other_id for other_id, _ in actual], [other_id for other_id, _ in expected], group.id)
+            for (_, score), (_, expected_score) in zip(actual, expected):
+                self.assertAlmostEqual(score, expected_score)
+
+    def test_saves_queue_the_rescore_instead_of_running_it(self):
+        group, other = make_catalogue(self.creator, 2)
+        self.assertEqual(SimilarGroupRefresh.objects.count(), 2)
+        self.assertFalse(SimilarGroup.objects.exists())
+        Group.objects.filter(id=other.id).update(subject_code=group.subject_code)
+        other.refresh_from_db()
+        other.save(update_fields=['subject_code'])
+        self.assertEqual(process_refresh_queue(), 2)
+        self.assertFalse(SimilarGroupRefresh.objects.exists())
+        self.assertTrue(SimilarGroup.objects.filter(group=group, other=other).exists())
+
+    def test_incremental_updates_match_original_scoring(self):
+        # Exact candidates: LSH recall is covered separately.
+        groups = make_catalogue(self.creator, 40)
+        process_refresh_queue(limit=len(groups), exact=True)
+        self.assert_matches_original(groups)
+
+        # Edits and deletes are patched into the stored lists as well.
+        for group in groups[:5]:
+            group.tags = 'proofs, python'
+            group.year_level = '2nd Year'
+            group.save()
+        groups[5].delete()
+        groups = groups[:5] + groups[6:]
+        process_refresh_queue(limit=len(groups), exact=True)
+        self.assert_matches_original(groups)
+
+    def test_rebuild_matches_original_scoring(self):
+        groups = make_catalogue(self.creator, 40)
+        for engine in ('python', 'matrix'):
+            with self.subTest(engine=engine):
+                rebuild_similar_groups(engine=engine)
+                self.assert_matches_original(groups)
+        self.assertFalse(SimilarGroupRefresh.objects.exists())
+
+
+    def test_lsh_collision_rate_for_weak_overlap_is_bounded(self):
+        # Token sets {0..3} and {2..5} overlap with J = 1/3, shifted so every trial hashes new tokens.
+        trials = 500
+        collisions = 0
+        for trial in range(trials):
+            tokens = range(trial * 10, trial * 10 + 6)
+            group, other = signature(set(tokens[:4])), signature(set(tokens[2:]))
+            collisions += bool(set(band_buckets(group)) & set(band_buckets(other)))
+        expected = 1 - (1 - (1 / 3) ** BAND_ROWS) ** BANDS
+        self.assertAlmostEqual(collisions / trials, expected, delta=0.05)
+
+    def test_rebuild_task_restores_pairs_the_incremental_path_missed(self):
+        groups = make_catalogue(self.creator, 40)
+        process_refresh_queue(limit=len(groups))
+        stored = stored_lists([group.id for group in groups])
+        found = expected = 0
+        for group in groups:
+            matches = {other_id for other_id, _ in original_similar_groups(group, TOP_K)}
+            listed = {other_id for other_id, _, _ in stored.get(group.id, [])}
+            found += len(listed & matches)
+            expected += len(matches)
+        self.assertGreaterEqual(found / expected, 0.9)
+
+        task = next(task for task in registry if task.name == 'rebuild_similar_groups')
+        self.assertIs(task.func, tasks.similar_groups_rebuild)
+        task.func()
+        self.assert_matches_original(groups)
\ No newline at end of file
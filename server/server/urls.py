@@ -16,11 +16,26 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from datetime import date
+
 from django.contrib import admin
-from django.urls import path
+from django.urls import path, register_converter
 from . import views
 from rest_framework_simplejwt.views import TokenRefreshView
 
+
+class DateConverter:
+    regex = r'\d{4}-\d{2}-\d{2}'
+
+    def to_python(self, value):
+        return date.fromisoformat(value)
+
+    def to_url(self, value):
+        return value.isoformat()
+
+
+register_converter(DateConverter, 'date')
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/register/', views.register, name='register'),
@@ -31,12 +46,21 @@ urlpatterns = [
     path('api/token/', views.CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/profile/', views.UserProfileView.as_view(), name='user_profile'),
+    path('api/me/sessions/', views.my_sessions, name='my_sessions'),
+    path('api/me/sessions/conflicts/', views.my_session_conflicts, name='my_session_conflicts'),
+    path('api/me/notifications/', views.my_notifications, name='my_notifications'),
+    path('api/me/calendar.ics', views.calendar_feed, name='calendar_feed'),
+    path('api/me/calendar-token/', views.calendar_token, name='calendar_token'),
     path('api/stats/summary/', views.stats_summary, name='stats_summary'),
     path('api/groups/', views.GroupListCreateView.as_view(), name='group_list'),
+    path('api/groups/facets/', views.group_facets, name='group_facets'),
     path('api/groups/<int:group_id>/', views.group_detail, name='group_detail'),
+    path('api/groups/<int:group_id>/bundle/', views.group_bundle, name='group_bundle'),
     path('api/groups/<int:group_id>/update/', views.UpdateGroupView.as_view(), name='group_update'),
     path('api/groups/<int:group_id>/messages/', views.message_list, name='message_list'),
     path('api/groups/<int:group_id>/sessions/', views.session_list, name='session_list'),
+    path('api/groups/<int:group_id>/recurring-sessions/', views.recurring_session_list, name='recurring_session_list'),
+    path('api/groups/<int:group_id>/occurrences/', views.group_occurrences, name='group_occurrences'),
     path('api/groups/<int:group_id>/files/', views.file_list, name='file_list'),
     path('api/groups/<int:group_id>/notifications/', views.notification_list, name='notification_list'),
     path('api/groups/<int:group_id>/ratings/', views.rating_list, name='rating_list'),
@@ -58,6 +82,10 @@ urlpatterns = [
     path('api/groups/<int:group_id>/notifications/clear/', views.clear_group_notifications, name='clear_group_notifications'),
     path('api/sessions/<int:session_id>/', views.GroupSessionRetrieveUpdateDeleteView.as_view(), name='session_detail'),
     path('api/sessions/<int:session_id>/join/', views.join_session, name='join_session'),
+    path('api/sessions/<int:session_id>/leave/', views.leave_session, name='leave_session'),
+    path('api/recurring-sessions/<int:rule_id>/', views.recurring_session_detail, name='recurring_session_detail'),
+    path('api/recurring-sessions/<int:rule_id>/occurrences/<date:occurrence_date>/cancel/', views.cancel_occurrence, name='cancel_occurrence'),
+    path('api/recurring-sessions/<int:rule_id>/occurrences/<date:occurrence_date>/join/', views.join_occurrence, name='join_occurrence'),
     path('api/groups/messages/<int:message_id>/', views.message_detail, name='message_detail'),
     path('api/files/<int:file_id>/delete/', views.GroupFileDeleteView.as_view(), name='file_delete'),
     path('api/files/<int:file_id>/download/', views.GroupFileDownloadView.as_view(), name='file_download'),
@@ -7,6 +7,7 @@ from django.views import View
 from .serializers import UserSerializer, GroupSerializer, GroupDetailSerializer, UserProfileSerializer, MessageSerializer, GroupSessionSerializer, GroupFileSerializer, GroupRatingSerializer, FlashcardFolderSerializer, FlashcardSerializer
 from .models import Group, Message, GroupSession, CompletedSessionCounter, GroupNotification, GroupFile, GroupRating, PendingRegistration, FlashcardFolder, Flashcard
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import NotAuthenticated
 from rest_framework import permissions
 from rest_framework.decorators import api_view, permission_classes
 from django.utils import timezone
@@ -46,6 +47,35 @@ from uuid import UUID
 from django.views.decorators.cache import cache_page
 from django.utils.decorators import method_decorator
 import threading
+from .session_expiry import expire_past_sessions
+from .study_progress import get_progress
+from .pagination import InvalidCursor, page_size_param, paginate_keyset
+from .etags import etag_matches, not_modified, weak_etag
+from .models import SESSION_TIME_ZONE
+from .serializers import UpcomingSessionSerializer
+from . import session_attendance
+from .models import RecurringSession, RecurrenceException
+from .recurrence import as_rrule, expand, is_occurrence, materialize
+from .serializers import RecurringSessionSerializer, UserNotificationSerializer
+from .models import UserNotification, CalendarFeedToken
+from .ical import calendar_lines, feed_version
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from .group_filters import apply_group_filters, filter_params
+from .facets import facet_counts
+from . import list_cache as group_list_cache
+from . import detail_cache as group_detail_cache
+from django.core.cache import cache
+from django.db.models import F
+from django.db.models import Prefetch
+from django.db.models import Max, Sum
+from .serializers import GroupCardSerializer, annotate_group_stats
+from .sparse_fields import requested_fields, select_fields, wants
+from .conflicts import conflicts_for_session, user_conflicts
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.utils.dateparse import parse_date, parse_datetime
 logger = logging.getLogger(__name__)
 
 User = get_user_model()
@@ -53,136 +83,25 @@ User = get_user_model()
 def cleanup_past_sessions():
     """
     Utility function to clean up past sessions, create notifications, and update counter.
-    This should be called periodically or when sessions are accessed.
+    The work is done set-based by session_expiry.expire_past_sessions. It runs in
+    the background scheduler (manage.py run_scheduler), not on the request path.
     """
-    from django.utils import timezone
-    import pytz
-    from datetime import datetime, timedelta
-    
-    # Get current time in Australia/Sydney timezone
-    australia_tz = pytz.timezone('Australia/Sydney')
-    now_local = timezone.now().astimezone(australia_tz)
-    current_date = now_local.date()
-    current_time = now_local.time().replace(microsecond=0)
-    current_seconds = current_time.hour * 3600 + current_time.minute * 60 + current_time.second
-    
-    # Get ALL sessions and check each one individually
-    all_sessions = GroupSession.objects.all()
-    past_sessions = []
-    
-    for session in all_sessions:
-        session_end_time = session.end_time.replace(microsecond=0)
-        session_seconds = session_end_time.hour * 3600 + session_end_time.minute * 60 + session_end_time.second
-        # Check if session is in the past
-        if session.date < current_date:
-            past_sessions.append(session)
-        elif session.date == current_date and session_seconds < current_seconds:
-            past_sessions.append(session)
-    
-    deleted_count = len(past_sessions)
-    
-    # Create notifications for each past session before deleting
-    for session in past_sessions:
-        # Calculate session duration in hours
-        start_dt = datetime.combine(session.date, session.start_time)
-        end_dt = datetime.combine(session.date, session.end_time)
-        duration_hours = max(0, (end_dt - start_dt).total_seconds() / 3600)
-        # Add duration to group's total_study_hours
-        group = session.group
-        if hasattr(group, 'total_study_hours') and group.total_study_hours is not None:
-            group.total_study_hours = float(group.total_study_hours) + duration_hours
-            group.save(update_fields=["total_study_hours"])
-        GroupNotification.objects.create(
-            group=group,
-            message=f"Session at {session.location} on {session.date} from {session.start_time} to {session.end_time} just ended. {duration_hours:.2f} hours added to group progress."
-        )
-        # Delete all attendees for this session before deleting the session
-        from django.db import connection
-        with connection.cursor() as cursor:
-            cursor.execute(
-                "DELETE FROM server_groupsession_attendees WHERE groupsession_id = %s", [session.id]
-            )
-        session.delete()
-    
-    # Update the completed sessions counter
-    if deleted_count > 0:
-        CompletedSessionCounter.increment(deleted_count)
-    
-    return deleted_count
+    return expire_past_sessions()
 
 def find_similar_groups(group, limit=3):
     """
-    Find similar groups based on multiple factors:
-    - Subject code (highest weight)
-    - Tags overlap
-    - Group personality overlap
-    - Year level
-    - Meeting format
+    The group's most similar groups, best first, read from the precomputed
+    SimilarGroup rows (see similarity.py for the scoring) in one indexed
+    query. limit may be at most similarity.TOP_K.
     """
-    from django.db.models import Q, Count
-    from difflib import SequenceMatcher
-    
-    similar_groups = []
-    
-    # Get all other groups (excluding the current one)
-    all_groups = Group.objects.exclude(id=group.id)
-    
-    for other_group in all_groups:
-        score = 0
-        factors = {}
-        
-        # 1. Subject code match (highest weight: 40 points)
-        if group.subject_code == other_group.subject_code:
-            score += 40
-            factors['subject_code'] = True
-        
-        # 2. Tags overlap (up to 25 points)
-        if group.tags and other_group.tags:
-            group_tags = set([tag.strip().lower() for tag in group.tags.split(',')])
-            other_tags = set([tag.strip().lower() for tag in other_group.tags.split(',')])
-            
-            if group_tags and other_tags:
-                overlap = len(group_tags.intersection(other_tags))
-                total_unique = len(group_tags.union(other_tags))
-                if total_unique > 0:
-                    tag_similarity = overlap / total_unique
-                    score += tag_similarity * 25
-                    factors['tags_overlap'] = tag_similarity
-        
-        # 3. Group personality overlap (up to 20 points)
-        if group.group_personality and other_group.group_personality:
-            group_personality = set([p.strip().lower() for p in group.group_personality.split(',')])
-            other_personality = set([p.strip().lower() for p in other_group.group_personality.split(',')])
-            
-            if group_personality and other_personality:
-                overlap = len(group_personality.intersection(other_personality))
-                total_unique = len(group_personality.union(other_personality))
-                if total_unique > 0:
-                    personality_similarity = overlap / total_unique
-                    score += personality_similarity * 20
-                    factors['personality_overlap'] = personality_similarity
-        
-        # 4. Year level match (10 points)
-        if group.year_level == other_group.year_level:
-            score += 10
-            factors['year_level'] = True
-        
-        # 5. Meeting format match (5 points)
-        if group.meeting_format == other_group.meeting_format:
-            score += 5
-            factors['meeting_format'] = True
-        
-        # Only include groups with some similarity (score > 10)
-        if score > 10:
-            similar_groups.append({
-                'group': other_group,
-                'score': score,
-                'factors': factors
-            })
-    
-    # Sort by score and return top results
-    similar_groups.sort(key=lambda x: x['score'], reverse=True)
-    return similar_groups[:limit]
+    similar = annotate_group_stats(Group.objects.filter(similar_to__group=group)).annotate(
+        similarity_score=F('similar_to__score'),
+        similarity_factors=F('similar_to__factors'),
+    ).order_by('-similarity_score', 'id')[:limit]
+    return [
+        {'group': other, 'score': other.similarity_score, 'factors': other.similarity_factors}
+        for other in similar
+    ]
 
 def validate_unimelb_email(email):
     """Validate that email is a University of Melbourne student email"""
@@ -495,6 +414,15 @@ class LogoutView(APIView):
         # This endpoint can be used to invalidate tokens if needed
         return Response({'detail': 'Logged out successfully'}, status=status.HTTP_200_OK)
 
+# Keyset orderings for the group list; each ends in id so the cursor position is unique.
+GROUP_LIST_ORDERINGS = {
+    'newest': ['-created_at', '-id'],
+    'members': ['-num_members', '-created_at', '-id'],
+    'rating': ['-avg_rating', '-created_at', '-id'],
+    'subject': ['subject_code', '-created_at', '-id'],
+    'relevance': ['-search_rank', '-id'],
+}
+
 class GroupListCreateView(generics.ListCreateAPIView):
     serializer_class = GroupSerializer
 
@@ -504,60 +432,85 @@ class GroupListCreateView(generics.ListCreateAPIView):
         return []
 
     def get_queryset(self):
-        queryset = Group.objects.all()
-        # Optimization: prefetch related fields to avoid N+1 queries
-        queryset = queryset.select_related('creator').prefetch_related('members', 'ratings')
-        
-        # Get filter parameters
-        search = self.request.query_params.get('search', '')
-        subject = self.request.query_params.get('subject', '')
-        year_level = self.request.query_params.get('year_level', '')
-        meeting_format = self.request.query_params.get('meeting_format', '')
-        primary_language = self.request.query_params.get('primary_language', '')
-        personality_tags = self.request.query_params.get('personality_tags', '')
-        
-        # Apply filters
-        if search:
-            queryset = queryset.filter(
-                Q(group_name__icontains=search) |
-                Q(subject_code__icontains=search) |
-                Q(course_name__icontains=search) |
-                Q(description__icontains=search)
-            )
-        
-        if subject and subject != 'all':
-            queryset = queryset.filter(subject_code=subject)
-        
-        if year_level and year_level != 'all':
-            queryset = queryset.filter(year_level=year_level)
+        # Card querysets: counts, ratings and per-user fields come from
+        # annotations (a fixed number of queries) and long text stays unread
+        queryset = GroupCardSerializer.setup_eager_loading(Group.objects.all(), fields=requested_fields(self.request))
         
-        if meeting_format and meeting_format != 'all':
-            queryset = queryset.filter(meeting_format=meeting_format)
-        
-        if primary_language and primary_language != 'all':
-            queryset = queryset.filter(primary_language=primary_language)
-        
-        if personality_tags:
-            # Split personality tags and filter by any matching tag
-            tags = [tag.strip() for tag in personality_tags.split(',') if tag.strip()]
-            if tags:
-                personality_filter = Q()
-                for tag in tags:
-                    personality_filter |= Q(group_personality__icontains=tag)
-                queryset = queryset.filter(personality_filter)
+        queryset = apply_group_filters(
+            queryset, filter_params(self.request.query_params), rank=self.sort_mode() == 'relevance',
+        )
+        if self.mine_only():
+            # ?mine=true: only groups the signed-in user created or joined
+            user = self.request.user
+            queryset = queryset.filter(Q(creator=user) | Q(id__in=user.joined_groups.values('id')))
         
         # Sorting
-        sort = self.request.query_params.get('sort', 'newest')
-        if sort == 'newest':
-            queryset = queryset.order_by('-created_at')
-        elif sort == 'members':
-            queryset = queryset.annotate(num_members=Count('members')).order_by('-num_members', '-created_at')
-        elif sort == 'rating':
-            # Annotate with average rating, fallback to 0 if no ratings
-            queryset = queryset.annotate(avg_rating=models.Avg('ratings__rating')).order_by(models.F('avg_rating').desc(nulls_last=True), '-created_at')
-        elif sort == 'subject':
-            queryset = queryset.order_by('subject_code', '-created_at')
-        return queryset
+        sort = self.sort_mode()
+        # Both sorts read the GroupStats counters rather than aggregating;
+        # num_members (from annotate_group_stats) is the displayed member_count
+        if sort == 'rating':
+            # Unrated groups store an average of 0 so they sort last and the cursor never holds NULL
+            queryset = queryset.annotate(avg_rating=Coalesce(F('stats__rating_avg'), Value(0.0)))
+        return queryset.order_by(*GROUP_LIST_ORDERINGS[sort])
+
+    def sort_mode(self):
+        # Searches rank by relevance unless another sort is asked for
+        searching = bool(self.request.query_params.get('search'))
+        sort = self.request.query_params.get('sort') or ('relevance' if searching else 'newest')
+        if sort not in GROUP_LIST_ORDERINGS or (sort == 'relevance' and not searching):
+            return 'newest'
+        return sort
+
+    def mine_only(self):
+        return self.request.query_params.get('mine') == 'true'
+
+    def paginated(self):
+        # The plain array stays the default; sending ?page_size= or ?cursor=
+        # asks for one page of {'results': [...], 'next_cursor': ...} instead.
+        return 'page_size' in self.request.query_params or 'cursor' in self.request.query_params
+
+    def list(self, request, *args, **kwargs):
+        if self.mine_only() and not request.user.is_authenticated:
+            raise NotAuthenticated()
+        params = {
+            'filters': filter_params(request.query_params),
+            'sort': self.sort_mode(),
+        }
+        if self.paginated():
+            params['cursor'] = request.query_params.get('cursor', '')
+            params['page_size'] = page_size_param(request)
+        fields = requested_fields(request)
+        if fields is not None:
+            params['fields'] = sorted(fields)
+        # Per-user lists are not shared, so they skip the cache
+        key = None if self.mine_only() else group_list_cache.cache_key(params)
+        body = cache.get(key) if key else None
+        if body is None:
+            try:
+                body = self.public_body()
+            except InvalidCursor as e:
+                return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            if key:
+                cache.set(key, body, getattr(settings, 'GROUP_LIST_CACHE_SECONDS', 60))
+        if request.user.is_authenticated:
+            if self.paginated():
+                body = {**body, 'results': group_list_cache.overlay_user_fields(body['results'], request.user)}
+            else:
+                body = group_list_cache.overlay_user_fields(body, request.user)
+        return Response(body)
+
+    def public_body(self):
+        """The list (or one page of it) as an anonymous user sees it; per-user fields are overlaid by list()."""
+        context = {**self.get_serializer_context(), 'request': None}
+        fields = requested_fields(self.request)
+        if not self.paginated():
+            return GroupCardSerializer(self.get_queryset(), many=True, context=context, fields=fields).data
+        page, next_cursor = paginate_keyset(
+            self.get_queryset(), GROUP_LIST_ORDERINGS[self.sort_mode()],
+            self.request.query_params.get('cursor'), page_size_param(self.request),
+        )
+        results = GroupCardSerializer(page, many=True, context=context, fields=fields).data
+        return {'results': results, 'next_cursor': next_cursor}
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -642,71 +595,74 @@ class GroupListCreateView(generics.ListCreateAPIView):
         logger.info(f"GROUP_CREATE_MODERATION_PASSED - All content moderation checks passed")
         serializer.save(creator=self.request.user)
 
-class GroupRetrieveView(generics.RetrieveAPIView):
-    queryset = Group.objects.all()
-    serializer_class = GroupDetailSerializer
-    permission_classes = [AllowAny]
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def group_facets(request):
+    """
+    Counts of groups per filter option (subject, year level, meeting format,
+    language and tags) under the other filters in the query string, plus
+    the total matching every filter. Takes the same filters as /api/groups/.
+    """
+    return Response(facet_counts(filter_params(request.query_params)))
 
-    def get_serializer_context(self):
-        context = super().get_serializer_context()
-        context['request'] = self.request
-        return context
+def group_detail_body(group, fields=None):
+    """
+    (body, ids of the similar groups it embeds) for the detail page as an
+    anonymous user sees it. ``group`` must be loaded with annotate_group_stats()
+    and its study_progress row.
+    """
+    data = GroupDetailSerializer(group, context={'request': None}, fields=fields).data
     
-    def get(self, request, *args, **kwargs):
-        # Clean up past sessions when viewing a group
-        cleanup_past_sessions()
-        
-        # Get the group
-        group = self.get_object()
-        
-        # Find similar groups
-        similar_groups_data = find_similar_groups(group, limit=3)
-        
-        # Serialize the main group
-        serializer = self.get_serializer(group)
-        data = serializer.data
-        
-        # Add similar groups to the response
+    # Add similar groups to the response (skipped when a sparse fieldset leaves them out)
+    similar_ids = []
+    if wants(fields, 'similar_groups'):
         similar_groups_serialized = []
-        for similar_data in similar_groups_data:
+        for similar_data in find_similar_groups(group, limit=3):
             similar_group = similar_data['group']
+            similar_ids.append(similar_group.id)
             similar_serializer = GroupSerializer(similar_group)
             similar_groups_serialized.append({
                 'group': similar_serializer.data,
                 'similarity_score': similar_data['score'],
                 'matching_factors': similar_data['factors']
             })
-        
         data['similar_groups'] = similar_groups_serialized
 
-        # Add progress bar data (count ended sessions not yet cleaned up + total_study_hours)
-        from datetime import datetime
-        import pytz
-        australia_tz = pytz.timezone('Australia/Sydney')
-        now_local = timezone.now().astimezone(australia_tz)
-        current_date = now_local.date()
-        current_time = now_local.time().replace(microsecond=0)
-        current_seconds = current_time.hour * 3600 + current_time.minute * 60 + current_time.second
-        sessions = group.sessions.all()
-        total_seconds = 0
-        for session in sessions:
-            session_end_time = session.end_time.replace(microsecond=0)
-            session_seconds = session_end_time.hour * 3600 + session_end_time.minute * 60 + session_end_time.second
-            # Only count sessions that have ended (not yet cleaned up)
-            if session.date < current_date or (session.date == current_date and session_seconds < current_seconds):
-                start = datetime.combine(session.date, session.start_time)
-                end = datetime.combine(session.date, session.end_time)
-                duration = (end - start).total_seconds()
-                if duration > 0:
-                    total_seconds += duration
-        # Add stored total_study_hours from completed sessions
-        total_hours = round((total_seconds / 3600) + (group.total_study_hours or 0), 2)
-        target_hours = group.target_hours or 1
-        progress_percentage = min(100, round((total_hours / target_hours) * 100, 2)) if target_hours else 0
-        data['total_study_hours'] = total_hours
-        data['progress_percentage'] = progress_percentage
-        data['target_hours'] = target_hours
-        return Response(data)
+    progress_fields = {'total_study_hours', 'progress_percentage', 'target_hours', 'scheduled_study_hours'}
+    if fields is not None and not fields & progress_fields:
+        return data, similar_ids
+
+    # Add progress bar data from the maintained progress row (no session scan)
+    progress = get_progress(group)
+    total_hours = round(progress.completed_hours, 2)
+    target_hours = group.target_hours or 1
+    progress_percentage = min(100, round((total_hours / target_hours) * 100, 2)) if target_hours else 0
+    data['total_study_hours'] = total_hours
+    data['progress_percentage'] = progress_percentage
+    data['target_hours'] = target_hours
+    data['scheduled_study_hours'] = round(progress.scheduled_hours, 2)
+    if fields is not None:
+        data = {key: value for key, value in data.items() if key in fields}
+    return data, similar_ids
+
+class GroupRetrieveView(generics.RetrieveAPIView):
+    serializer_class = GroupDetailSerializer
+    permission_classes = [AllowAny]
+
+    def get_queryset(self):
+        # Serialized as the anonymous user sees it; get() overlays the per-user fields
+        return annotate_group_stats(Group.objects.select_related('study_progress'))
+
+    def get(self, request, *args, **kwargs):
+        fields = requested_fields(request)
+        key = group_detail_cache.cache_key(kwargs['pk'], fields)
+        body = group_detail_cache.get_body(key)
+        if body is None:
+            body, similar_ids = group_detail_body(self.get_object(), fields)
+            group_detail_cache.set_body(key, body, similar_ids)
+        if request.user.is_authenticated:
+            body = group_detail_cache.overlay_user_fields(body, kwargs['pk'], request.user)
+        return Response(body)
 
 class JoinGroupView(APIView):
     permission_classes = [IsAuthenticated]
@@ -866,9 +822,8 @@ class UserProfileView(APIView):
 
     def get(self, request):
         user = request.user
-        from .serializers import GroupSerializer
-        joined_groups = user.joined_groups.select_related('creator').prefetch_related('members', 'ratings').all()
-        groups_data = GroupSerializer(joined_groups, many=True).data
+        joined_groups = GroupCardSerializer.setup_eager_loading(user.joined_groups.all())
+        groups_data = GroupCardSerializer(joined_groups, many=True).data
         serializer = UserProfileSerializer(user)
         data = serializer.data
         data['joined_groups'] = groups_data
@@ -928,8 +883,8 @@ class GroupChatView(APIView):
         group = Group.objects.get(id=group_id)
         if not (group.members.filter(id=request.user.id).exists() or group.creator == request.user or request.user.is_staff):
             return Response({'detail': 'Not a group member'}, status=403)
-        messages = Message.objects.filter(group=group).order_by('timestamp')
-        serializer = MessageSerializer(messages, many=True)
+        messages = Message.objects.filter(group=group).select_related('user').order_by('timestamp')
+        serializer = MessageSerializer(messages, many=True, fields=requested_fields(request))
         return Response(serializer.data)
 
     def post(self, request, group_id):
@@ -957,18 +912,20 @@ class GroupChatView(APIView):
             'is_group_creator': group.creator == request.user,
         }, status=201)
 
+def group_member_rows(group):
+    """The group's members plus its creator; reads group.members.all(), so a prefetch is reused."""
+    all_members = list(group.members.all())
+    
+    # Include the creator in the members list
+    if group.creator not in all_members:
+        all_members.append(group.creator)
+    
+    return [{'id': m.id, 'name': m.name, 'email': m.email, 'is_creator': m == group.creator} for m in all_members]
+
 class GroupMembersView(APIView):
     def get(self, request, group_id):
-        group = Group.objects.get(id=group_id)
-        members = group.members.all()
-        
-        # Include the creator in the members list
-        all_members = list(members)
-        if group.creator not in all_members:
-            all_members.append(group.creator)
-        
-        data = [{'id': m.id, 'name': m.name, 'email': m.email, 'is_creator': m == group.creator} for m in all_members]
-        return Response(data) 
+        group = Group.objects.select_related('creator').get(id=group_id)
+        return Response(group_member_rows(group)) 
 
 class IsGroupCreatorOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
@@ -976,6 +933,31 @@ class IsGroupCreatorOrReadOnly(permissions.BasePermission):
             return True
         return obj.creator == request.user
 
+def session_time_error(data):
+    """
+    The 400 response for start/end times a session (one-off or recurring) may
+    not have, or None: sessions cannot go past midnight nor start or end at it.
+    """
+    # Restrict sessions to not go past midnight and not allow midnight as a time
+    start_time = data.get('start_time')
+    end_time = data.get('end_time')
+    if start_time and end_time:
+        from datetime import datetime, time as dtime
+        try:
+            start_dt = datetime.strptime(start_time, '%H:%M:%S').time()
+            end_dt = datetime.strptime(end_time, '%H:%M:%S').time()
+            # Disallow midnight (00:00:00) for either start or end
+            if start_dt == dtime(0, 0, 0) or end_dt == dtime(0, 0, 0):
+                logger.warning(f"Session creation failed: Start or end time is midnight (00:00:00). Start: {start_time}, End: {end_time}")
+                return Response({'error': 'Sessions cannot start or end at midnight (00:00). Please choose a time between 00:01 and 23:59.'}, status=status.HTTP_400_BAD_REQUEST)
+            if end_dt <= start_dt:
+                logger.warning(f"Session creation failed: End time {end_time} is not after start time {start_time}.")
+                return Response({'error': 'End time must be after start time and sessions cannot go past midnight.'}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logger.error(f"Time parsing error: {e}")
+            return Response({'error': 'Invalid time format.'}, status=status.HTTP_400_BAD_REQUEST)
+    return None
+
 class GroupSessionListCreateView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -985,17 +967,12 @@ class GroupSessionListCreateView(APIView):
             if not (group.members.filter(id=request.user.id).exists() or group.creator == request.user or request.user.is_staff):
                 return Response({'detail': 'Not a group member'}, status=403)
             
-            # Always clean up past sessions on every request
-            deleted_count = cleanup_past_sessions()
-            
             # Return only upcoming sessions for this group
-            now = timezone.now()
-            sessions = GroupSession.objects.filter(
-                Q(date__gt=now.date()) |
-                Q(date=now.date(), end_time__gte=now.time()),
-                group=group
-            ).order_by('date', 'start_time')
-            serializer = GroupSessionSerializer(sessions, many=True)
+            sessions = GroupSessionSerializer.setup_eager_loading(GroupSession.objects.filter(
+                group=group,
+                ends_at__gte=timezone.now()
+            ).order_by('starts_at'))
+            serializer = GroupSessionSerializer(sessions, many=True, fields=requested_fields(request))
             return Response(serializer.data)
         except Group.DoesNotExist:
             return Response({'detail': 'Group not found'}, status=404)
@@ -1020,24 +997,9 @@ class GroupSessionListCreateView(APIView):
                     'error': description_validation['message']
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            # Restrict sessions to not go past midnight and not allow midnight as a time
-            start_time = request.data.get('start_time')
-            end_time = request.data.get('end_time')
-            if start_time and end_time:
-                from datetime import datetime, time as dtime
-                try:
-                    start_dt = datetime.strptime(start_time, '%H:%M:%S').time()
-                    end_dt = datetime.strptime(end_time, '%H:%M:%S').time()
-                    # Disallow midnight (00:00:00) for either start or end
-                    if start_dt == dtime(0, 0, 0) or end_dt == dtime(0, 0, 0):
-                        logger.warning(f"Session creation failed: Start or end time is midnight (00:00:00). Start: {start_time}, End: {end_time}")
-                        return Response({'error': 'Sessions cannot start or end at midnight (00:00). Please choose a time between 00:01 and 23:59.'}, status=status.HTTP_400_BAD_REQUEST)
-                    if end_dt <= start_dt:
-                        logger.warning(f"Session creation failed: End time {end_time} is not after start time {start_time}.")
-                        return Response({'error': 'End time must be after start time and sessions cannot go past midnight.'}, status=status.HTTP_400_BAD_REQUEST)
-                except Exception as e:
-                    logger.error(f"Time parsing error: {e}")
-                    return Response({'error': 'Invalid time format.'}, status=status.HTTP_400_BAD_REQUEST)
+            time_error = session_time_error(request.data)
+            if time_error:
+                return time_error
             
             serializer = GroupSessionSerializer(data=request.data)
             if serializer.is_valid():
@@ -1069,7 +1031,7 @@ class GroupSessionRetrieveUpdateDeleteView(APIView):
         group = session.group
         if not (group.members.filter(id=request.user.id).exists() or group.creator == request.user or request.user.is_staff):
             return Response({'detail': 'Not a group member'}, status=403)
-        serializer = GroupSessionSerializer(session)
+        serializer = GroupSessionSerializer(session, fields=requested_fields(request))
         return Response(serializer.data)
 
     def put(self, request, session_id):
@@ -1107,9 +1069,6 @@ def group_notifications(request, group_id):
         if not (group.members.filter(id=request.user.id).exists() or group.creator == request.user or request.user.is_staff):
             return Response({'detail': 'Not a group member'}, status=403)
         
-        # Clean up past sessions before fetching notifications
-        cleanup_past_sessions()
-        
         notifications = GroupNotification.objects.filter(group=group).order_by('-created_at')[:50]
         data = [
             {
@@ -1144,25 +1103,16 @@ def clear_group_notifications(request, group_id):
 @permission_classes([AllowAny])
 @cache_page(60)
 def stats_summary(request):
-    # Clean up past sessions before calculating stats
-    cleanup_past_sessions()
-    
     now = timezone.now()
     from .models import User, Group, GroupSession
     active_students = User.objects.count()
-    active_sessions = GroupSession.objects.filter(
-        Q(date__gt=now.date()) |
-        Q(date=now.date(), end_time__gte=now.time())
-    ).count()
+    active_sessions = GroupSession.objects.filter(ends_at__gte=now).count()
     subject_areas = Group.objects.values('subject_code').distinct().count()
     new_groups_today = Group.objects.filter(created_at__date=now.date()).count()
     unimelb_students = User.objects.filter(email__iendswith='unimelb.edu.au').count()
     groups_created = Group.objects.count()
-    # Use CompletedSessionCounter for sessions_completed
-    try:
-        sessions_completed = CompletedSessionCounter.objects.get(pk=1).count
-    except CompletedSessionCounter.DoesNotExist:
-        sessions_completed = 0
+    # Use CompletedSessionCounter for sessions_completed (summed over shards, cached)
+    sessions_completed = CompletedSessionCounter.total()
     from datetime import timedelta
     new_users_24hrs = User.objects.filter(date_joined__gte=now - timedelta(days=1)).count()
     return Response({
@@ -1411,8 +1361,8 @@ class GroupFileListCreateView(APIView):
             if not (request.user in group.members.all() or request.user == group.creator):
                 return Response({'detail': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
             
-            files = GroupFile.objects.filter(group=group).order_by('-uploaded_at')
-            serializer = GroupFileSerializer(files, many=True)
+            files = GroupFile.objects.filter(group=group).select_related('uploaded_by').order_by('-uploaded_at')
+            serializer = GroupFileSerializer(files, many=True, fields=requested_fields(request))
             return Response(serializer.data)
         except Group.DoesNotExist:
             return Response({'detail': 'Group not found'}, status=status.HTTP_404_NOT_FOUND)
@@ -1785,8 +1735,8 @@ def group_recommendations(request):
     # Get all groups the user hasn't joined or created
     user_groups = set(user.joined_groups.values_list('id', flat=True)) | set(user.created_groups.values_list('id', flat=True))
     
-    # Get all available groups excluding user's groups
-    available_groups = Group.objects.exclude(id__in=user_groups)
+    # Get all available groups excluding user's groups, loaded as cards
+    available_groups = GroupCardSerializer.setup_eager_loading(Group.objects.exclude(id__in=user_groups), user)
     
     recommendations = []
     
@@ -1829,14 +1779,13 @@ def group_recommendations(request):
                 reasons.append("Matches your language preference")
         
         # 5. Popular groups bonus (10 points)
-        member_count = group.members.count()
+        member_count = group.num_members
         if member_count >= 5:
             score += 10
             reasons.append("Popular group")
         
         # 6. High rating bonus (10 points)
-        from .models import GroupRating
-        avg_rating = GroupRating.get_average_rating(group)
+        avg_rating = group.rating_avg
         if avg_rating and avg_rating >= 4.0:
             score += 10
             reasons.append("Highly rated")
@@ -1854,7 +1803,7 @@ def group_recommendations(request):
             match_percentage = min(score, 100)
             
             recommendations.append({
-                'group': GroupSerializer(group, context={'request': request}).data,
+                'group': GroupCardSerializer(group, context={'request': request}).data,
                 'score': score,
                 'match_percentage': match_percentage,
                 'reasons': reasons[:3],  # Top 3 reasons
@@ -2039,12 +1988,16 @@ def generate_dummy_flashcards_for_folder(folder, file_info=None):
     
     return created_flashcards
 
+def user_flashcard_folders(user):
+    """The user's flashcard folders with their creator and flashcard counts loaded in the same query."""
+    return FlashcardFolder.objects.filter(creator=user).select_related('creator').annotate(flashcard_total=Count('flashcards'))
+
 class FlashcardFolderView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
         """Get all flashcard folders for the current user, optionally filtered by group"""
-        folders = FlashcardFolder.objects.filter(creator=request.user)
+        folders = user_flashcard_folders(request.user)
         
         # Filter by group if specified
         group_id = request.query_params.get('group')
@@ -2570,7 +2523,7 @@ class CustomTokenObtainPairView(TokenObtainPairView):
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def group_list(request):
-    """Get list of groups with filtering"""
+    """Get list of groups with filtering; ?cursor= / ?page_size= switch to keyset pages"""
     view = GroupListCreateView()
     view.request = request
     view.args = ()
@@ -2589,6 +2542,107 @@ def group_detail(request, group_id):
     view.format_kwarg = None
     return view.get(request, pk=group_id)
 
+# Sections of /api/groups/<id>/bundle/, in response order. Private ones need
+# the viewer to be a member (the creator counts; staff too, except for files),
+# personal ones a signed-in viewer.
+BUNDLE_SECTIONS = ['detail', 'members', 'messages', 'sessions', 'notifications', 'files', 'rating', 'flashcard_folders']
+BUNDLE_PRIVATE_SECTIONS = {'messages', 'sessions', 'notifications', 'files'}
+BUNDLE_PERSONAL_SECTIONS = {'rating', 'flashcard_folders'}
+# Queries for every section with the detail page uncached; GroupBundleQueryTests enforces it.
+BUNDLE_QUERY_BUDGET = 12
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def group_bundle(request, group_id):
+    """
+    Everything the group page loads, in one request: ?include= picks
+    sections from BUNDLE_SECTIONS (default: all). The group is loaded once,
+    with its creator, stats, progress and members, and that one load serves
+    the membership check, the detail and members sections and the per-user
+    fields. Every other section is a single query (sessions add one for
+    attendees), so the whole bundle stays within BUNDLE_QUERY_BUDGET
+    queries however much the group holds. Sections the viewer may not see
+    are left out and named in "errors".
+    """
+    include = [name.strip() for name in request.query_params.get('include', '').split(',') if name.strip()]
+    unknown = sorted(set(include) - set(BUNDLE_SECTIONS))
+    if unknown:
+        return Response(
+            {'detail': f"Unknown sections: {', '.join(unknown)}. Choose from {', '.join(BUNDLE_SECTIONS)}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    sections = [name for name in BUNDLE_SECTIONS if not include or name in include]
+
+    group = annotate_group_stats(Group.objects.select_related('study_progress', 'stats')).prefetch_related(None).prefetch_related(
+        Prefetch('members', queryset=User.objects.only('id', 'name', 'email')),
+    ).filter(id=group_id).first()
+    if group is None:
+        return Response({'detail': 'Group not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    user = request.user if request.user.is_authenticated else None
+    joined = user is not None and any(member.id == user.id for member in group.members.all())
+    is_member = user is not None and (joined or group.creator_id == user.id)
+    rating = None
+    if user is not None and {'detail', 'rating'} & set(sections):
+        rating = GroupRating.objects.filter(group=group, user=user).select_related('user').first()
+
+    data, errors = {}, {}
+    for name in sections:
+        if name in BUNDLE_PERSONAL_SECTIONS and user is None:
+            errors[name] = 'Authentication required'
+        elif name in BUNDLE_PRIVATE_SECTIONS and not (is_member or (user is not None and user.is_staff and name != 'files')):
+            errors[name] = 'Not a group member'
+        elif name == 'detail':
+            key = group_detail_cache.cache_key(group.id, None)
+            body = group_detail_cache.get_body(key)
+            if body is None:
+                body, similar_ids = group_detail_body(group)
+                group_detail_cache.set_body(key, body, similar_ids)
+            if user is not None:
+                body = {**body, 'joined': joined, 'user_rating': float(rating.rating) if rating else None}
+            data[name] = body
+        elif name == 'members':
+            data[name] = group_member_rows(group)
+        elif name == 'messages':
+            data[name] = group_message_rows(group, user)
+        elif name == 'sessions':
+            sessions = GroupSessionSerializer.setup_eager_loading(
+                GroupSession.objects.filter(group=group, ends_at__gte=timezone.now()).order_by('starts_at')
+            )
+            data[name] = GroupSessionSerializer(sessions, many=True).data
+        elif name == 'notifications':
+            data[name] = group_notification_rows(group)
+        elif name == 'files':
+            files = GroupFile.objects.filter(group=group).select_related('uploaded_by').order_by('-uploaded_at')
+            data[name] = GroupFileSerializer(files, many=True).data
+        elif name == 'rating':
+            if rating is not None:
+                # The stats row came with the group, so the averages cost no query.
+                rating._group_stats = group.stats
+            data[name] = GroupRatingSerializer(rating).data if rating else None
+        elif name == 'flashcard_folders':
+            folders = user_flashcard_folders(user).filter(group=group).order_by('-created_at')
+            data[name] = FlashcardFolderSerializer(folders, many=True, context={'request': request}).data
+    if errors:
+        data['errors'] = errors
+    return Response(data)
+
+def group_message_rows(group, user):
+    """The group's chat messages, oldest first, as the messages endpoint lists them for ``user``."""
+    messages = Message.objects.filter(group=group).select_related('user').order_by('timestamp')
+    return [
+        {
+            'id': m.id,
+            'user_id': m.user.id,
+            'user_name': m.user.name,
+            'text': m.text,
+            'timestamp': m.timestamp,
+            'is_sender': m.user == user,
+            'is_group_creator': group.creator_id == user.id,
+        }
+        for m in messages
+    ]
+
 @api_view(['GET', 'POST', 'DELETE'])
 @permission_classes([IsAuthenticated])
 def message_list(request, group_id):
@@ -2600,20 +2654,7 @@ def message_list(request, group_id):
         return Response({'error': 'Group not found'}, status=404)
 
     if request.method == 'GET':
-        messages = Message.objects.filter(group=group).order_by('timestamp')
-        data = [
-            {
-                'id': m.id,
-                'user_id': m.user.id,
-                'user_name': m.user.name,
-                'text': m.text,
-                'timestamp': m.timestamp,
-                'is_sender': m.user == user,
-                'is_group_creator': group.creator == user,
-            }
-            for m in messages
-        ]
-        return Response(data)
+        return Response(select_fields(group_message_rows(group, user), requested_fields(request)))
 
     if request.method == 'POST':
         text = request.data.get('text', '').strip()
@@ -2671,6 +2712,61 @@ def session_list(request, group_id):
     elif request.method == 'POST':
         return view.post(request, group_id=group_id)
 
+def parse_window_bound(value):
+    """Parse an ISO date or datetime query parameter; naive values are Melbourne local time."""
+    parsed = parse_datetime(value)
+    if parsed is None:
+        parsed_date = parse_date(value)
+        if parsed_date is None:
+            raise ValueError(value)
+        parsed = datetime.combine(parsed_date, datetime.min.time())
+    if timezone.is_naive(parsed):
+        parsed = SESSION_TIME_ZONE.localize(parsed)
+    return parsed
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def my_sessions(request):
+    """
+    Upcoming sessions across every group the user created or joined, ordered
+    by start time. Optional ?from= / ?to= (ISO date or datetime) restrict the
+    window to sessions overlapping it; ?cursor= / ?page_size= page through the
+    results. The weak ETag comes from one aggregate over the window (count,
+    id sum and latest session and group stamps), so a 304 is answered
+    before any page is read.
+    """
+    try:
+        window_start = parse_window_bound(request.query_params['from']) if request.query_params.get('from') else timezone.now()
+        window_end = parse_window_bound(request.query_params['to']) if request.query_params.get('to') else None
+    except ValueError:
+        return Response({'detail': 'from/to must be ISO dates or datetimes'}, status=status.HTTP_400_BAD_REQUEST)
+
+    user_groups = Group.objects.filter(Q(creator=request.user) | Q(members=request.user)).values('id')
+    window = GroupSession.objects.filter(group_id__in=user_groups, ends_at__gte=window_start)
+    if window_end is not None:
+        window = window.filter(starts_at__lt=window_end)
+
+    # A full Group save (e.g. a rename) bumps sessions_updated_at, which covers group_name.
+    version = window.aggregate(
+        count=Count('id'), id_sum=Sum('id'),
+        updated=Max('updated_at'), group_updated=Max('group__sessions_updated_at'),
+    )
+    etag = weak_etag(
+        request.user.id, request.query_params.get('cursor'), page_size_param(request), sorted(version.items()),
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    sessions = UpcomingSessionSerializer.setup_eager_loading(window.select_related('group'))
+    try:
+        page, next_cursor = paginate_keyset(
+            sessions, ['starts_at', 'id'], request.query_params.get('cursor'), page_size_param(request),
+        )
+    except InvalidCursor as e:
+        return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    serializer = UpcomingSessionSerializer(page, many=True)
+    return Response({'results': serializer.data, 'next_cursor': next_cursor}, headers={'ETag': etag})
+
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
 def file_list(request, group_id):
@@ -2683,23 +2779,24 @@ def file_list(request, group_id):
     elif request.method == 'POST':
         return view.post(request, group_id=group_id)
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def notification_list(request, group_id):
-    group = Group.objects.get(id=group_id)
-    if not (group.members.filter(id=request.user.id).exists() or group.creator == request.user or request.user.is_staff):
-        return Response({'detail': 'Not a group member'}, status=403)
-    # Clean up past sessions before fetching notifications
-    cleanup_past_sessions()
+def group_notification_rows(group):
+    """The group's 50 latest notifications, newest first."""
     notifications = GroupNotification.objects.filter(group=group).order_by('-created_at')[:50]
-    data = [
+    return [
         {
             'id': n.id,
             'message': n.message,
             'created_at': n.created_at
         } for n in notifications
     ]
-    return Response(data)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def notification_list(request, group_id):
+    group = Group.objects.get(id=group_id)
+    if not (group.members.filter(id=request.user.id).exists() or group.creator == request.user or request.user.is_staff):
+        return Response({'detail': 'Not a group member'}, status=403)
+    return Response(group_notification_rows(group))
 
 @api_view(['GET', 'POST', 'DELETE'])
 @permission_classes([IsAuthenticated])
@@ -2886,26 +2983,267 @@ def reset_password(request):
 @permission_classes([IsAuthenticated])
 def join_session(request, session_id):
     """Join a group session, add user to attendees, and notify them."""
-    from .models import GroupSession, GroupNotification
     user = request.user
     try:
         session = GroupSession.objects.get(id=session_id)
-        if user in session.attendees.all():
-            return Response({'detail': 'Already joined this session.'}, status=status.HTTP_200_OK)
-        session.attendees.add(user)
-        session.save()
-        # Create notification for the user (dashboard)
-        GroupNotification.objects.create(
-            group=session.group,
-            message=f"You joined a session at {session.location} on {session.date} from {session.start_time} to {session.end_time}."
-        )
-        return Response({
-            'detail': 'Successfully joined the session.',
-            'attendee_count': session.attendees.count(),
-            'attendees': list(session.attendees.values_list('id', flat=True)),
-        }, status=status.HTTP_200_OK)
     except GroupSession.DoesNotExist:
         return Response({'detail': 'Session not found.'}, status=status.HTTP_404_NOT_FOUND)
+    if session_attendance.is_attending(session.id, user.id) or not session_attendance.join(session.id, user.id):
+        return Response({'detail': 'Already joined this session.'}, status=status.HTTP_200_OK)
+    # Create notification for the user (dashboard)
+    GroupNotification.objects.create(
+        group_id=session.group_id,
+        message=f"You joined a session at {session.location} on {session.date} from {session.start_time} to {session.end_time}."
+    )
+    return Response(joined_payload(session, user), status=status.HTTP_200_OK)
+
+def joined_payload(session, user):
+    """Response body for a successful join, with a warning if it clashes with the user's other sessions."""
+    payload = {
+        'detail': 'Successfully joined the session.',
+        'session_id': session.id,
+        'attendee_count': session_attendance.attendee_count(session.id),
+        # Kept for existing clients; ids only, read from the through table's index.
+        'attendees': session_attendance.attendee_ids(session.id),
+    }
+    clashes = conflicts_for_session(user.id, session)
+    if clashes:
+        payload['warning'] = f"This session overlaps {len(clashes)} other session(s) you have joined."
+        payload['conflicts'] = clashes
+    return payload
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def leave_session(request, session_id):
+    """Remove the user from a session's attendees."""
+    if not GroupSession.objects.filter(id=session_id).exists():
+        return Response({'detail': 'Session not found.'}, status=status.HTTP_404_NOT_FOUND)
+    if not session_attendance.leave(session_id, request.user.id):
+        return Response({'detail': 'You have not joined this session.'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({
+        'detail': 'Successfully left the session.',
+        'attendee_count': session_attendance.attendee_count(session_id),
+    }, status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def my_session_conflicts(request):
+    """
+    Overlapping pairs among the sessions the user has joined, over ?from= /
+    ?to= (default: from now, no end).
+    """
+    try:
+        window_start = parse_window_bound(request.query_params['from']) if request.query_params.get('from') else timezone.now()
+        window_end = parse_window_bound(request.query_params['to']) if request.query_params.get('to') else None
+    except ValueError:
+        return Response({'detail': 'from/to must be ISO dates or datetimes'}, status=status.HTTP_400_BAD_REQUEST)
+    session_count, conflicts = user_conflicts(request.user.id, window_start, window_end)
+    return Response({'session_count': session_count, 'conflict_count': len(conflicts), 'conflicts': conflicts})
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticated])
+def my_notifications(request):
+    """
+    GET: the user's 50 most recent personal notifications (e.g. session
+    reminders). POST: mark them all as read.
+    """
+    notifications = UserNotification.objects.filter(user=request.user)
+    if request.method == 'POST':
+        updated = notifications.filter(is_read=False).update(is_read=True)
+        return Response({'marked_read': updated})
+    return Response(UserNotificationSerializer(notifications.order_by('-created_at')[:50], many=True).data)
+
+def calendar_feed(request):
+    """
+    The user's study sessions as an iCalendar feed, authenticated by the
+    ?token= from /api/me/calendar-token/. Conditional requests are answered
+    from the groups' session stamps without reading any session rows; the
+    body is streamed event by event.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponse(status=405)
+    token = request.GET.get('token', '')
+    feed_token = CalendarFeedToken.objects.select_related('user').filter(token=token).first() if token else None
+    if feed_token is None or not feed_token.user.is_active:
+        return HttpResponse('Invalid calendar token', status=401, content_type='text/plain')
+    user = feed_token.user
+
+    etag, last_modified = feed_version(user)
+    # HTTP dates have whole-second precision.
+    last_modified_ts = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified_ts)
+    if response is None and request.method == 'HEAD':
+        # Headers only: never build the event stream.
+        response = HttpResponse(content_type='text/calendar; charset=utf-8')
+    elif response is None:
+        response = StreamingHttpResponse(calendar_lines(user), content_type='text/calendar; charset=utf-8')
+    if response.status_code == 200:
+        response['Content-Disposition'] = 'inline; filename="melbminds.ics"'
+    response['ETag'] = etag
+    if last_modified_ts:
+        response['Last-Modified'] = http_date(last_modified_ts)
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticated])
+def calendar_token(request):
+    """GET: the user's calendar feed URL (created on first use). POST: rotate the token."""
+    feed_token, created = CalendarFeedToken.objects.get_or_create(user=request.user)
+    if request.method == 'POST' and not created:
+        feed_token.rotate()
+    url = request.build_absolute_uri(reverse('calendar_feed')) + f'?token={feed_token.token}'
+    return Response({'token': feed_token.token, 'url': url})
+
+def can_view_group_sessions(group, user):
+    return group.creator_id == user.id or user.is_staff or group.members.filter(id=user.id).exists()
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticated])
+def recurring_session_list(request, group_id):
+    """List a group's recurring sessions or define a new one (group creator only)."""
+    try:
+        group = Group.objects.get(id=group_id)
+    except Group.DoesNotExist:
+        return Response({'detail': 'Group not found'}, status=404)
+
+    if request.method == 'GET':
+        if not can_view_group_sessions(group, request.user):
+            return Response({'detail': 'Not a group member'}, status=403)
+        rules = RecurringSession.objects.filter(group=group).select_related('creator').order_by('starts_on', 'start_time')
+        return Response(RecurringSessionSerializer(rules, many=True).data)
+
+    if group.creator != request.user:
+        return Response({'detail': 'Only the group creator can create sessions'}, status=403)
+    description_validation = perspective_moderator.validate_user_input('session description', request.data.get('description', ''))
+    if not description_validation['valid']:
+        return Response({'error': description_validation['message']}, status=status.HTTP_400_BAD_REQUEST)
+    time_error = session_time_error(request.data)
+    if time_error:
+        return time_error
+    serializer = RecurringSessionSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=400)
+    rule = serializer.save(group=group, creator=request.user)
+    GroupNotification.objects.create(
+        group=group,
+        message=f"New recurring session ({as_rrule(rule)}) at {rule.location} from {rule.start_time} to {rule.end_time}, starting {rule.starts_on}."
+    )
+    logger.info(f"Recurring session {rule.id} created for group {group_id} by user {request.user}.")
+    return Response(RecurringSessionSerializer(rule).data, status=201)
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def recurring_session_detail(request, rule_id):
+    """Retrieve or delete a recurring session. Materialized occurrences are kept."""
+    try:
+        rule = RecurringSession.objects.select_related('group', 'creator').get(id=rule_id)
+    except RecurringSession.DoesNotExist:
+        return Response({'detail': 'Recurring session not found'}, status=404)
+    if request.method == 'GET':
+        if not can_view_group_sessions(rule.group, request.user):
+            return Response({'detail': 'Not a group member'}, status=403)
+        return Response(RecurringSessionSerializer(rule).data)
+    if rule.creator != request.user:
+        return Response({'detail': 'Only the group creator can delete sessions'}, status=403)
+    rule.delete()
+    return Response(status=204)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def cancel_occurrence(request, rule_id, occurrence_date):
+    """Cancel a single occurrence of a recurring session (RRULE exception)."""
+    try:
+        rule = RecurringSession.objects.get(id=rule_id)
+    except RecurringSession.DoesNotExist:
+        return Response({'detail': 'Recurring session not found'}, status=404)
+    if rule.creator != request.user:
+        return Response({'detail': 'Only the group creator can cancel sessions'}, status=403)
+    if not is_occurrence(rule, occurrence_date):
+        return Response({'detail': f'{occurrence_date} is not an occurrence of this session'}, status=400)
+    _, created = RecurrenceException.objects.get_or_create(rule=rule, date=occurrence_date)
+    if not created:
+        return Response({'detail': 'This occurrence was already cancelled or has its own session.'}, status=400)
+    GroupNotification.objects.create(
+        group_id=rule.group_id,
+        message=f"The session at {rule.location} on {occurrence_date} from {rule.start_time} to {rule.end_time} was cancelled."
+    )
+    return Response(status=204)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def join_occurrence(request, rule_id, occurrence_date):
+    """RSVP to one occurrence of a recurring session, materializing it as a GroupSession."""
+    try:
+        rule = RecurringSession.objects.select_related('group').get(id=rule_id)
+    except RecurringSession.DoesNotExist:
+        return Response({'detail': 'Recurring session not found'}, status=404)
+    if not can_view_group_sessions(rule.group, request.user):
+        return Response({'detail': 'Not a group member'}, status=403)
+    try:
+        session = materialize(rule, occurrence_date)
+    except ValueError as e:
+        return Response({'detail': str(e)}, status=400)
+    if not session_attendance.join(session.id, request.user.id):
+        return Response({'detail': 'Already joined this session.', 'session_id': session.id}, status=status.HTTP_200_OK)
+    GroupNotification.objects.create(
+        group_id=session.group_id,
+        message=f"You joined a session at {session.location} on {session.date} from {session.start_time} to {session.end_time}."
+    )
+    return Response(joined_payload(session, request.user), status=status.HTTP_200_OK)
+
+MAX_OCCURRENCE_WINDOW = timedelta(days=366)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def group_occurrences(request, group_id):
+    """
+    A group's sessions over ?from= / ?to= (default: the next 28 days):
+    one-off and materialized sessions merged with recurring occurrences
+    expanded on the fly. Virtual occurrences have no id; RSVP to them via
+    /api/recurring-sessions/<rule>/occurrences/<date>/join/.
+    """
+    try:
+        group = Group.objects.get(id=group_id)
+    except Group.DoesNotExist:
+        return Response({'detail': 'Group not found'}, status=404)
+    if not can_view_group_sessions(group, request.user):
+        return Response({'detail': 'Not a group member'}, status=403)
+    try:
+        window_start = parse_window_bound(request.query_params['from']) if request.query_params.get('from') else timezone.now()
+        window_end = parse_window_bound(request.query_params['to']) if request.query_params.get('to') else window_start + timedelta(days=28)
+    except ValueError:
+        return Response({'detail': 'from/to must be ISO dates or datetimes'}, status=status.HTTP_400_BAD_REQUEST)
+    if window_end <= window_start or window_end - window_start > MAX_OCCURRENCE_WINDOW:
+        return Response({'detail': 'The window must be positive and at most 366 days long'}, status=status.HTTP_400_BAD_REQUEST)
+
+    sessions = GroupSessionSerializer.setup_eager_loading(
+        GroupSession.objects.filter(group=group, ends_at__gte=window_start, starts_at__lt=window_end)
+    )
+    items = [(s.starts_at, 0, s.id, GroupSessionSerializer(s).data) for s in sessions]
+    rules = RecurringSession.objects.filter(group=group).select_related('creator').prefetch_related('exceptions')
+    for rule, occurrence, starts_at, ends_at in expand(rules, window_start, window_end):
+        items.append((starts_at, 1, rule.id, {
+            'id': None,
+            'group': group.id,
+            'creator': rule.creator_id,
+            'creator_name': rule.creator.name,
+            'topic': rule.topic,
+            'date': occurrence.isoformat(),
+            'start_time': rule.start_time.isoformat(),
+            'end_time': rule.end_time.isoformat(),
+            'location': rule.location,
+            'meeting_format': rule.meeting_format,
+            'description': rule.description,
+            'extra_details': rule.extra_details,
+            'attendee_count': 0,
+            'attendees': [],
+            'recurrence': rule.id,
+            'occurrence_date': occurrence.isoformat(),
+        }))
+    items.sort(key=lambda item: item[:3])
+    return Response([item[3] for item in items])
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def message_detail(request, message_id):